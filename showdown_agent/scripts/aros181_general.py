@@ -1,7 +1,17 @@
+import json
+import os
+
+import numpy as np
 from poke_env.battle import AbstractBattle
 from poke_env.player import Player
 from poke_env.battle.side_condition import SideCondition
-from typing import List, Optional, Dict
+from poke_env.battle.weather import Weather
+from typing import List, NamedTuple, Optional, Dict, Sequence, Tuple
+
+try:
+    from team_table import compile_team
+except ImportError:  # a copied agent file: our stats come from the battle requests
+    compile_team = None
 
 # --------------------
 # Your team (unchanged)
@@ -75,10 +85,116 @@ HEAL_THRESHOLD = 0.65     # heal at/below this if healing keeps you alive
 DIE_SWITCH_PAD = 0.00     # switch if worst-in >= hp + pad and you can't heal out
 COUNTER_MARGIN  = 0.15    # proactive type-counter switch if it reduces incoming by >= this
 ENTRY_SAFETY_PAD = 1e-6   # tiny pad for hazard-KO checks
+SET_INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")  # from build_set_index.py
+SECURE_KO_PROB  = 0.90    # take the move most likely to KO once it clears this (rolls, crits and accuracy included)
 
 # =========================
 # Tiny core (just enough)
 # =========================
+def _type_matrix(chart: Dict[str, Dict[str, float]], ids: Dict[str, int]) -> np.ndarray:
+    """chart as a float array [attack id, defend id]; the extra last row/column is a neutral pad."""
+    m = np.ones((len(ids) + 1, len(ids) + 1))
+    for atk, row in chart.items():
+        for dfn, mult in row.items():
+            m[ids[atk], ids[dfn]] = mult
+    return m
+
+
+class TurnDamage(NamedTuple):
+    """Everything a decision needs from the damage model, computed in one pass per turn."""
+    moves: list               # our available moves
+    move_damage: np.ndarray   # expected fraction each move takes off the opponent (0 for status moves)
+    move_ko: np.ndarray       # chance each move KOs the opponent this turn (exact formula, see Core.damage_rolls)
+    me_incoming: float        # worst expected hit on our active
+    switches: list            # our available switches
+    switch_incoming: np.ndarray  # worst expected hit on each switch
+    switch_hazards: np.ndarray   # entry hazard fraction for each switch
+
+
+class SetIndex:
+    """
+    Likely opponent sets by species, as written by build_set_index.py. Loaded on first use with the
+    records memory-mapped; without the files there is simply nothing to infer. Read-only: the
+    runners rebuild a stale index before they build their agents.
+    """
+    UNKNOWN_ITEM = "unknown_item"
+    _shared: Optional["SetIndex"] = None
+
+    def __init__(self, index_dir: str = SET_INDEX_DIR):
+        self.species: Dict[str, Tuple[int, int]] = {}
+        self.move_bit: Dict[str, int] = {}
+        self.type_names: Tuple[str, ...] = ()
+        self.record_types = np.zeros(0, dtype=np.int64)  # by record: its damaging move types, one bit per type_names
+        self.item_id: Dict[str, int] = {}
+        self.ability_id: Dict[str, int] = {}
+        self.records = None
+        self._memo: Dict[tuple, Tuple[str, ...]] = {}
+        try:
+            with open(os.path.join(index_dir, "set_index.json"), "r", encoding="utf-8") as f:
+                header = json.load(f)
+            # still backed by the mapped file, but sliced as a plain ndarray (np.memmap slicing is ~10x slower)
+            self.records = np.asarray(np.load(os.path.join(index_dir, "set_index.npy"), mmap_mode="r"))
+        except (OSError, ValueError):
+            return
+        self.species = {k: tuple(v) for k, v in header["species"].items()}
+        self.move_bit = {m: i for i, (m, _, _) in enumerate(header["moves"])}
+        self.type_names = tuple(sorted({t for _, t, dmg in header["moves"] if dmg and t}))
+        type_bit = {t: 1 << i for i, t in enumerate(self.type_names)}
+        move_mask = np.array([type_bit.get(t, 0) if dmg else 0 for _, t, dmg in header["moves"]], dtype=np.int64)
+        # worked out once here, so a decision only ORs the masks of the records still in play
+        has_move = np.unpackbits(
+            np.ascontiguousarray(self.records["moves"]).view(np.uint8), axis=1, bitorder="little"
+        )[:, :len(move_mask)].astype(bool)
+        self.record_types = np.bitwise_or.reduce(np.where(has_move, move_mask, 0), axis=1)
+        self.item_id = {it: i for i, it in enumerate(header["items"])}
+        self.ability_id = {ab: i for i, ab in enumerate(header["abilities"])}
+
+    @classmethod
+    def shared(cls) -> "SetIndex":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def candidates(self, species: str, revealed: Sequence[str], item: str = "", ability: str = "") -> np.ndarray:
+        """Row numbers of the records of `species` still consistent with the revealed moves / item / ability."""
+        lo, hi = self.species.get(species, (0, 0))
+        if self.records is None or lo == hi:
+            return np.zeros(0, dtype=np.intp)
+        rows = self.records[lo:hi]
+        need = np.zeros(rows["moves"].shape[1], dtype=np.uint64)
+        for m in revealed:
+            bit = self.move_bit.get(m)
+            if bit is None:
+                return np.zeros(0, dtype=np.intp)  # a move none of the known sets has
+            need[bit // 64] |= np.uint64(1 << (bit % 64))
+        ok = ((rows["moves"] & need) == need).all(axis=1)
+        if item and item != self.UNKNOWN_ITEM:
+            ok &= (rows["item"] == 0) | (rows["item"] == self.item_id.get(item, -1))
+        if ability:
+            ok &= (rows["ability"] == 0) | (rows["ability"] == self.ability_id.get(ability, -1))
+        return lo + np.flatnonzero(ok)
+
+    def attack_types(self, mon) -> Tuple[str, ...]:
+        """Types of the damaging moves the remaining candidate sets of `mon` carry (memoized per reveal state)."""
+        key = (mon.species, tuple(mon.moves), mon.item, mon.ability)
+        types = self._memo.get(key)
+        if types is None:
+            mask = int(np.bitwise_or.reduce(self.record_types[self.candidates(*key)], initial=0))
+            types = self._memo[key] = tuple(t for i, t in enumerate(self.type_names) if mask >> i & 1)
+        return types
+
+
+class MoveInfo(NamedTuple):
+    """The static bits of a move the damage model reads, cached per move id."""
+    base_power: float
+    category: str   # "PHYSICAL" / "SPECIAL" / "STATUS"
+    type: str       # normalized type name ("" if unknown)
+    type_id: int
+    acc: float      # Core.acc (the proxy's accuracy weight)
+    hit: float      # real hit chance in [0, 1]
+    crit: float     # critical hit chance
+
+
 class Core:
     TYPE_CHART: Dict[str, Dict[str, float]] = {
         "normal":  {"rock": 0.5, "ghost": 0.0, "steel": 0.5},
@@ -100,6 +216,32 @@ class Core:
         "steel":   {"ice": 2, "rock": 2, "fairy": 2, "fire": 0.5, "water": 0.5, "electric": 0.5, "steel": 0.5},
         "fairy":   {"fighting": 2, "dragon": 2, "dark": 2, "fire": 0.5, "poison": 0.5, "steel": 0.5},
     }
+    # Interned type ids: 0..17 follow TYPE_CHART, NO_TYPE pads single types and stands in for unknown ones
+    TYPE_ID: Dict[str, int] = dict(zip(TYPE_CHART, range(len(TYPE_CHART))))
+    TYPE_NAMES: Tuple[str, ...] = tuple(TYPE_CHART)
+    NO_TYPE = len(TYPE_CHART)
+    GROUND, FLYING, ROCK = TYPE_ID["ground"], TYPE_ID["flying"], TYPE_ID["rock"]
+    FIRE, WATER = TYPE_ID["fire"], TYPE_ID["water"]
+    TYPE_MATRIX = _type_matrix(TYPE_CHART, TYPE_ID)
+    TYPE_ROWS: List[List[float]] = TYPE_MATRIX.tolist()  # same numbers, cheaper for one-off lookups
+
+    # ----- exact damage calc knobs -----
+    # Opponent spreads are unknown: assume 31 IVs, an even 84 EVs everywhere and a neutral nature
+    OPP_IV, OPP_EV = 31, 84
+    ROLLS = np.arange(85, 101)                    # Showdown's 16 random rolls, in percent
+    CRIT_CHANCE = {0: 1/24, 1: 1/24, 2: 1/8, 3: 1/2}  # by move critRatio, 4+ always crits
+    TYPE_ITEMS: Dict[str, str] = {
+        "flameplate": "fire", "splashplate": "water", "zapplate": "electric", "meadowplate": "grass",
+        "icicleplate": "ice", "fistplate": "fighting", "toxicplate": "poison", "earthplate": "ground",
+        "skyplate": "flying", "mindplate": "psychic", "insectplate": "bug", "stoneplate": "rock",
+        "spookyplate": "ghost", "dracoplate": "dragon", "dreadplate": "dark", "ironplate": "steel",
+        "pixieplate": "fairy",
+        "charcoal": "fire", "mysticwater": "water", "magnet": "electric", "miracleseed": "grass",
+        "nevermeltice": "ice", "blackbelt": "fighting", "poisonbarb": "poison", "softsand": "ground",
+        "sharpbeak": "flying", "twistedspoon": "psychic", "silverpowder": "bug", "hardstone": "rock",
+        "spelltag": "ghost", "dragonfang": "dragon", "blackglasses": "dark", "metalcoat": "steel",
+        "silkscarf": "normal", "fairyfeather": "fairy",
+    }
 
     def teampreview(self, battle):
         return "/team 612345"
@@ -116,17 +258,37 @@ class Core:
                 ts.append(Core._norm(getattr(t, "name", str(t))))
         return ts
 
+    @staticmethod
+    def type_id(t) -> int:
+        return Core.TYPE_ID.get(Core._norm(getattr(t, "name", t)), Core.NO_TYPE)
+
+    @staticmethod
+    def type_pair(mon) -> Tuple[int, int]:
+        ids = [Core.TYPE_ID.get(t, Core.NO_TYPE) for t in Core.types(mon)] + [Core.NO_TYPE, Core.NO_TYPE]
+        return ids[0], ids[1]
+
+    @staticmethod
+    def levitates(mon) -> bool:
+        return bool(getattr(mon, "ability", "") and "Levitate" in str(mon.ability))
+
     @staticmethod
     def hp(mon) -> float:
         return float(getattr(mon, "current_hp_fraction", 0.0) or 0.0)
 
     @staticmethod
-    def stat(mon, key: str) -> float:
+    def stat(mon, key: str, stats: Optional[Dict[str, int]] = None) -> float:
+        """stats: our mon's final stats when already known (see own_stats)."""
         if not mon: return 0.0
-        v = ((getattr(mon, "stats", {}) or {}).get(key))
+        v = (stats if stats is not None else (getattr(mon, "stats", {}) or {})).get(key)
         if v is None: v = ((getattr(mon, "base_stats", {}) or {}).get(key, 0))
         return float(v or 0.0)
 
+    @staticmethod
+    def own_stats(mon, table=None) -> Dict[str, int]:
+        """Final stats of one of our mons: from the compiled team, else what the request reported."""
+        member = table.get(mon) if table is not None else None
+        return member.stats if member is not None else (getattr(mon, "stats", {}) or {})
+
     @staticmethod
     def is_damaging(move) -> bool:
         try:
@@ -142,83 +304,319 @@ class Core:
         except Exception: return 1.0
 
     @staticmethod
-    def type_eff(atk_type: Optional[str], def_types: List[str], defender=None) -> float:
-        if not atk_type: return 1.0
-        atk_type = Core._norm(getattr(atk_type, "name", atk_type))
-        # simple ground immunity check
-        if atk_type == "ground" and (("flying" in def_types) or (getattr(defender, "ability", "") and "Levitate" in str(defender.ability))):
-            return 0.0
-        mult = 1.0
-        chart = Core.TYPE_CHART.get(atk_type, {})
-        for t in def_types or []:
-            mult *= chart.get(t, 1.0)
-        return mult
+    def type_eff_many(
+        atk_ids: Sequence[int], def_pairs: Sequence[Tuple[int, int]], ground_immune: Optional[Sequence[bool]] = None
+    ) -> np.ndarray:
+        """
+        Effectiveness of every attack type against every defender in one go: result[i, j] is
+        atk_ids[i] into def_pairs[j]. ground_immune marks defenders that Ground moves miss (Flying / Levitate).
+        """
+        atk = np.asarray(atk_ids, dtype=np.intp)
+        pairs = np.asarray(def_pairs, dtype=np.intp).reshape(-1, 2)
+        rows = Core.TYPE_MATRIX[atk]
+        eff = rows[:, pairs[:, 0]] * rows[:, pairs[:, 1]]
+        if ground_immune is not None and any(ground_immune):
+            eff[(atk == Core.GROUND)[:, None] & np.asarray(ground_immune, dtype=bool)[None, :]] = 0.0
+        return eff
 
     @staticmethod
-    def estimate_damage_fraction(attacker, defender, move) -> float:
-        """Very rough expected damage fraction (includes accuracy)."""
-        if not attacker or not defender or not move or not Core.is_damaging(move):
-            return 0.0
-        bp = float(getattr(move, "base_power", 0) or 0)
-        if bp <= 0: return 0.0
-        is_phys = (getattr(getattr(move, "category", None), "name", "") == "PHYSICAL")
-        atk = Core.stat(attacker, "atk" if is_phys else "spa")
-        dfn = Core.stat(defender, "def" if is_phys else "spd")
-        mtype = getattr(move, "type", None); mtype = Core._norm(getattr(mtype, "name", mtype))
-        eff = Core.type_eff(mtype, Core.types(defender), defender=defender)
-        if eff <= 0.0: return 0.0
-        stab = 1.5 if (mtype and mtype in Core.types(attacker)) else 1.0
-        acc = Core.acc(move)
-        stat_ratio = max(0.1, atk / max(1.0, dfn))
-        # tuned constant just to scale into [0,1] ish
-        raw = (bp / 90.0) * 0.45 * stab * eff * stat_ratio * acc
-        return float(max(0.0, min(1.0, raw)))
+    def ground_immune(mon, pair: Tuple[int, int]) -> bool:
+        return Core.FLYING in pair or Core.levitates(mon)
 
     @staticmethod
     def opp_attack_types(opp) -> List[str]:
         seen = []
         for mv in (getattr(opp, "moves", {}) or {}).values():
-            if Core.is_damaging(mv):
-                t = getattr(mv, "type", None); t = Core._norm(getattr(t, "name", t))
-                if t and t not in seen:
-                    seen.append(t)
+            info = Core.move_info(mv)
+            if info.base_power > 0 and info.type and info.type not in seen:
+                seen.append(info.type)
+        # plus whatever the sets it could still be running carry
+        for t in SetIndex.shared().attack_types(opp):
+            if t not in seen:
+                seen.append(t)
         return seen or Core.types(opp)
 
     @staticmethod
-    def worst_expected_hit(defender, opp) -> float:
-        worst = 0.0
-        for t in Core.opp_attack_types(opp):
-            # pretend a 90 BP STAB-ish move of that type
-            lane_phys = (Core.stat(opp, "atk") >= Core.stat(opp, "spa"))
-            atk = Core.stat(opp, "atk" if lane_phys else "spa")
-            dfn = Core.stat(defender, "def" if lane_phys else "spd")
-            eff = Core.type_eff(t, Core.types(defender), defender=defender)
-            if eff == 0.0:
-                continue
-            stab = 1.5 if t in Core.types(opp) else 1.0
-            raw = (90.0/90.0) * 0.45 * stab * eff * max(0.1, atk/max(1.0, dfn))
-            worst = max(worst, min(1.0, raw))
-        return worst
+    def incoming_hits(mons, opp, pairs=None, immune=None, stats=None) -> np.ndarray:
+        """
+        Worst expected hit from opp on each of `mons`: a pretend 90 BP move of every type opp may
+        attack with, on its better attacking stat, STAB where it applies, clipped to [0, 1].
+        pairs / immune / stats: precomputed type_pair / ground_immune / own_stats.
+        """
+        worst = np.zeros(len(mons))
+        atk_types = Core.opp_attack_types(opp)
+        if not atk_types or not mons:
+            return worst
+        pairs = pairs if pairs is not None else [Core.type_pair(p) for p in mons]
+        immune = immune if immune is not None else [Core.ground_immune(p, pair) for p, pair in zip(mons, pairs)]
+        lane_phys = (Core.stat(opp, "atk") >= Core.stat(opp, "spa"))
+        atk = Core.stat(opp, "atk" if lane_phys else "spa")
+        stats = stats if stats is not None else [None] * len(mons)
+        dfn = np.array([Core.stat(p, "def" if lane_phys else "spd", s) for p, s in zip(mons, stats)])
+        opp_types = Core.types(opp)
+        stab = np.array([1.5 if t in opp_types else 1.0 for t in atk_types])
+        eff = Core.type_eff_many([Core.TYPE_ID.get(t, Core.NO_TYPE) for t in atk_types], pairs, immune)
+        raw = (90.0/90.0) * 0.45 * stab[:, None] * eff * np.maximum(0.1, atk / np.maximum(1.0, dfn))[None, :]
+        return np.minimum(1.0, raw).max(axis=0)
+
+    _MOVE_INFO: Dict[str, MoveInfo] = {}
+
+    @staticmethod
+    def move_info(mv) -> MoveInfo:
+        key = getattr(mv, "id", None)
+        info = Core._MOVE_INFO.get(key)
+        if info is None:
+            t = getattr(mv, "type", None); t = Core._norm(getattr(t, "name", t))
+            info = MoveInfo(
+                base_power=float(getattr(mv, "base_power", 0) or 0),
+                category=getattr(getattr(mv, "category", None), "name", ""),
+                type=t,
+                type_id=Core.TYPE_ID.get(t, Core.NO_TYPE),
+                acc=Core.acc(mv),
+                hit=Core.hit_chance(mv),
+                crit=Core.CRIT_CHANCE.get(int(getattr(mv, "crit_ratio", 0) or 0), 1.0),
+            )
+            if key:
+                Core._MOVE_INFO[key] = info
+        return info
 
     @staticmethod
-    def entry_hazard_frac(battle, cand) -> float:
-        """SR + Spikes that will hit us (rough)."""
-        frac = 0.0
+    def outgoing_damage(attacker, defender, moves, atk_stats=None) -> np.ndarray:
+        """
+        Rough expected fraction of defender's HP each of `moves` takes, accuracy included, clipped to
+        [0, 1]; 0 for status moves and immunities. atk_stats: the attacker's own_stats.
+        """
+        out = np.zeros(len(moves))
+        if not attacker or not defender or not moves:
+            return out
+        my_types = Core.types(attacker)
+        infos = [Core.move_info(mv) for mv in moves]
+        bp = np.array([i.base_power for i in infos])
+        phys = np.array([i.category == "PHYSICAL" for i in infos])
+        acc = np.array([i.acc for i in infos])
+        atk = np.where(phys, Core.stat(attacker, "atk", atk_stats), Core.stat(attacker, "spa", atk_stats))
+        dfn = np.where(phys, Core.stat(defender, "def"), Core.stat(defender, "spd"))
+        pair = Core.type_pair(defender)
+        eff = Core.type_eff_many([i.type_id for i in infos], [pair], [Core.ground_immune(defender, pair)])[:, 0]
+        stab = np.array([1.5 if (i.type and i.type in my_types) else 1.0 for i in infos])
+        raw = (bp / 90.0) * 0.45 * stab * eff * np.maximum(0.1, atk / np.maximum(1.0, dfn)) * acc
+        return np.where((bp > 0) & (eff > 0.0), np.clip(raw, 0.0, 1.0), 0.0)
+
+    @staticmethod
+    def hazard_fracs(battle, mons, pairs=None, immune=None) -> np.ndarray:
+        """Fraction of max HP Stealth Rock and Spikes take from each of `mons` on entry (pairs / immune as in incoming_hits)."""
         sc = battle.side_conditions or {}
-        # Stealth Rock
+        hz = np.zeros(len(mons))
+        if not mons:
+            return hz
+        pairs = pairs if pairs is not None else [Core.type_pair(p) for p in mons]
         if sc.get(SideCondition.STEALTH_ROCK, 0):
-            eff = Core.type_eff("rock", Core.types(cand), defender=cand)
-            frac += 0.125 * eff
-        # Spikes (grounded only; rough)
-        is_flying = ("flying" in Core.types(cand))
-        has_levi = (getattr(cand, "ability", "") and "Levitate" in str(cand.ability))
-        grounded = not (is_flying or has_levi)
-        if grounded:
-            layers = int(sc.get(SideCondition.SPIKES, 0) or 0)
-            if layers == 1: frac += 1/8
-            elif layers == 2: frac += 1/6
-            elif layers >= 3: frac += 1/4
-        return float(max(0.0, min(1.0, frac)))
+            hz += 0.125 * Core.type_eff_many([Core.ROCK], pairs)[0]
+        layers = int(sc.get(SideCondition.SPIKES, 0) or 0)
+        if layers:
+            immune = immune if immune is not None else [Core.ground_immune(p, pair) for p, pair in zip(mons, pairs)]
+            hz += np.where(np.asarray(immune, dtype=bool), 0.0, 1/8 if layers == 1 else (1/6 if layers == 2 else 1/4))
+        return np.clip(hz, 0.0, 1.0)
+
+    # ----- exact damage calc (Showdown's integer formula) -----
+    @staticmethod
+    def _chain(mods: List[int]) -> int:
+        """Showdown's chainModify: 4096-based modifiers combined with rounding."""
+        m = 4096
+        for nxt in mods:
+            m = (m * nxt + 2048) >> 12
+        return m
+
+    @staticmethod
+    def _modify(value, mod):
+        """Showdown's modify(): apply a 4096-based modifier, rounding .5 down. Works on ints and int arrays."""
+        return (value * mod + 2047) // 4096
+
+    @staticmethod
+    def calc_stat(base: int, key: str, level: int, iv: int = 31, ev: int = 84, nature: float = 1.0) -> int:
+        core = (2 * base + iv + ev // 4) * level // 100
+        if key == "hp":
+            return core + level + 10
+        return int((core + 5) * nature)
+
+    @staticmethod
+    def real_stat(mon, key: str, stats: Optional[Dict[str, int]] = None) -> int:
+        """Our mons report their real stats; for the opponent fall back to OPP_IV / OPP_EV on base stats."""
+        v = (stats if stats is not None else (getattr(mon, "stats", {}) or {})).get(key)
+        if v:
+            return int(v)
+        base = (getattr(mon, "base_stats", {}) or {}).get(key, 0) or 0
+        return Core.calc_stat(base, key, getattr(mon, "level", 100) or 100, Core.OPP_IV, Core.OPP_EV)
+
+    @staticmethod
+    def hp_points(mon) -> Tuple[int, int]:
+        """(current, max) HP in real points; the opponent's are only known as a fraction."""
+        if (getattr(mon, "stats", {}) or {}).get("atk"):
+            return int(mon.current_hp or 0), int(mon.max_hp or 1)
+        max_hp = Core.real_stat(mon, "hp")
+        return int(round(Core.hp(mon) * max_hp)), max_hp
+
+    @staticmethod
+    def boost_stat(stat: int, stage: int) -> int:
+        stage = max(-6, min(6, stage))
+        return stat * (2 + stage) // 2 if stage >= 0 else stat * 2 // (2 - stage)
+
+    @staticmethod
+    def damage_rolls(attacker, defender, moves, weather=None, screens=None, atk_stats=None) -> np.ndarray:
+        """
+        Every damage roll of every move: result[i, c, r] is move i, c=0 normal / c=1 critical hit,
+        roll r of Showdown's 16. Follows sim/battle-actions getDamage/modifyDamage for level, stats,
+        boosts (crit ignoring the bad ones), STAB and Tera, type items, Life Orb / Expert Belt /
+        Choice items, Huge Power, Guts, burn, sun / rain and the defender's screens.
+        weather is battle.weather, screens the defender's side conditions, atk_stats the attacker's own_stats.
+        Fixed-damage and multi-hit mechanics are not modelled (single hit of base_power).
+        """
+        if not attacker or not defender or not moves:
+            return np.zeros((len(moves), 2, len(Core.ROLLS)), dtype=np.int64)
+        weather = weather or {}
+        screens = screens or {}
+        level = getattr(attacker, "level", 100) or 100
+        item = (getattr(attacker, "item", "") or "")
+        ability = (getattr(attacker, "ability", "") or "")
+        statused = getattr(getattr(attacker, "status", None), "name", "") not in ("", "FNT")
+        burned = getattr(getattr(attacker, "status", None), "name", "") == "BRN"
+        boosts = getattr(attacker, "boosts", {}) or {}
+        def_boosts = getattr(defender, "boosts", {}) or {}
+        original = [Core.type_id(t) for t in (getattr(attacker, "original_types", None) or []) if t]
+        current = [Core.TYPE_ID.get(t, Core.NO_TYPE) for t in Core.types(attacker)]
+        tera = Core.type_id(getattr(attacker, "tera_type", None)) if getattr(attacker, "is_terastallized", False) else None
+        pair = Core.type_pair(defender)
+        immune = Core.ground_immune(defender, pair)
+        sun = Weather.SUNNYDAY in weather or Weather.DESOLATELAND in weather
+        rain = Weather.RAINDANCE in weather or Weather.PRIMORDIALSEA in weather
+
+        # per-move scalars in plain ints, then the 16 rolls of every move in a handful of array ops
+        n = len(moves)
+        base = [[0, 0] for _ in range(n)]      # after weather and crit, i.e. right before the random roll
+        stab_mod = [4096] * n
+        eff_num, eff_den = [1] * n, [1] * n     # type effectiveness as exact doublings / halvings
+        burn_mod = [4096] * n
+        final_mod = [[4096, 4096] for _ in range(n)]
+        lvl = 2 * level // 5 + 2
+        for i, mv in enumerate(moves):
+            info = Core.move_info(mv)
+            bp, cat, t = int(info.base_power), info.category, info.type_id
+            if bp <= 0 or cat not in ("PHYSICAL", "SPECIAL"):
+                continue
+            eff = Core.TYPE_ROWS[t][pair[0]] * Core.TYPE_ROWS[t][pair[1]]
+            if eff == 0.0 or (t == Core.GROUND and immune):
+                continue
+            phys = cat == "PHYSICAL"
+
+            if Core.TYPE_ITEMS.get(item) == Core.TYPE_NAMES[t]:
+                bp = max(1, Core._modify(bp, 4915))
+
+            a_key, d_key = ("atk", "def") if phys else ("spa", "spd")
+            atk_mods = []
+            if phys and ability in ("hugepower", "purepower"):
+                atk_mods.append(8192)
+            if phys and ability == "guts" and statused:
+                atk_mods.append(6144)
+            if item == ("choiceband" if phys else "choicespecs"):
+                atk_mods.append(6144)
+            atk_stat = Core.real_stat(attacker, a_key, atk_stats)
+            def_stat = Core.real_stat(defender, d_key)
+            a_stage, d_stage = boosts.get(a_key, 0), def_boosts.get(d_key, 0)
+            weather_mod = 4096
+            if (sun and t == Core.FIRE) or (rain and t == Core.WATER):
+                weather_mod = 6144
+            elif (sun and t == Core.WATER) or (rain and t == Core.FIRE):
+                weather_mod = 2048
+            # crits ignore our drops and their boosts, then take 1.5x after weather
+            for c, (sa, sd) in enumerate(((a_stage, d_stage), (max(0, a_stage), min(0, d_stage)))):
+                a = max(1, Core._modify(Core.boost_stat(atk_stat, sa), Core._chain(atk_mods)))
+                d = max(1, Core.boost_stat(def_stat, sd))
+                base[i][c] = Core._modify(lvl * bp * a // d // 50 + 2, weather_mod)
+            base[i][1] = base[i][1] * 3 // 2
+
+            stab = 1.0
+            if t in current or t in original:
+                stab = 1.5
+            if tera is not None and t == tera and t in original:
+                stab = 2.0
+            if ability == "adaptability" and stab > 1.0:
+                stab = 2.25 if stab == 2.0 else 2.0
+            stab_mod[i] = int(stab * 4096)
+
+            if eff > 1:
+                eff_num[i] = int(eff)
+            elif eff < 1:
+                eff_den[i] = int(round(1 / eff))
+            if phys and burned and ability != "guts":
+                burn_mod[i] = 2048
+
+            mods = []
+            if item == "lifeorb":
+                mods.append(5324)
+            if item == "expertbelt" and eff > 1:
+                mods.append(4915)
+            screen = (SideCondition.AURORA_VEIL in screens) or \
+                     (SideCondition.REFLECT in screens if phys else SideCondition.LIGHT_SCREEN in screens)
+            final_mod[i][1] = Core._chain(mods)
+            final_mod[i][0] = Core._chain(mods + [2048]) if screen else final_mod[i][1]
+
+        base_arr = np.array(base, dtype=np.int64)[:, :, None]
+        dmg = base_arr * Core.ROLLS // 100                                              # 16 random rolls
+        dmg = Core._modify(dmg, np.array(stab_mod)[:, None, None])
+        dmg = dmg * np.array(eff_num)[:, None, None] // np.array(eff_den)[:, None, None]  # floor halvings == Showdown's
+        if burned:
+            dmg = Core._modify(dmg, np.array(burn_mod)[:, None, None])
+        dmg = Core._modify(dmg, np.array(final_mod)[:, :, None])
+        return np.where(base_arr > 0, np.maximum(dmg, 1), 0)
+
+    @staticmethod
+    def ko_chances(attacker, defender, moves, weather=None, screens=None, atk_stats=None) -> np.ndarray:
+        """Chance each move KOs `defender` from its current HP this hit: rolls x crit chance x accuracy."""
+        if not moves:
+            return np.zeros(0)
+        rolls = Core.damage_rolls(attacker, defender, moves, weather, screens, atk_stats)
+        hp_now, _ = Core.hp_points(defender)
+        ko = (rolls >= max(1, hp_now)).mean(axis=2)
+        infos = [Core.move_info(mv) for mv in moves]
+        crit = np.array([i.crit for i in infos])
+        acc = np.array([i.hit for i in infos])
+        return acc * ((1.0 - crit) * ko[:, 0] + crit * ko[:, 1])
+
+    @staticmethod
+    def hit_chance(move) -> float:
+        a = getattr(move, "accuracy", 1.0)
+        if a is True or a is None:
+            return 1.0
+        a = float(a)
+        return max(0.0, min(1.0, a / 100.0 if a > 1.0 else a))
+
+    @staticmethod
+    def turn_damage(battle, me, opp, table=None) -> TurnDamage:
+        """
+        Both directions of the damage model for this turn: our moves into opp, opp's hits into our side.
+        table is our compiled team; without it our stats come from the request.
+        """
+        moves = list(battle.available_moves or [])
+        switches = list(battle.available_switches or [])
+        mons = switches + ([me] if me else [])
+        # types and our stats are derived once per mon here and shared by both directions
+        pairs = [Core.type_pair(p) for p in mons]
+        immune = [Core.ground_immune(p, pair) for p, pair in zip(mons, pairs)]
+        stats = [Core.own_stats(p, table) for p in mons]
+        my_stats = stats[-1] if me else None
+        incoming = Core.incoming_hits(mons, opp, pairs, immune, stats) if opp else np.zeros(len(mons))
+        n = len(switches)
+        return TurnDamage(
+            moves=moves,
+            move_damage=Core.outgoing_damage(me, opp, moves, my_stats),
+            move_ko=Core.ko_chances(
+                me, opp, moves, battle.weather, battle.opponent_side_conditions, my_stats,
+            ) if (me and opp) else np.zeros(len(moves)),
+            me_incoming=float(incoming[-1]) if me else 0.0,
+            switches=switches,
+            switch_incoming=incoming[:n],
+            switch_hazards=Core.hazard_fracs(battle, switches, pairs[:n], immune[:n]),
+        )
 
 # =========================================================
 #                Minimal “Switch / Heal / Hit (+counter)” agent
@@ -226,6 +624,8 @@ class Core:
 class CustomAgent(Player, Core):
     def __init__(self, *args, **kwargs):
         super().__init__(team=team, *args, **kwargs)
+        self._team_table = compile_team(team) if compile_team else None
+        self._turn_dmg: Optional[Tuple[AbstractBattle, TurnDamage]] = None
 
     # ----- tiny helpers -----
     def _me(self, battle):  return battle.active_pokemon
@@ -237,15 +637,26 @@ class CustomAgent(Player, Core):
                 return m
         return None
 
+    def _damage(self, battle) -> TurnDamage:
+        # choose_move computes one per decision; anything called outside it gets a fresh one
+        if self._turn_dmg is not None and self._turn_dmg[0] is battle:
+            return self._turn_dmg[1]
+        return Core.turn_damage(battle, self._me(battle), self._opp(battle), self._team_table)
+
     def _best_damaging_move(self, battle, me, opp):
+        dmg = self._damage(battle)
+        # a (near) sure KO beats the biggest expected chunk
+        if len(dmg.moves) and dmg.move_ko.max() >= SECURE_KO_PROB:
+            i = int(np.argmax(dmg.move_ko))
+            return dmg.moves[i], float(dmg.move_damage[i])
         best, score = None, -1.0
-        for mv in (battle.available_moves or []):
+        for i, mv in enumerate(dmg.moves):
             if not Core.is_damaging(mv):
                 continue
-            d = Core.estimate_damage_fraction(me, opp, mv)  # accuracy-weighted expected damage
+            d = dmg.move_damage[i]  # accuracy-weighted expected damage
             if d > score:
                 best, score = mv, d
-        return best, max(0.0, score)
+        return best, max(0.0, float(score))
 
     def _heal_move(self, battle):
         for hid in ("recover","roost","slackoff","moonlight","rest"):
@@ -255,35 +666,41 @@ class CustomAgent(Player, Core):
 
     def _safest_switch(self, battle, opp):
         """Pick the switch that minimizes (hazard chip + worst expected hit)."""
-        cands = battle.available_switches or []
-        if not cands:
+        dmg = self._damage(battle)
+        if not dmg.switches:
             return None
-        def cost(p):
-            hz = Core.entry_hazard_frac(battle, p)
-            worst = Core.worst_expected_hit(p, opp)
-            if Core.hp(p) <= hz + ENTRY_SAFETY_PAD:
-                return 999.0  # would KO on entry
-            return hz + worst
-        return min(cands, key=cost)
+        hp = np.array([Core.hp(p) for p in dmg.switches])
+        # 999 marks candidates that would KO on entry
+        cost = np.where(hp <= dmg.switch_hazards + ENTRY_SAFETY_PAD, 999.0, dmg.switch_hazards + dmg.switch_incoming)
+        return dmg.switches[int(np.argmin(cost))]
 
     def _counter_switch_if_better(self, battle, me, opp) -> Optional[object]:
         """If a switch clearly reduces incoming damage, do it (type counter)."""
         if getattr(me, "trapped", False):
             return None
-        current_cost = Core.worst_expected_hit(me, opp)
+        dmg = self._damage(battle)
+        current_cost = dmg.me_incoming
         sw = self._safest_switch(battle, opp)
         if not sw:
             return None
-        hz = Core.entry_hazard_frac(battle, sw)
+        i = dmg.switches.index(sw)
+        hz = dmg.switch_hazards[i]
         if Core.hp(sw) <= hz + ENTRY_SAFETY_PAD:
             return None
-        new_cost = hz + Core.worst_expected_hit(sw, opp)
+        new_cost = hz + dmg.switch_incoming[i]
         if (current_cost - new_cost) >= COUNTER_MARGIN:
             return sw
         return None
 
     # ----- main decision -----
     def choose_move(self, battle: AbstractBattle):
+        self._turn_dmg = (battle, Core.turn_damage(battle, self._me(battle), self._opp(battle), self._team_table))
+        try:
+            return self._choose_move(battle)
+        finally:
+            self._turn_dmg = None
+
+    def _choose_move(self, battle: AbstractBattle):
         me, opp = self._me(battle), self._opp(battle)
 
         # 1) Forced switch: choose the safest switch.
@@ -304,7 +721,7 @@ class CustomAgent(Player, Core):
             return self.create_order(counter_sw)
 
         my_hp = Core.hp(me)
-        worst_in = Core.worst_expected_hit(me, opp)
+        worst_in = self._damage(battle).me_incoming
 
         # 3) Heal if low AND healing keeps us alive this turn (Rest=full, others≈50%).
         heal = self._heal_move(battle)
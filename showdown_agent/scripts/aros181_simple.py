@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 
 from poke_env.battle.abstract_battle import AbstractBattle
 from poke_env.battle.double_battle import DoubleBattle
@@ -7,6 +7,11 @@ from poke_env.battle.pokemon import Pokemon
 from poke_env.battle.side_condition import SideCondition
 from poke_env.player.player import Player
 
+try:
+    from team_table import compile_team
+except ImportError:  # a copied agent file: our stats come from the battle requests
+    compile_team = None
+
 
 team = """
 Deoxys-Speed @ Focus Sash  
@@ -73,10 +78,10 @@ Jolly Nature
 - Close Combat  
 """
 
-
 class CustomAgent(Player):
     def __init__(self, *args, **kwargs):
         super().__init__(team=team, *args, **kwargs)
+        self._team_table = compile_team(team) if compile_team else None
 
     # Always lead in order 6 -> 1..5
     def teampreview(self, battle: AbstractBattle) -> str:
@@ -136,14 +141,20 @@ class CustomAgent(Player):
         ]:
             if active.boosts["def"] <= -3 or active.boosts["spd"] <= -3:
                 return True
-            if active.boosts["atk"] <= -3 and active.stats["atk"] >= active.stats["spa"]:
+            stats = self._own_stats(active)
+            if active.boosts["atk"] <= -3 and stats["atk"] >= stats["spa"]:
                 return True
-            if active.boosts["spa"] <= -3 and active.stats["atk"] <= active.stats["spa"]:
+            if active.boosts["spa"] <= -3 and stats["atk"] <= stats["spa"]:
                 return True
             if self._estimate_matchup(active, opponent) < self.SWITCH_OUT_MATCHUP_THRESHOLD:
                 return True
         return False
 
+    def _own_stats(self, mon: Pokemon) -> Dict[str, int]:
+        """Our final stats from the compiled team (falls back to what the request reported)."""
+        member = self._team_table.get(mon) if self._team_table is not None else None
+        return member.stats if member is not None else mon.stats
+
     def _stat_estimation(self, mon: Pokemon, stat: str):
         b = mon.boosts[stat]
         boost = (2 + b) / 2 if b >= 0 else 2 / (2 - b)
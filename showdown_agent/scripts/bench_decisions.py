@@ -0,0 +1,399 @@
+# Offline choose_move benchmark - no Showdown server required.
+#
+#   python bench_decisions.py                    # benchmark every agent against the stored baselines
+#   python bench_decisions.py --save-baseline    # record the current numbers as the new baselines
+#   python bench_decisions.py --generate 200     # rebuild the battle state corpus
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from poke_env import AccountConfiguration
+from poke_env.battle import Battle
+from poke_env.data import GenData, to_id_str
+from poke_env.player.player import Player
+from poke_env.stats import compute_raw_stats
+from poke_env.teambuilder import Teambuilder
+from tabulate import tabulate
+
+BASE_DIR = os.path.dirname(__file__)
+BENCH_DIR = os.path.join(BASE_DIR, "benchmarks")
+CORPUS_FILE = os.path.join(BENCH_DIR, "battle_states.jsonl")
+BASELINE_FILE = os.path.join(BENCH_DIR, "decision_baselines.json")
+
+AGENT_FILES = {
+    "aros181_counter": os.path.join("players", "aros181_counter.py"),
+    "aros181_general": "aros181_general.py",
+    "aros181_simple": "aros181_simple.py",
+    "qhua835": "qhua835.py",
+}
+
+BATTLE_FORMAT = "gen9ubers"
+USERNAME = "bench"
+REGRESSION_TOLERANCE = 1.25  # p50 slower than baseline by this factor fails the run
+
+BOOSTABLE = ("atk", "def", "spa", "spd", "spe")
+STATUSES = ("", "", "", "", "brn", "par", "psn", "tox", "slp")
+SIDE_CONDITIONS = {
+    "stealthrock": "Stealth Rock",
+    "spikes": "Spikes",
+    "toxicspikes": "Toxic Spikes",
+    "stickyweb": "Sticky Web",
+    "reflect": "Reflect",
+    "lightscreen": "Light Screen",
+}
+
+GEN_DATA = GenData.from_gen(9)
+
+
+def load_module(module_path: str):
+    module_name = os.path.basename(module_path)
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def read_bot_teams() -> Dict[str, str]:
+    bot_teams_folders = os.path.join(BASE_DIR, "bots", "teams")
+    bot_teams = {}
+    for team_file in sorted(os.listdir(bot_teams_folders)):
+        if team_file.endswith(".txt"):
+            with open(os.path.join(bot_teams_folders, team_file), "r", encoding="utf-8") as file:
+                bot_teams[team_file[:-4]] = file.read()
+    return bot_teams
+
+
+def species_name(mon) -> str:
+    # parse_showdown_team stores the species in nickname when no nickname is given
+    name = mon.species or mon.nickname or ""
+    return name.split(" (")[0].strip()
+
+
+# ---------------------- corpus ----------------------
+def generate_corpus(n_states: int, seed: int) -> List[Dict[str, Any]]:
+    """Random but reproducible mid-game states against the bot teams."""
+    rng = random.Random(seed)
+    opponent_teams = [Teambuilder.parse_showdown_team(t) for t in read_bot_teams().values()]
+
+    def boosts(chance: float) -> Dict[str, int]:
+        if rng.random() > chance:
+            return {}
+        return {stat: rng.choice((-1, 1, 2, 2, 4, 6)) for stat in rng.sample(BOOSTABLE, rng.randint(1, 2))}
+
+    def side_conditions() -> Dict[str, int]:
+        sc: Dict[str, int] = {}
+        if rng.random() < 0.4:
+            sc["stealthrock"] = 1
+        if rng.random() < 0.3:
+            sc["spikes"] = rng.randint(1, 3)
+        if rng.random() < 0.1:
+            sc["toxicspikes"] = rng.randint(1, 2)
+        return sc
+
+    states = []
+    for idx in range(n_states):
+        opponent_team = rng.choice(opponent_teams)
+        opp_order = rng.sample(range(len(opponent_team)), len(opponent_team))
+        n_revealed = rng.randint(1, len(opponent_team))
+
+        opponent = []
+        for slot in opp_order[:n_revealed]:
+            opp_mon = opponent_team[slot]
+            opponent.append(
+                {
+                    "species": species_name(opp_mon),
+                    "hp": round(rng.choice((1.0, rng.uniform(0.05, 1.0))), 2),
+                    "status": rng.choice(STATUSES),
+                    "moves": rng.sample(opp_mon.moves, rng.randint(0, len(opp_mon.moves))),
+                }
+            )
+        opponent[0]["boosts"] = boosts(0.3)
+        for opp_mon in opponent[1:]:
+            if rng.random() < 0.3:
+                opp_mon["hp"] = 0.0
+
+        force_switch = rng.random() < 0.15
+        mons = []
+        for _ in range(6):
+            mons.append(
+                {
+                    "hp": round(rng.choice((1.0, rng.uniform(0.05, 1.0), 0.0)), 2),
+                    "status": rng.choice(STATUSES),
+                }
+            )
+        active = rng.randrange(6)
+        mons[active]["hp"] = 0.0 if force_switch else max(mons[active]["hp"], 0.1)
+        mons[active]["boosts"] = boosts(0.2)
+        if all(m["hp"] <= 0 for i, m in enumerate(mons) if i != active):
+            mons[(active + 1) % 6]["hp"] = 1.0
+
+        states.append(
+            {
+                "id": f"s{idx:04d}",
+                "turn": rng.randint(1, 40),
+                "me": {"active": active, "mons": mons},
+                "opponent": opponent,
+                "side_conditions": side_conditions(),
+                "opponent_side_conditions": side_conditions(),
+                "force_switch": force_switch,
+            }
+        )
+    return states
+
+
+def load_corpus(corpus_file: str = CORPUS_FILE) -> List[Dict[str, Any]]:
+    with open(corpus_file, "r", encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def save_corpus(states: List[Dict[str, Any]], corpus_file: str = CORPUS_FILE):
+    os.makedirs(os.path.dirname(corpus_file), exist_ok=True)
+    with open(corpus_file, "w", encoding="utf-8") as file:
+        for state in states:
+            file.write(json.dumps(state) + "\n")
+
+
+# ---------------------- battle reconstruction ----------------------
+def condition(max_hp: int, hp_fraction: float, status: str) -> str:
+    if hp_fraction <= 0:
+        return "0 fnt"
+    hp = max(1, int(round(max_hp * hp_fraction)))
+    return f"{hp}/{max_hp}" + (f" {status}" if status else "")
+
+
+def build_request(state: Dict[str, Any], team: str) -> Dict[str, Any]:
+    """The |request| JSON Showdown would send us for this state, using the agent's own team."""
+    active = state["me"]["active"]
+    side = []
+    for slot, tb_mon in enumerate(Teambuilder.parse_showdown_team(team)):
+        name = species_name(tb_mon)
+        stats = compute_raw_stats(to_id_str(name), tb_mon.evs, tb_mon.ivs, 100, (tb_mon.nature or "serious").lower(), GEN_DATA)
+        mon_state = state["me"]["mons"][slot]
+        side.append(
+            {
+                "ident": f"p1: {name}",
+                "details": f"{name}, L100",
+                "condition": condition(stats[0], mon_state["hp"], mon_state.get("status", "")),
+                "active": slot == active,
+                "stats": dict(zip(BOOSTABLE, stats[1:])),
+                "moves": [to_id_str(m) for m in tb_mon.moves],
+                "baseAbility": to_id_str(tb_mon.ability or ""),
+                "item": to_id_str(tb_mon.item or ""),
+                "pokeball": "pokeball",
+                "ability": to_id_str(tb_mon.ability or ""),
+                "teraType": tb_mon.tera_type,
+            }
+        )
+
+    # Showdown lists the active pokemon first
+    side.insert(0, side.pop(active))
+
+    request: Dict[str, Any] = {"side": {"name": USERNAME, "id": "p1", "pokemon": side}, "rqid": 1}
+    if state["force_switch"]:
+        request["forceSwitch"] = [True]
+    else:
+        request["active"] = [
+            {
+                "moves": [
+                    {
+                        "move": GEN_DATA.moves[move_id]["name"],
+                        "id": move_id,
+                        "pp": 16,
+                        "maxpp": 16,
+                        "target": GEN_DATA.moves[move_id]["target"],
+                        "disabled": False,
+                    }
+                    for move_id in side[0]["moves"]
+                ]
+            }
+        ]
+    return request
+
+
+def battle_messages(state: Dict[str, Any], my_active: str) -> List[List[str]]:
+    """Protocol lines that reveal the opponent side, boosts and side conditions."""
+    messages: List[List[str]] = [["", "player", "p1", USERNAME, "1", ""], ["", "player", "p2", "opponent", "1", ""]]
+
+    # Bench first, active opponent last so it ends up switched in
+    for opp_mon in reversed(state["opponent"]):
+        ident = f"p2a: {opp_mon['species']}"
+        messages.append(["", "switch", ident, f"{opp_mon['species']}, L100", condition(100, 1.0, "")])
+        for move in opp_mon.get("moves", []):
+            messages.append(["", "move", ident, move, f"p1a: {my_active}"])
+        if opp_mon["hp"] <= 0:
+            messages.append(["", "faint", ident])
+        else:
+            messages.append(["", "-damage", ident, condition(100, opp_mon["hp"], opp_mon.get("status", ""))])
+
+    for side, key, target in (("p1", "side_conditions", USERNAME), ("p2", "opponent_side_conditions", "opponent")):
+        for sc_id, layers in state[key].items():
+            for _ in range(layers):
+                messages.append(["", "-sidestart", f"{side}: {target}", f"move: {SIDE_CONDITIONS[sc_id]}"])
+
+    opponent_active = f"p2a: {state['opponent'][0]['species']}"
+    for stat, amount in state["opponent"][0].get("boosts", {}).items():
+        messages.append(["", "-boost" if amount > 0 else "-unboost", opponent_active, stat, str(abs(amount))])
+    for stat, amount in state["me"]["mons"][state["me"]["active"]].get("boosts", {}).items():
+        messages.append(["", "-boost" if amount > 0 else "-unboost", f"p1a: {my_active}", stat, str(abs(amount))])
+
+    messages.append(["", "turn", str(state["turn"])])
+    return messages
+
+
+def build_battle(state: Dict[str, Any], team: str, logger: logging.Logger) -> Battle:
+    battle = Battle(f"battle-{BATTLE_FORMAT}-{state['id']}", USERNAME, logger, gen=9)
+    battle._player_role = "p1"
+
+    request = build_request(state, team)
+    battle.parse_request(request)
+
+    my_active = request["side"]["pokemon"][0]["ident"][4:]
+    for message in battle_messages(state, my_active):
+        battle.parse_message(message)
+    return battle
+
+
+# ---------------------- benchmark ----------------------
+def make_agent(name: str) -> Player:
+    module = load_module(os.path.join(BASE_DIR, AGENT_FILES[name]))
+    return module.CustomAgent(
+        account_configuration=AccountConfiguration(f"bench-{name}"[:18], None),
+        battle_format=BATTLE_FORMAT,
+        start_listening=False,
+    )
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+def benchmark_agent(agent: Player, team: str, states: List[Dict[str, Any]], repeats: int) -> Dict[str, float]:
+    battles = [build_battle(state, team, agent.logger) for state in states]
+
+    latencies: List[float] = []
+    errors = 0
+    for _ in range(repeats):
+        for battle in battles:
+            start = time.perf_counter()
+            try:
+                agent.choose_move(battle)
+            except Exception:  # pylint: disable=broad-except
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        "decisions": len(latencies),
+        "decisions_per_sec": len(latencies) / total if total > 0 else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000.0,
+        "p99_ms": percentile(latencies, 99) * 1000.0,
+        "errors": errors,
+    }
+
+
+def load_baselines(baseline_file: str = BASELINE_FILE) -> Dict[str, Dict[str, float]]:
+    if not os.path.exists(baseline_file):
+        return {}
+    with open(baseline_file, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_baselines(results: Dict[str, Dict[str, float]], baseline_file: str = BASELINE_FILE):
+    os.makedirs(os.path.dirname(baseline_file), exist_ok=True)
+    with open(baseline_file, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def run_benchmarks(agent_names: List[str], states: List[Dict[str, Any]], repeats: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name in agent_names:
+        print(f"Benchmarking {name} on {len(states)} states x {repeats} repeats...")
+        agent = make_agent(name)
+        team = sys.modules[os.path.basename(AGENT_FILES[name])].team
+        results[name] = benchmark_agent(agent, team, states, repeats)
+    return results
+
+
+def report(results: Dict[str, Dict[str, float]], baselines: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """Prints the results table and returns the agents whose p50 regressed past tolerance."""
+    regressions = []
+    table = []
+    for name, res in results.items():
+        base = baselines.get(name)
+        ratio: Optional[float] = res["p50_ms"] / base["p50_ms"] if base and base.get("p50_ms") else None
+        if ratio is not None and ratio > tolerance:
+            regressions.append(name)
+        table.append(
+            [
+                name,
+                f"{res['decisions_per_sec']:.0f}",
+                f"{res['p50_ms']:.3f}",
+                f"{res['p99_ms']:.3f}",
+                res["errors"],
+                f"{base['p50_ms']:.3f}" if base else "-",
+                f"{ratio:.2f}x" if ratio is not None else "-",
+            ]
+        )
+
+    print(
+        tabulate(
+            table,
+            headers=["Agent", "Decisions/s", "p50 ms", "p99 ms", "Errors", "Baseline p50 ms", "vs baseline"],
+        )
+    )
+    return regressions
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Offline choose_move latency benchmark for the CustomAgent implementations.")
+    ap.add_argument("--agents", nargs="*", default=list(AGENT_FILES), choices=list(AGENT_FILES), help="Agents to benchmark")
+    ap.add_argument("--repeats", type=int, default=5, help="Passes over the corpus per agent (default 5)")
+    ap.add_argument("--corpus", default=CORPUS_FILE, help="Battle state corpus (JSON lines)")
+    ap.add_argument("--generate", type=int, metavar="N", help="Regenerate the corpus with N states and exit")
+    ap.add_argument("--seed", type=int, default=726, help="Seed used by --generate (default 726)")
+    ap.add_argument("--save-baseline", action="store_true", help="Store these results as the new baselines")
+    ap.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE, help="Allowed p50 slowdown vs baseline")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if args.generate:
+        save_corpus(generate_corpus(args.generate, args.seed), args.corpus)
+        print(f"Wrote {args.generate} battle states to {args.corpus}")
+        return
+
+    # Agents logging every decision would benchmark the terminal, not the policy
+    logging.disable(logging.INFO)
+
+    states = load_corpus(args.corpus)
+    results = run_benchmarks(args.agents, states, args.repeats)
+
+    regressions = report(results, load_baselines(), args.tolerance)
+
+    if args.save_baseline:
+        save_baselines({**load_baselines(), **results})
+        print(f"Baselines saved to {BASELINE_FILE}")
+        return
+
+    if regressions:
+        print(f"\nDecision latency regressed for: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# Builds the opponent set index the agents use to infer unrevealed moves.
+#
+#   python build_set_index.py                              # sets from bots/teams/*.txt
+#   python build_set_index.py --usage gen9ubers-0.json     # plus a Smogon chaos usage file
+#
+# Output goes to data/: set_index.json (vocabularies, species -> row range) and set_index.npy,
+# one fixed-size record per set that the agents np.load(..., mmap_mode="r") on first use.
+# The header also records the sha256 of every source file; ensure_index() rebuilds the index when
+# a team file (or the usage file) has changed since. The runners call it before they build their
+# agents, which only ever read the index.
+
+import argparse
+import glob
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from poke_env.data import GenData, to_id_str
+from poke_env.teambuilder import Teambuilder
+
+from discovery import file_hash
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEAMS_DIR = os.path.join(BASE_DIR, "bots", "teams")
+INDEX_DIR = os.path.join(BASE_DIR, "data")
+HEADER_FILE = "set_index.json"
+RECORDS_FILE = "set_index.npy"
+
+INDEX_VERSION = 2  # 2: variable-power attacks (Heavy Slam, Low Kick, ...) count as damaging
+USAGE_MIN_SHARE = 0.10  # a move must show up on this share of a species' sets to count as likely
+USAGE_MAX_MOVES = 10
+
+GEN_DATA = GenData.from_gen(9)
+
+# species, moves, item ("" = any), ability ("" = any), weight
+SetEntry = Tuple[str, Tuple[str, ...], str, str, float]
+
+
+def read_team_sets(teams_dir: str = TEAMS_DIR) -> List[SetEntry]:
+    sets: List[SetEntry] = []
+    for path in sorted(glob.glob(os.path.join(teams_dir, "*.txt"))):
+        with open(path, "r", encoding="utf-8") as file:
+            for mon in Teambuilder.parse_showdown_team(file.read()):
+                species = to_id_str(mon.species or mon.nickname or "")
+                moves = tuple(to_id_str(m) for m in mon.moves)
+                sets.append((species, moves, to_id_str(mon.item or ""), to_id_str(mon.ability or ""), 1.0))
+    return sets
+
+
+def read_usage_sets(usage_file: str) -> List[SetEntry]:
+    """One catch-all set per species from a Smogon chaos JSON: its common moves, any item / ability."""
+    with open(usage_file, "r", encoding="utf-8") as file:
+        data = json.load(file).get("data", {})
+
+    sets: List[SetEntry] = []
+    for name, entry in data.items():
+        move_counts = {to_id_str(m): c for m, c in (entry.get("Moves") or {}).items() if m}
+        total = sum(move_counts.values()) / 4.0  # four moves per set
+        if total <= 0:
+            continue
+        common = sorted((m for m, c in move_counts.items() if c / total >= USAGE_MIN_SHARE), key=lambda m: -move_counts[m])
+        if common:
+            sets.append((to_id_str(name), tuple(common[:USAGE_MAX_MOVES]), "", "", float(entry.get("usage", 0.0) or 0.0)))
+    return sets
+
+
+def move_meta(move_id: str) -> Tuple[str, bool]:
+    """(type, damaging) for a move id, so the agents need no move data of their own."""
+    entry = GEN_DATA.moves.get(move_id, {})
+    # by category: variable-power attacks are listed with basePower 0
+    return to_id_str(entry.get("type", "")), entry.get("category", "Status") != "Status"
+
+
+def build_index(sets: List[SetEntry]) -> Tuple[Dict, np.ndarray]:
+    sets = sorted(sets, key=lambda s: (s[0], -s[4]))
+    moves = sorted({m for s in sets for m in s[1]})
+    items = [""] + sorted({s[2] for s in sets} - {""})
+    abilities = [""] + sorted({s[3] for s in sets} - {""})
+    move_bit = {m: i for i, m in enumerate(moves)}
+    item_id = {it: i for i, it in enumerate(items)}
+    ability_id = {ab: i for i, ab in enumerate(abilities)}
+    words = max(1, (len(moves) + 63) // 64)
+
+    dtype = np.dtype([("item", "<i2"), ("ability", "<i2"), ("weight", "<f4"), ("moves", "<u8", (words,))])
+    records = np.zeros(len(sets), dtype=dtype)
+    species_rows: Dict[str, List[int]] = {}
+    for row, (species, set_moves, item, ability, weight) in enumerate(sets):
+        records[row]["item"] = item_id[item]
+        records[row]["ability"] = ability_id[ability]
+        records[row]["weight"] = weight
+        for m in set_moves:
+            records[row]["moves"][move_bit[m] // 64] |= np.uint64(1 << (move_bit[m] % 64))
+        species_rows.setdefault(species, [row, row + 1])[1] = row + 1
+
+    header = {
+        "version": INDEX_VERSION,
+        "words": words,
+        "moves": [[m, *move_meta(m)] for m in moves],
+        "items": items,
+        "abilities": abilities,
+        "species": species_rows,
+    }
+    return header, records
+
+
+def source_hashes(teams_dir: str = TEAMS_DIR, usage_file: Optional[str] = None) -> Dict[str, str]:
+    """sha256 of every file the index is built from, keyed by path relative to scripts/."""
+    paths = sorted(glob.glob(os.path.join(teams_dir, "*.txt"))) + ([usage_file] if usage_file else [])
+    return {os.path.relpath(path, BASE_DIR).replace(os.sep, "/"): file_hash(path) for path in paths}
+
+
+def build(teams_dir: str = TEAMS_DIR, usage_file: Optional[str] = None) -> Tuple[Dict, np.ndarray]:
+    sets = read_team_sets(teams_dir)
+    if usage_file:
+        usage_file = os.path.abspath(usage_file)
+        sets += read_usage_sets(usage_file)
+    header, records = build_index(sets)
+    header["usage"] = usage_file
+    header["sources"] = source_hashes(teams_dir, usage_file)
+    return header, records
+
+
+def load_header(index_dir: str = INDEX_DIR) -> Optional[Dict]:
+    try:
+        with open(os.path.join(index_dir, HEADER_FILE), "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def ensure_index(index_dir: str = INDEX_DIR, teams_dir: str = TEAMS_DIR) -> bool:
+    """Rebuilds the index if it is missing, from an older version or built from other files; True if rebuilt."""
+    header = load_header(index_dir) or {}
+    usage_file = header.get("usage")
+    if usage_file and not os.path.exists(usage_file):
+        usage_file = None  # the usage file is gone: rebuild from the teams alone
+    current = source_hashes(teams_dir, usage_file)
+    if header.get("version") == INDEX_VERSION and header.get("sources") == current:
+        return False
+    header, records = build(teams_dir, usage_file)
+    save_index(header, records, index_dir)
+    print(f"Rebuilt the stale set index in {index_dir} ({len(records)} sets)")
+    return True
+
+
+def save_index(header: Dict, records: np.ndarray, index_dir: str = INDEX_DIR):
+    os.makedirs(index_dir, exist_ok=True)
+    np.save(os.path.join(index_dir, RECORDS_FILE), records, allow_pickle=False)
+    with open(os.path.join(index_dir, HEADER_FILE), "w", encoding="utf-8") as file:
+        json.dump(header, file, separators=(",", ":"), sort_keys=True)
+        file.write("\n")
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Build the opponent set index from the bot teams (and optional usage stats).")
+    ap.add_argument("--teams-dir", default=TEAMS_DIR, help="Directory of Showdown team exports (default bots/teams)")
+    ap.add_argument("--usage", help="Optional Smogon chaos usage JSON to add catch-all sets from")
+    ap.add_argument("--out-dir", default=INDEX_DIR, help="Where to write the index (default data/)")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    header, records = build(args.teams_dir, args.usage)
+    save_index(header, records, args.out_dir)
+    print(f"Indexed {len(records)} sets for {len(header['species'])} species ({len(header['moves'])} moves) into {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
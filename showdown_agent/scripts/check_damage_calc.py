@@ -0,0 +1,123 @@
+# Checks the general agent's integer damage formula (Core.damage_rolls) against fixed damage-calc results.
+#
+#   python check_damage_calc.py        # exits 1 if any roll range differs
+#
+# Each case is written the way Smogon's damage calculator labels it. The expected min-max ranges are
+# that calculator's (gen 9 mechanics), as reproduced by poke_env.calc.calculate_damage, for the normal
+# hit and the critical hit. Every stat not named in a spread has 31 IVs and 0 EVs, all at level 100.
+
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from poke_env.battle import Move, SideCondition, Status, Weather
+from poke_env.data import GenData
+from poke_env.stats import compute_raw_stats
+
+from aros181_general import Core
+
+GEN_DATA = GenData.from_gen(9)
+STATS = ("hp", "atk", "def", "spa", "spd", "spe")
+
+
+class Mon:
+    """The attributes Core.damage_rolls reads off a poke_env Pokemon, for one fixed spread."""
+
+    def __init__(self, species: str, evs: Sequence[int], nature: str, item: str = "", ability: str = "",
+                 boosts: Optional[Dict[str, int]] = None, status: Optional[Status] = None, tera: str = ""):
+        entry = GEN_DATA.pokedex[species]
+        self.species = species
+        self.level = 100
+        self.base_stats = entry["baseStats"]
+        self.stats = dict(zip(STATS, compute_raw_stats(species, list(evs), [31] * 6, 100, nature, GEN_DATA)))
+        self.original_types = [t.lower() for t in entry["types"]]
+        self.types = [tera] if tera else self.original_types
+        self.tera_type = tera or None
+        self.is_terastallized = bool(tera)
+        self.item = item
+        self.ability = ability
+        self.boosts = boosts or {}
+        self.status = status
+
+
+# (calc label, attacker, defender, move, weather, defender's screens, (normal min, max), (crit min, max))
+CASES: List[Tuple[str, Mon, Mon, str, Dict, Dict, Tuple[int, int], Tuple[int, int]]] = [
+    (
+        "252+ Atk Garchomp Earthquake vs. 0 HP / 0 Def Heatran",
+        Mon("garchomp", (0, 252, 0, 0, 4, 252), "jolly"),
+        Mon("heatran", (0, 0, 0, 0, 0, 0), "serious"),
+        "earthquake", {}, {}, (624, 736), (936, 1104),
+    ),
+    (
+        "252+ Atk Dread Plate Kingambit Kowtow Cleave vs. 252 HP / 0 Def Zacian-Crowned",
+        Mon("kingambit", (56, 252, 0, 0, 0, 200), "adamant", item="dreadplate"),
+        Mon("zaciancrowned", (252, 0, 0, 0, 4, 252), "jolly"),
+        "kowtowcleave", {}, {}, (84, 99), (126, 148),
+    ),
+    (
+        "252 SpA Choice Specs Flutter Mane Moonblast vs. 252 HP / 4 SpD Dondozo",
+        Mon("fluttermane", (0, 0, 0, 252, 4, 252), "timid", item="choicespecs"),
+        Mon("dondozo", (252, 0, 252, 0, 4, 0), "impish"),
+        "moonblast", {}, {}, (339, 399), (508, 598),
+    ),
+    (
+        "252+ Atk Life Orb Great Tusk Close Combat vs. 248 HP / 236+ Def Ho-Oh through Reflect",
+        Mon("greattusk", (0, 252, 0, 0, 4, 252), "adamant", item="lifeorb"),
+        Mon("hooh", (248, 0, 236, 0, 0, 24), "impish"),
+        "closecombat", {}, {SideCondition.REFLECT: 1}, (55, 65), (165, 195),
+    ),
+    (
+        "252+ Atk burned Great Tusk Headlong Rush vs. 0 HP / 0 Def Kingambit",
+        Mon("greattusk", (0, 252, 0, 0, 4, 252), "adamant", status=Status.BRN),
+        Mon("kingambit", (0, 0, 0, 0, 0, 0), "serious"),
+        "headlongrush", {}, {}, (186, 219), (279, 328),
+    ),
+    (
+        "252+ SpA Kyogre Surf vs. 252 HP / 0 SpD Groudon in Rain",
+        Mon("kyogre", (0, 0, 0, 252, 4, 252), "modest"),
+        Mon("groudon", (252, 0, 0, 0, 0, 0), "serious"),
+        "surf", {Weather.RAINDANCE: 0}, {}, (590, 696), (884, 1044),
+    ),
+    (
+        "+2 252 Atk Zacian-Crowned Behemoth Blade vs. +1 252 HP / 196+ Def Arceus-Fairy",
+        Mon("zaciancrowned", (0, 252, 0, 0, 4, 252), "jolly", boosts={"atk": 2}),
+        Mon("arceusfairy", (252, 0, 196, 0, 0, 60), "bold", boosts={"def": 1}),
+        "behemothblade", {}, {}, (320, 380), (720, 848),
+    ),
+    (
+        "252+ Atk Tera Ground Great Tusk Headlong Rush vs. 0 HP / 0 Def Gholdengo",
+        Mon("greattusk", (0, 252, 0, 0, 4, 252), "adamant", tera="ground"),
+        Mon("gholdengo", (0, 0, 0, 0, 0, 0), "serious"),
+        "headlongrush", {}, {}, (608, 716), (908, 1072),
+    ),
+    (
+        "252+ SpA Expert Belt Kyogre Thunder vs. 0 HP / 0 SpD Ho-Oh in Sun",
+        Mon("kyogre", (0, 0, 0, 252, 4, 252), "modest", item="expertbelt"),
+        Mon("hooh", (0, 0, 0, 0, 0, 0), "serious"),
+        "thunder", {Weather.SUNNYDAY: 0}, {}, (242, 286), (362, 427),
+    ),
+    (
+        "252+ Atk Choice Band Ho-Oh Sacred Fire vs. 252 HP / 0 Def Eternatus in Sun",
+        Mon("hooh", (0, 252, 0, 0, 4, 252), "adamant", item="choiceband"),
+        Mon("eternatus", (252, 0, 0, 0, 4, 252), "timid"),
+        "sacredfire", {Weather.SUNNYDAY: 0}, {}, (210, 248), (315, 372),
+    ),
+]
+
+
+def main():
+    failures = 0
+    for label, attacker, defender, move_id, weather, screens, normal, crit in CASES:
+        rolls = Core.damage_rolls(attacker, defender, [Move(move_id, gen=9)], weather, screens)[0]
+        got = ((int(rolls[0].min()), int(rolls[0].max())), (int(rolls[1].min()), int(rolls[1].max())))
+        ok = got == (normal, crit)
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {label}: {got[0][0]}-{got[0][1]} (crit {got[1][0]}-{got[1][1]})"
+              + ("" if ok else f", calc says {normal[0]}-{normal[1]} (crit {crit[0]}-{crit[1]})"))
+
+    if failures:
+        print(f"\n{failures} of {len(CASES)} damage cases differ from the calculator")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# scripts/discovery.py
+# Finds and builds the agents every runner plays with: one CustomAgent per file in players/, and
+# one per bot module in bots/ x team file in bots/teams/, plus the hooks the runners use to turn
+# on and print the agents' decision stats.
+#
+# A manifest (results/discovery_manifest.json) remembers for each file its mtime, size, sha256 and
+# whether it defines CustomAgent. Unchanged files are never re-read, and files without an agent are
+# never executed. Each agent module is imported at most once per process, and team files are read
+# on first use, so start-up stays flat as players/ grows.
+
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+from types import ModuleType
+from typing import Dict, List, Optional, Tuple
+
+from poke_env import AccountConfiguration
+from poke_env.player.player import Player
+
+from runner_service import RunnerService
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PLAYERS_DIR = os.path.join(BASE_DIR, "players")
+BOTS_DIR = os.path.join(BASE_DIR, "bots")
+TEAMS_DIR = os.path.join(BOTS_DIR, "teams")
+REPLAY_DIR = os.path.join(BASE_DIR, "replays")
+MANIFEST_FILE = os.path.join(BASE_DIR, "results", "discovery_manifest.json")
+MANIFEST_VERSION = 1
+BATTLE_FORMAT = "gen9ubers"
+
+
+def _defines_agent(source: bytes) -> bool:
+    """Whether a module binds CustomAgent at top level, without running it."""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return True  # let the import report it
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == "CustomAgent":
+            return True
+        if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "CustomAgent" for t in node.targets):
+            return True
+        if isinstance(node, (ast.Import, ast.ImportFrom)) and any((a.asname or a.name) == "CustomAgent" for a in node.names):
+            return True
+    return False
+
+
+class Manifest:
+    """path (relative to BASE_DIR) -> {mtime, size, sha256, agent}."""
+
+    def __init__(self, path: str = MANIFEST_FILE):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self._dirty = False
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = data.get("files", {})
+        except (OSError, ValueError):
+            pass
+
+    def entry(self, path: str) -> Dict:
+        """The manifest entry for path, refreshed if the file changed since it was recorded."""
+        key = os.path.relpath(path, BASE_DIR)
+        stat = os.stat(path)
+        entry = self.entries.get(key)
+        if entry and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry
+
+        with open(path, "rb") as file:
+            data = file.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if not entry or entry["sha256"] != digest:
+            entry = {"sha256": digest, "agent": path.endswith(".py") and _defines_agent(data)}
+        entry.update(mtime=stat.st_mtime_ns, size=stat.st_size)  # touched but unchanged keeps the rest
+        self.entries[key] = entry
+        self._dirty = True
+        return entry
+
+    def save(self):
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as file:
+                json.dump({"version": MANIFEST_VERSION, "files": self.entries}, file, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError:
+            pass  # a read-only checkout just re-derives the entries next time
+
+
+_MANIFEST: Optional[Manifest] = None
+_MODULES: Dict[str, ModuleType] = {}
+_TEAMS: Dict[str, Tuple[int, str]] = {}  # path -> (mtime, text)
+
+
+def manifest() -> Manifest:
+    global _MANIFEST
+    if _MANIFEST is None:
+        _MANIFEST = Manifest()
+    return _MANIFEST
+
+
+def file_hash(path: str) -> str:
+    """sha256 of a file, from the manifest while the file is unchanged."""
+    return manifest().entry(path)["sha256"]
+
+
+def agent_modules(folder: str) -> List[str]:
+    """Paths of the .py files in folder that define CustomAgent, in name order."""
+    paths = [os.path.join(folder, name) for name in sorted(os.listdir(folder)) if name.endswith(".py")]
+    found = [p for p in paths if manifest().entry(p)["agent"]]
+    manifest().save()
+    return found
+
+
+def load_module(path: str) -> ModuleType:
+    """Imports an agent file once per process, registered under its file name like before."""
+    path = os.path.abspath(path)
+    if path not in _MODULES:
+        name = os.path.basename(path)
+        spec = importlib.util.spec_from_file_location(name, path)
+        if spec is None or spec.loader is None:
+            raise ImportError(f"Could not load module {name} from {path}")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+        _MODULES[path] = module
+    return _MODULES[path]
+
+
+def team_paths(teams_dir: str = TEAMS_DIR) -> Dict[str, str]:
+    """team name -> team file, nothing read yet."""
+    return {name[:-4]: os.path.join(teams_dir, name) for name in sorted(os.listdir(teams_dir)) if name.endswith(".txt")}
+
+
+def read_team(path: str) -> str:
+    mtime = os.stat(path).st_mtime_ns
+    cached = _TEAMS.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, "r", encoding="utf-8") as file:
+            cached = _TEAMS[path] = (mtime, file.read())
+    return cached[1]
+
+
+def gather_players(
+    start_listening: bool = True,
+    battle_format: str = BATTLE_FORMAT,
+    save_replays: bool = True,
+) -> List[Player]:
+    """One player per agent file in players/, replays saved under replays/<name>/."""
+    from build_set_index import ensure_index  # imports this module in turn
+
+    ensure_index()  # the agents only read the set index, so bring it up to date first
+    players: List[Player] = []
+    for path in agent_modules(PLAYERS_DIR):
+        player_name = os.path.basename(path)[:-3]
+        agent_class = getattr(load_module(path), "CustomAgent")
+        player = agent_class(
+            account_configuration=AccountConfiguration(player_name, None),
+            battle_format=battle_format,
+            start_listening=start_listening,
+        )
+        if save_replays:
+            agent_replay_dir = os.path.join(REPLAY_DIR, player_name)
+            os.makedirs(agent_replay_dir, exist_ok=True)
+            player._save_replays = agent_replay_dir
+        players.append(player)
+    return players
+
+
+def gather_bots(start_listening: bool = True, battle_format: str = BATTLE_FORMAT) -> List[Player]:
+    """One bot per bot module x team file, named <module>-<team>, all logged in together."""
+    teams = team_paths()
+    generic_bots: List[Player] = []
+    for path in agent_modules(BOTS_DIR):
+        agent_class = getattr(load_module(path), "CustomAgent")
+        for team_name, team_path in teams.items():
+            generic_bots.append(
+                agent_class(
+                    team=read_team(team_path),
+                    account_configuration=AccountConfiguration(f"{os.path.basename(path)[:-3]}-{team_name}", None),
+                    battle_format=battle_format,
+                    start_listening=False,  # connected below, all at once
+                )
+            )
+
+    if start_listening:
+        print(f"Logging in {len(generic_bots)} bots...")
+        print(RunnerService.shared().warm_up(generic_bots))
+    return generic_bots
+
+
+def enable_decision_stats(players: List[Player]):
+    """Agents that support it record per-decision wall time and the policy branch that fired.
+    Summarised by print_decision_stats after the run; battles in sharded workers are not seen."""
+    for player in players:
+        if hasattr(player, "enable_decision_stats"):
+            player.enable_decision_stats()
+
+
+def print_decision_stats(players: List[Player]):
+    recorded = [p for p in players if getattr(p, "decision_stats", None) is not None]
+    if recorded:
+        print("\nDecision stats:")
+        for player in recorded:
+            print(player.decision_stats.summary(player.username))
+
+
+def generate_bots(num_bots: int, bot: str = "simple", team: str = "uber", battle_format: str = BATTLE_FORMAT) -> List[Player]:
+    """num_bots copies of one bot module with one team, named <bot>-1, <bot>-2, ..."""
+    agent_class = getattr(load_module(os.path.join(BOTS_DIR, f"{bot}.py")), "CustomAgent")
+    bot_team = read_team(team_paths()[team])
+    return [
+        agent_class(
+            team=bot_team,
+            account_configuration=AccountConfiguration(f"{bot}-{i + 1}", None),
+            battle_format=battle_format,
+        )
+        for i in range(num_bots)
+    ]
@@ -1,15 +1,15 @@
 # node pokemon-showdown start --no-security
 import asyncio
-import importlib
-import os
-import sys
-from typing import List, Dict
+import math
+from typing import List, Dict, NamedTuple, Optional, Tuple
 
 import poke_env as pke
-from poke_env import AccountConfiguration
 from poke_env.player.player import Player
 from tabulate import tabulate
 
+from discovery import enable_decision_stats, gather_players, print_decision_stats
+from sharded_eval import cross_evaluate_sharded
+
 # ---------------------------
 # Config: battles per pairing
 # ---------------------------
@@ -17,43 +17,23 @@ TOTAL_BATTLES_PER_PAIR = 100  # total across both directions (≈50 each way)
 # pke.cross_evaluate runs "n_challenges" per *ordered* pair (A->B and B->A),
 # so use half to get ~100 total per unordered pair:
 N_CHALLENGES_PER_DIRECTION = max(1, TOTAL_BATTLES_PER_PAIR // 2)
+# >1: battles of every pairing split over worker processes, one server per worker on ports 8000, 8001, ...
+N_SHARDS = 1
+MOCK_SERVER = False  # sharded workers start their own mock_showdown server instead (screening only)
 
+# Adaptive mode: stream battles one at a time and stop a pairing once its Wilson interval excludes 50%.
+# N_CHALLENGES_PER_DIRECTION stays the cap, so undecided pairings cost the same as before.
+ADAPTIVE = True
+MIN_BATTLES_PER_PAIR = 10
+CONFIDENCE_Z = 2.576  # 99%; wider than usual because the interval is re-checked after every battle
+DECISION_STATS = True  # in-process battles only (N_SHARDS == 1)
 
-def gather_players() -> List[Player]:
-    player_folders = os.path.join(os.path.dirname(__file__), "players")
-    players: List[Player] = []
-
-    replay_dir = os.path.join(os.path.dirname(__file__), "replays")
-    os.makedirs(replay_dir, exist_ok=True)
-
-    for module_name in os.listdir(player_folders):
-        if not module_name.endswith(".py"):
-            continue
-
-        module_path = f"{player_folders}/{module_name}"
-        spec = importlib.util.spec_from_file_location(module_name, module_path)
-        module = importlib.util.module_from_spec(spec)
-        sys.modules[module_name] = module
-        spec.loader.exec_module(module)
-
-        if hasattr(module, "CustomAgent"):
-            player_name = module_name[:-3]
-            agent_class = getattr(module, "CustomAgent")
-
-            agent_replay_dir = os.path.join(replay_dir, player_name)
-            os.makedirs(agent_replay_dir, exist_ok=True)
-
-            account_config = AccountConfiguration(player_name, None)
-            player = agent_class(
-                account_configuration=account_config,
-                battle_format="gen9ubers",
-            )
-            # save replays under per-player dir (poke-env uses this flag)
-            player._save_replays = agent_replay_dir
-
-            players.append(player)
 
-    return players
+class WinRate(NamedTuple):
+    rate: float
+    games: int
+    low: float
+    high: float
 
 
 async def cross_evaluate(agents: List[Player]):
@@ -61,57 +41,120 @@ async def cross_evaluate(agents: List[Player]):
     return await pke.cross_evaluate(agents, n_challenges=N_CHALLENGES_PER_DIRECTION)
 
 
-def compute_winrates(results: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+def wilson_interval(wins: float, games: int, z: float = CONFIDENCE_Z) -> Tuple[float, float]:
+    if games == 0:
+        return 0.0, 1.0
+    p = wins / games
+    centre = (p + z * z / (2 * games)) / (1 + z * z / games)
+    margin = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / (1 + z * z / games)
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+async def evaluate_pair_adaptive(p1: Player, p2: Player) -> Tuple[float, float, int]:
+    """Plays p1 vs p2 one battle at a time until the winner is settled; returns (p1 rate, p2 rate, battles)."""
+    while p1.n_finished_battles < N_CHALLENGES_PER_DIRECTION:
+        await p1.battle_against(p2, n_battles=1)
+        games = p1.n_finished_battles
+        if games >= MIN_BATTLES_PER_PAIR:
+            low, high = wilson_interval(p1.n_won_battles, games)
+            if low > 0.5 or high < 0.5:
+                break
+
+    result = (p1.win_rate, p2.win_rate, p1.n_finished_battles)
+    p1.reset_battles()
+    p2.reset_battles()
+    return result
+
+
+async def cross_evaluate_adaptive(agents: List[Player]):
+    """Same pairings and results shape as pke.cross_evaluate, plus battles[p1][p2] actually played."""
+    results: Dict[str, Dict[str, Optional[float]]] = {p1.username: {p2.username: None for p2 in agents} for p1 in agents}
+    battles: Dict[str, Dict[str, int]] = {p1.username: {} for p1 in agents}
+    for i, p1 in enumerate(agents):
+        for p2 in agents[i + 1:]:
+            rate_1, rate_2, games = await evaluate_pair_adaptive(p1, p2)
+            results[p1.username][p2.username] = rate_1
+            results[p2.username][p1.username] = rate_2
+            battles[p1.username][p2.username] = battles[p2.username][p1.username] = games
+            print(f"{p1.username} vs {p2.username}: {rate_1:.2f} after {games} battles")
+    return results, battles
+
+
+def compute_winrates(
+    results: Dict[str, Dict[str, float]],
+    battles: Optional[Dict[str, Dict[str, int]]] = None,
+) -> Dict[str, WinRate]:
     """
-    results[p1][p2] = winrate of p1 vs p2 for the p1->p2 challenges (size = N_CHALLENGES_PER_DIRECTION).
-    We combine both directions to get ~TOTAL_BATTLES_PER_PAIR per unordered pair.
+    results[p1][p2] = winrate of p1 vs p2 over battles[p1][p2] games (N_CHALLENGES_PER_DIRECTION when
+    battles is not given); results[p2][p1] describes the same games from p2's side, so each pairing
+    is counted once. Returns each player's pooled win rate, games played and Wilson interval.
     """
     players = list(results.keys())
     wins = {p: 0.0 for p in players}
     games = {p: 0 for p in players}
-    n = N_CHALLENGES_PER_DIRECTION
 
     for i, a in enumerate(players):
         for j, b in enumerate(players):
             if j <= i:
                 continue
-            s_ab = results.get(a, {}).get(b, 0.0) or 0.0  # A's winrate vs B (A->B)
-            s_ba = results.get(b, {}).get(a, 0.0) or 0.0  # B's winrate vs A (B->A)
-            # Total wins per player over 2n games in this pair
-            wins[a] += s_ab * n + (1.0 - s_ba) * n
-            wins[b] += s_ba * n + (1.0 - s_ab) * n
-            games[a] += 2 * n
-            games[b] += 2 * n
+            n = (battles or {}).get(a, {}).get(b, N_CHALLENGES_PER_DIRECTION)
+            s_ab = results.get(a, {}).get(b, 0.0) or 0.0  # A's winrate vs B
+            s_ba = results.get(b, {}).get(a, 0.0) or 0.0  # B's winrate vs A (ties count for neither)
+            wins[a] += s_ab * n
+            wins[b] += s_ba * n
+            games[a] += n
+            games[b] += n
 
     # Avoid div-by-zero for edge cases (e.g., only 1 player)
-    return {p: (wins[p] / games[p] if games[p] > 0 else 0.0) for p in players}
+    return {
+        p: WinRate(wins[p] / games[p] if games[p] > 0 else 0.0, games[p], *wilson_interval(wins[p], games[p]))
+        for p in players
+    }
 
 
-def print_winrate_table(winrates: Dict[str, float]):
-    rows = sorted(((p, wr) for p, wr in winrates.items()), key=lambda x: x[1], reverse=True)
-    print("\nFinal win rates ({} battles per pairing):".format(TOTAL_BATTLES_PER_PAIR))
-    print(tabulate([(p, f"{wr:.2%}") for p, wr in rows], headers=["Player", "Win rate"]))
+def print_winrate_table(winrates: Dict[str, WinRate]):
+    rows = sorted(winrates.items(), key=lambda x: x[1].rate, reverse=True)
+    print("\nFinal win rates (up to {} battles per pairing):".format(N_CHALLENGES_PER_DIRECTION))
+    print(
+        tabulate(
+            [(p, f"{wr.rate:.2%}", wr.games, f"{wr.low:.2%} - {wr.high:.2%}") for p, wr in rows],
+            headers=["Player", "Win rate", "Battles", f"CI (z={CONFIDENCE_Z})"],
+        )
+    )
 
 
 def main():
-    players = gather_players()
+    players = gather_players(start_listening=N_SHARDS == 1)
     if len(players) < 2:
         print("Need at least 2 players in ./players to battle.")
         return
 
     print(f"Loaded {len(players)} players. Running cross-evaluation...")
-    results = asyncio.run(cross_evaluate(players))
+    if DECISION_STATS and N_SHARDS == 1:
+        enable_decision_stats(players)
+    battles = None
+    if N_SHARDS > 1:
+        results = cross_evaluate_sharded(players, N_CHALLENGES_PER_DIRECTION, N_SHARDS, mock=MOCK_SERVER)
+    elif ADAPTIVE:
+        results, battles = asyncio.run(cross_evaluate_adaptive(players))
+    else:
+        results = asyncio.run(cross_evaluate(players))
 
     # Optional: dump raw matrix
     header = ["-"] + [p for p in results.keys()]
     matrix = []
     for p1, row in results.items():
         matrix.append([p1] + [row.get(p2, None) if p2 in row else None for p2 in results.keys()])
-    print("\nPer-direction winrates (initiator rows vs columns; each ≈ {} games):".format(N_CHALLENGES_PER_DIRECTION))
+    print("\nPer-direction winrates (initiator rows vs columns; each ≤ {} games):".format(N_CHALLENGES_PER_DIRECTION))
     print(tabulate(matrix, headers=header, floatfmt=".2f"))
+    if battles is not None:
+        used = sum(n for row in battles.values() for n in row.values()) // 2
+        budget = N_CHALLENGES_PER_DIRECTION * len(players) * (len(players) - 1) // 2
+        print(f"\nAdaptive stop used {used} of {budget} battles")
 
-    winrates = compute_winrates(results)
+    winrates = compute_winrates(results, battles)
     print_winrate_table(winrates)
+    print_decision_stats(players)
 
 
 if __name__ == "__main__":
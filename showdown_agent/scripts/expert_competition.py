@@ -3,17 +3,19 @@
 
 import asyncio
 import csv
-import importlib
 import os
 import random
-import sys
 from collections import defaultdict
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
-import poke_env as pke
-from poke_env import AccountConfiguration
 from poke_env.player.player import Player
 
+from discovery import generate_bots, gather_players
+from runner_service import RunnerService
+
+MAX_CONCURRENT_MATCHES = 8  # matches of a swiss round played at the same time
+BEST_OF = 3  # games per match, both swiss and knockout phases
+
 
 def convert_results_to_html(csv_file: str, html_file: str):
     with open(csv_file, newline="", encoding="utf-8") as infile:
@@ -88,68 +90,36 @@ class Competitor:
         self.history.clear()
 
 
-def gather_players():
-    player_folders = os.path.join(os.path.dirname(__file__), "players")
-
-    players = []
-
-    for module_name in os.listdir(player_folders):
-        if module_name.endswith(".py"):
-            module_path = f"{player_folders}/{module_name}"
-
-            spec = importlib.util.spec_from_file_location(module_name, module_path)
-            module = importlib.util.module_from_spec(spec)
-
-            sys.modules[module_name] = module
-            spec.loader.exec_module(module)
-
-            # Get the class
-            if hasattr(module, "CustomAgent"):
-                # Check if the class is a subclass of Player
-                agent_class = getattr(module, "CustomAgent")
-
-                config_name = f"{module_name[:-3]}"
-                account_config = AccountConfiguration(config_name, None)
-                players.append(
-                    agent_class(
-                        account_configuration=account_config,
-                        battle_format="gen9ubers",
-                    )
-                )
-
-    return players
-
-
-def rank_players_by_victories(results_dict, top_k=10):
-    victory_scores = {}
-
-    for player, opponents in results_dict.items():
-        victories = [
-            1 if (score is not None and score > 0.5) else 0
-            for opp, score in opponents.items()
-            if opp != player
-        ]
-        if victories:
-            victory_scores[player] = sum(victories) / len(victories)
+async def stream_games(p1: Player, p2: Player, max_games: int):
+    """Plays p1 vs p2 one game at a time, yielding the winner's username (None on a tie)."""
+    for _ in range(max_games):
+        p1_won, p2_won = p1.n_won_battles, p2.n_won_battles
+        await p1.battle_against(p2, n_battles=1)
+        if p1.n_won_battles > p1_won:
+            yield p1.username
+        elif p2.n_won_battles > p2_won:
+            yield p2.username
         else:
-            victory_scores[player] = 0.0
+            yield None
 
-    # Sort by descending victory rate
-    sorted_players = sorted(victory_scores.items(), key=lambda x: x[1], reverse=True)
 
-    return sorted_players[:top_k]
+async def run_battle(
+    p1: Competitor, p2: Competitor, best_of: int = BEST_OF
+) -> Tuple[Competitor, Competitor]:
+    """Best-of-N match that stops as soon as one side has won the majority of games."""
+    wins_needed = best_of // 2 + 1
+    wins = {p1.username: 0, p2.username: 0}
 
+    async for game_winner in stream_games(p1.agent, p2.agent, best_of):
+        if game_winner is not None:
+            wins[game_winner] += 1
+        if max(wins.values()) >= wins_needed:
+            break
 
-async def run_battle(p1: Competitor, p2: Competitor) -> Tuple[Competitor, Competitor]:
-    players = [p1.agent, p2.agent]
-
-    cross_evaluation_results = await pke.cross_evaluate(players, n_challenges=3)
-
-    top_players = rank_players_by_victories(
-        cross_evaluation_results, top_k=len(cross_evaluation_results)
-    )
+    p1.agent.reset_battles()
+    p2.agent.reset_battles()
 
-    winner = p1 if top_players[0][0] == p1.username else p2
+    winner = p1 if wins[p1.username] >= wins[p2.username] else p2
     loser = p2 if winner == p1 else p1
 
     winner.wins += 1
@@ -158,12 +128,63 @@ async def run_battle(p1: Competitor, p2: Competitor) -> Tuple[Competitor, Compet
     return winner, loser
 
 
+def pair_swiss_round(
+    active_players: List[Competitor],
+) -> List[Tuple[Tuple[int, int], Competitor, Optional[Competitor], str]]:
+    """
+    Computes every pairing of the round up front, bracket by bracket.
+    Entries are (group_key, p1, p2, label) - p2 is None for a bye.
+    """
+    # Group players by (wins, losses)
+    brackets: Dict[Tuple[int, int], List[Competitor]] = defaultdict(list)
+    for competitor in active_players:
+        brackets[(competitor.wins, competitor.losses)].append(competitor)
+
+    pairings: List[Tuple[Tuple[int, int], Competitor, Optional[Competitor], str]] = []
+    for group_key in sorted(brackets.keys()):
+        group = brackets[group_key]
+        random.shuffle(group)
+        unpaired = group[:]
+        while len(unpaired) >= 2:
+            p1 = unpaired.pop(0)
+            # Find first player p2 not already played against p1
+            for i, p2 in enumerate(unpaired):
+                if p2.id not in p1.history:
+                    unpaired.pop(i)
+                    pairings.append((group_key, p1, p2, f"Group {group_key}"))
+                    break
+            else:
+                # No unique opponent available — just pair with next
+                p2 = unpaired.pop(0)
+                pairings.append((group_key, p1, p2, f"Group {group_key} (re-pair)"))
+
+        # Bye if odd number
+        if unpaired:
+            pairings.append((group_key, unpaired.pop(), None, f"Group {group_key}"))
+
+    return pairings
+
+
+async def run_matches(
+    matches: List[Tuple[Competitor, Competitor]], max_concurrent_matches: int
+) -> List[Tuple[Competitor, Competitor]]:
+    """Runs independent matches concurrently (at most max_concurrent_matches at once), results in input order."""
+    semaphore = asyncio.Semaphore(max(1, max_concurrent_matches))
+
+    async def limited(p1: Competitor, p2: Competitor):
+        async with semaphore:
+            return await run_battle(p1, p2)
+
+    return await asyncio.gather(*(limited(p1, p2) for p1, p2 in matches))
+
+
 def run_swiss_round(
     competitors: list[Competitor],
     results_file: str,
     summary_file: str,
     win_cap: int = 3,
     loss_cap: int = 2,
+    max_concurrent_matches: int = MAX_CONCURRENT_MATCHES,
 ):
     round_num = 0
 
@@ -174,6 +195,8 @@ def run_swiss_round(
     for competitor in competitors:
         competitor.reset()
 
+    runner = RunnerService.shared()
+
     with open(results_file, "a", encoding="utf-8") as file:
         file.write("Round\tGroup\tPlayer 1\tPlayer 2\tWinner\tBye\n")
         while True:
@@ -189,50 +212,27 @@ def run_swiss_round(
             round_num += 1
             print(f"\n--- Round {round_num} ---")
 
-            # Group players by (wins, losses)
-            brackets: Dict[Tuple[int, int], List[Competitor]] = defaultdict(list)
-            for competitor in active_players:
-                brackets[(competitor.wins, competitor.losses)].append(competitor)
-
-            for group_key in sorted(brackets.keys()):
-                group = brackets[group_key]
-                random.shuffle(group)
-                unpaired = group[:]
-                while len(unpaired) >= 2:
-                    p1 = unpaired.pop(0)
-                    # Find first player p2 not already played against p1
-                    for i, p2 in enumerate(unpaired):
-                        if p2.id not in p1.history:
-                            unpaired.pop(i)
-                            winner, loser = asyncio.run(run_battle(p1, p2))
-                            print(
-                                f"Group {group_key}: {p1.username} vs {p2.username} → Winner: {winner.username}"
-                            )
-                            file.write(
-                                f"{round_num}\t{group_key}\t{p1.username}\t{p2.username}\t{winner.username}\tno\n"
-                            )
-                            break
-                    else:
-                        # No unique opponent available — just pair with next
-                        p2 = unpaired.pop(0)
-                        winner, loser = asyncio.run(run_battle(p1, p2))
-                        print(
-                            f"Group {group_key} (re-pair): {p1.username} vs {p2.username} → Winner: {winner.username}"
-                        )
-                        file.write(
-                            f"{round_num}\t{group_key}\t{p1.username}\t{p2.username}\t{winner.username}\tno\n"
-                        )
-
-                # Bye if odd number
-                if unpaired:
-                    bye_player = unpaired.pop()
-                    bye_player.wins += 1
-                    print(
-                        f"Group {group_key}: Player {bye_player.username} receives a BYE"
-                    )
+            pairings = pair_swiss_round(active_players)
+            matches = [(p1, p2) for _, p1, p2, _ in pairings if p2 is not None]
+
+            results = iter(runner.run(run_matches(matches, max_concurrent_matches)))
+
+            for group_key, p1, p2, label in pairings:
+                if p2 is None:
+                    p1.wins += 1
+                    print(f"{label}: Player {p1.username} receives a BYE")
                     file.write(
-                        f"{round_num}\t{group_key}\t{bye_player.username}\t' '\t {bye_player.username}\tyes\n"
+                        f"{round_num}\t{group_key}\t{p1.username}\t' '\t {p1.username}\tyes\n"
                     )
+                    continue
+
+                winner, _ = next(results)
+                print(
+                    f"{label}: {p1.username} vs {p2.username} → Winner: {winner.username}"
+                )
+                file.write(
+                    f"{round_num}\t{group_key}\t{p1.username}\t{p2.username}\t{winner.username}\tno\n"
+                )
 
     print("\n🏁 Final Results:")
     final_sorted = sorted(competitors, key=lambda p: (-p.wins, p.losses, p.id))
@@ -255,54 +255,6 @@ def run_swiss_round(
     return [p for p in final_sorted if p.wins >= win_cap]
 
 
-def generate_bots(num_bots: int):
-    bot_folders = os.path.join(os.path.dirname(__file__), "bots")
-    bot_teams_folders = os.path.join(bot_folders, "teams")
-
-    bots = []
-
-    bot_to_add = "simple"
-    team_file = "uber.txt"
-
-    with open(
-        os.path.join(bot_teams_folders, team_file), "r", encoding="utf-8"
-    ) as file:
-        bot_team = file.read()
-
-    for i in range(num_bots):
-        module_name = f"{bot_to_add}.py"
-        module_path = os.path.join(bot_folders, module_name)
-
-        spec = importlib.util.spec_from_file_location(module_name, module_path)
-        if spec is None or spec.loader is None:
-            print(f"⚠️ Could not load module {module_name}. Skipping.")
-            raise ImportError(
-                f"Could not load module {module_name}. Please check the file path."
-            )
-
-        module = importlib.util.module_from_spec(spec)
-
-        sys.modules[module_name] = module
-        spec.loader.exec_module(module)
-
-        # Get the class
-        if hasattr(module, "CustomAgent"):
-            # Check if the class is a subclass of Player
-            agent_class = getattr(module, "CustomAgent")
-
-            config_name = f"{module_name[:-3]}-{i+1}"
-            account_config = AccountConfiguration(config_name, None)
-            bots.append(
-                agent_class(
-                    team=bot_team,
-                    account_configuration=account_config,
-                    battle_format="gen9ubers",
-                )
-            )
-
-    return bots
-
-
 def bots_to_add_for_clean_halving(current_players: int, target_top_n: int) -> int:
     multiplier = 1
     while True:
@@ -416,7 +368,7 @@ def run_knockout_phase(players_ranked: list[Competitor]):
                     current_dir + "/" + p1.username + "--vs--" + p2.username
                 )
 
-                winner, loser = asyncio.run(run_battle(p1, p2))
+                winner, loser = RunnerService.shared().run(run_battle(p1, p2))
                 print(
                     f"Match: {p1.username} vs {p2.username} → Winner: {winner.username}"
                 )
@@ -447,32 +399,39 @@ def run_competition(
 ):
     competitors = [Competitor(i + 1, p.username, p) for i, p in enumerate(players)]
 
-    if len(competitors) < top_k:
-        print(f"⚠️ Not enough players found ({len(players)}) to start a tournament.")
-        return
+    try:
+        if len(competitors) < top_k:
+            print(f"⚠️ Not enough players found ({len(players)}) to start a tournament.")
+            return
 
-    bots_to_add = bots_to_add_for_clean_halving(len(competitors), top_k)
+        bots_to_add = bots_to_add_for_clean_halving(len(competitors), top_k)
 
-    print(f"🤖 Adding {bots_to_add} bots to make a clean halving for {top_k} players")
+        print(f"🤖 Adding {bots_to_add} bots to make a clean halving for {top_k} players")
 
-    bots = generate_bots(bots_to_add)
+        bots = generate_bots(bots_to_add)
+
+        bot_competitors = [
+            Competitor(i + len(players) + 1, p.username, p) for i, p in enumerate(bots)
+        ]
 
-    bot_competitors = [
-        Competitor(i + len(players) + 1, p.username, p) for i, p in enumerate(bots)
-    ]
+        competitors += bot_competitors
 
-    competitors += bot_competitors
+        # Everyone logs in once, up front; every match after that reuses the same connections
+        print(RunnerService.shared().warm_up(c.agent for c in competitors))
 
-    top_k_competitors = run_swiss_phase(top_k, competitors)
+        top_k_competitors = run_swiss_phase(top_k, competitors)
 
-    print("\n🏁 Knockout Rounds:")
-    winner = run_knockout_phase(top_k_competitors)
-    print(f"\n🏆 Final Winner: {winner.username} (ID: {winner.id})")
+        print("\n🏁 Knockout Rounds:")
+        winner = run_knockout_phase(top_k_competitors)
+        print(f"\n🏆 Final Winner: {winner.username} (ID: {winner.id})")
+    finally:
+        # let any queued match finish, then log players and bots out
+        RunnerService.shared().close(c.agent for c in competitors)
 
 
 def main():
 
-    players = gather_players()
+    players = gather_players(save_replays=False)
 
     run_competition(players, top_k=16)
 
@@ -2,16 +2,26 @@
 
 
 import asyncio
-import importlib
+import hashlib
+import json
 import os
-import sys
-from typing import List
+from typing import Dict, List, Optional
 
 import poke_env as pke
-from poke_env import AccountConfiguration
 from poke_env.player.player import Player
 from tabulate import tabulate
 
+from discovery import enable_decision_stats, file_hash, gather_bots, gather_players, print_decision_stats
+from sharded_eval import cross_evaluate_sharded
+
+N_CHALLENGES = 3
+N_SHARDS = 1  # >1: battles split over worker processes, one server per worker on ports 8000, 8001, ...
+MOCK_SERVER = False  # sharded workers start their own mock_showdown server instead (screening only)
+DECISION_STATS = True  # in-process battles only (N_SHARDS == 1)
+BOT_MATRIX_CACHE = os.path.join(
+    os.path.dirname(__file__), "results", "bot_matrix_cache.json"
+)
+
 
 def rank_players_by_victories(results_dict, top_k=10):
     victory_scores = {}
@@ -33,103 +43,117 @@ def rank_players_by_victories(results_dict, top_k=10):
     return sorted_players[:top_k]
 
 
-def gather_players():
-    player_folders = os.path.join(os.path.dirname(__file__), "players")
-
-    players = []
-
-    replay_dir = os.path.join(os.path.dirname(__file__), "replays")
-    if not os.path.exists(replay_dir):
-        os.makedirs(replay_dir)
-
-    for module_name in os.listdir(player_folders):
-        if module_name.endswith(".py"):
-            module_path = f"{player_folders}/{module_name}"
-
-            spec = importlib.util.spec_from_file_location(module_name, module_path)
-            module = importlib.util.module_from_spec(spec)
-
-            sys.modules[module_name] = module
-            spec.loader.exec_module(module)
-
-            # Get the class
-            if hasattr(module, "CustomAgent"):
-                # Check if the class is a subclass of Player
-
-                player_name = f"{module_name[:-3]}"
-
-                agent_class = getattr(module, "CustomAgent")
-
-                agent_replay_dir = os.path.join(replay_dir, f"{player_name}")
-                if not os.path.exists(agent_replay_dir):
-                    os.makedirs(agent_replay_dir)
-
-                account_config = AccountConfiguration(player_name, None)
-                player = agent_class(
-                    account_configuration=account_config,
-                    battle_format="gen9ubers",
-                )
-
-                player._save_replays = agent_replay_dir
-
-                players.append(player)
-
-    return players
+async def cross_evaluate(agents: List[Player]):
+    return await pke.cross_evaluate(agents, n_challenges=N_CHALLENGES)
 
 
-def gather_bots():
+def bots_fingerprint() -> str:
+    """Hash of every bot source and team file - changes invalidate the bot matrix cache."""
     bot_folders = os.path.join(os.path.dirname(__file__), "bots")
     bot_teams_folders = os.path.join(bot_folders, "teams")
 
-    generic_bots = []
-
-    bot_teams = {}
-
-    for team_file in os.listdir(bot_teams_folders):
-        if team_file.endswith(".txt"):
-            with open(
-                os.path.join(bot_teams_folders, team_file), "r", encoding="utf-8"
-            ) as file:
-                bot_teams[team_file[:-4]] = file.read()
-
-    for module_name in os.listdir(bot_folders):
-        if module_name.endswith(".py"):
-            module_path = f"{bot_folders}/{module_name}"
-
-            spec = importlib.util.spec_from_file_location(module_name, module_path)
-            module = importlib.util.module_from_spec(spec)
-
-            sys.modules[module_name] = module
-            spec.loader.exec_module(module)
-
-            for team_name, team in bot_teams.items():
-                # Get the class
-                if hasattr(module, "CustomAgent"):
-                    # Check if the class is a subclass of Player
-                    agent_class = getattr(module, "CustomAgent")
-
-                    config_name = f"{module_name[:-3]}-{team_name}"
-                    account_config = AccountConfiguration(config_name, None)
-                    generic_bots.append(
-                        agent_class(
-                            team=team,
-                            account_configuration=account_config,
-                            battle_format="gen9ubers",
-                        )
-                    )
-
-    return generic_bots
-
-
-async def cross_evaluate(agents: List[Player]):
-    return await pke.cross_evaluate(agents, n_challenges=3)
-
-
-def evalute_againts_bots(players: List[Player]):
+    digest = hashlib.sha256(f"n_challenges={N_CHALLENGES} mock={MOCK_SERVER}".encode("utf-8"))
+    for folder, suffix in ((bot_folders, ".py"), (bot_teams_folders, ".txt")):
+        for file_name in sorted(os.listdir(folder)):
+            if file_name.endswith(suffix):
+                digest.update(file_name.encode("utf-8"))
+                digest.update(file_hash(os.path.join(folder, file_name)).encode("ascii"))  # manifest-cached
+
+    return digest.hexdigest()
+
+
+def load_bot_matrix(generic_bots: List[Player]) -> Dict[str, Dict[str, Optional[float]]]:
+    """Returns the bot-vs-bot cross evaluation, replaying it only when the cache is stale."""
+    fingerprint = bots_fingerprint()
+    bot_names = sorted(bot.username for bot in generic_bots)
+
+    if os.path.exists(BOT_MATRIX_CACHE):
+        with open(BOT_MATRIX_CACHE, "r", encoding="utf-8") as file:
+            cached = json.load(file)
+        if cached.get("fingerprint") == fingerprint and cached.get("bots") == bot_names:
+            print(f"Using cached bot matrix from {BOT_MATRIX_CACHE}")
+            return cached["matrix"]
+
+    print("Running bot vs bot Cross Evaluations (cached for later players)...")
+    if N_SHARDS > 1:
+        matrix = cross_evaluate_sharded(generic_bots, N_CHALLENGES, N_SHARDS, mock=MOCK_SERVER)
+    else:
+        matrix = asyncio.run(cross_evaluate(generic_bots))
+
+    os.makedirs(os.path.dirname(BOT_MATRIX_CACHE), exist_ok=True)
+    with open(BOT_MATRIX_CACHE, "w", encoding="utf-8") as file:
+        json.dump({"fingerprint": fingerprint, "bots": bot_names, "matrix": matrix}, file, indent=2)
+
+    return matrix
+
+
+async def evaluate_player_row(player: Player, generic_bots: List[Player]):
+    """Plays only the player-vs-bot pairings, in the same direction as pke.cross_evaluate."""
+    row: Dict[str, Optional[float]] = {player.username: None}
+    column: Dict[str, Optional[float]] = {}
+
+    for bot in generic_bots:
+        await player.battle_against(bot, n_battles=N_CHALLENGES)
+        row[bot.username] = player.win_rate
+        column[bot.username] = bot.win_rate
+        player.reset_battles()
+        bot.reset_battles()
+
+    return row, column
+
+
+def evaluate_player_row_sharded(player: Player, generic_bots: List[Player]):
+    """evaluate_player_row spread over N_SHARDS worker processes."""
+    agents = [player] + generic_bots
+    pairs = [(0, k) for k in range(1, len(agents))]
+    results = cross_evaluate_sharded(agents, N_CHALLENGES, N_SHARDS, mock=MOCK_SERVER, pairs=pairs)
+
+    row = results[player.username]
+    column = {bot.username: results[bot.username][player.username] for bot in generic_bots}
+    return row, column
+
+
+def merge_bot_matrix(
+    player: Player,
+    generic_bots: List[Player],
+    row: Dict[str, Optional[float]],
+    column: Dict[str, Optional[float]],
+    bot_matrix: Dict[str, Dict[str, Optional[float]]],
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """Builds the full cross evaluation table from the cached bot matrix plus the new player row."""
+    results = {player.username: row}
+    for bot in generic_bots:
+        results[bot.username] = {player.username: column[bot.username]}
+        for other in generic_bots:
+            results[bot.username][other.username] = bot_matrix[bot.username].get(other.username)
+    return results
+
+
+def evalute_againts_bots(
+    players: List[Player],
+    bot_matrix: Optional[Dict[str, Dict[str, Optional[float]]]] = None,
+):
+    """
+    players[0] is the player under evaluation when bot_matrix is given - only its row is
+    played and the bot-vs-bot results are taken from the cache.
+    """
     print(f"{len(players)} are competing in this challenge")
 
     print("Running Cross Evaluations...")
-    cross_evaluation_results = asyncio.run(cross_evaluate(players))
+    if bot_matrix is None:
+        if N_SHARDS > 1:
+            cross_evaluation_results = cross_evaluate_sharded(players, N_CHALLENGES, N_SHARDS, mock=MOCK_SERVER)
+        else:
+            cross_evaluation_results = asyncio.run(cross_evaluate(players))
+    else:
+        player, generic_bots = players[0], players[1:]
+        if N_SHARDS > 1:
+            row, column = evaluate_player_row_sharded(player, generic_bots)
+        else:
+            row, column = asyncio.run(evaluate_player_row(player, generic_bots))
+        cross_evaluation_results = merge_bot_matrix(
+            player, generic_bots, row, column, bot_matrix
+        )
     print("Evaluations Complete")
 
     table = [["-"] + [p.username for p in players]]
@@ -163,9 +187,12 @@ def assign_marks(rank: int) -> float:
 
 
 def main():
-    generic_bots = gather_bots()
+    # sharded runs only need the players as descriptions; the workers log in on their own servers
+    generic_bots = gather_bots(start_listening=N_SHARDS == 1)
 
-    players = gather_players()
+    players = gather_players(start_listening=N_SHARDS == 1)
+    if DECISION_STATS and N_SHARDS == 1:
+        enable_decision_stats(players)
 
     results_file = os.path.join(
         os.path.dirname(__file__), "results", "marking_results.txt"
@@ -176,13 +203,15 @@ def main():
     with open(results_file, "w", encoding="utf-8") as file:
         pass  # This opens the file in write mode, clearing it
 
+    bot_matrix = load_bot_matrix(generic_bots)
+
     for player in players:
         agents = []
         print(f"Evaluating player: {player.username}")
         agents.append(player)
         agents.extend(generic_bots)
 
-        agent_rankings = evalute_againts_bots(agents)
+        agent_rankings = evalute_againts_bots(agents, bot_matrix)
 
         player_rank = len(agents) + 1
         player_mark = 0.0
@@ -200,6 +229,8 @@ def main():
         with open(results_file, "a", encoding="utf-8") as file:
             file.write(f"{player.username} #{player_rank} {player_mark}\n")
 
+    print_decision_stats(players)
+
 
 if __name__ == "__main__":
     main()
@@ -1,23 +1,27 @@
 # node pokemon-showdown start --no-security
 
-import asyncio
-import importlib
 import os
 import sys
 import threading
 import queue
-from typing import Dict, List, Tuple
-from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 import html
 import time
 
 import poke_env as pke
-from poke_env import AccountConfiguration
 from poke_env.player.player import Player
 from tabulate import tabulate
 
-# GUI: standard library only
-import tkinter as tk
+from discovery import gather_bots, gather_players
+from results_store import ResultsStore
+from runner_service import RunnerService
+from sharded_eval import cross_evaluate_sharded
+
+# GUI: standard library only; the svg backend needs no tkinter at all
+try:
+    import tkinter as tk
+except ImportError:
+    tk = None
 
 
 # ======================
@@ -26,6 +30,16 @@ import tkinter as tk
 N_TOURNAMENT_RUNS = 100            # how many times to repeat the full evaluation
 BATTLE_FORMAT = "gen9ubers"        # tweak in one place
 BASE_DIR = os.path.dirname(__file__)
+N_CHALLENGES = 3                   # battles per pairing
+N_SHARDS = 1                       # >1: worker processes, one server per worker on ports 8000, 8001, ...
+MOCK_SERVER = False                # sharded workers start their own mock_showdown server (screening only)
+PLOT_BACKEND = "tk"                # "svg": headless, the chart is rewritten to SVG_PLOT_FILE (also used when Tk has no display)
+SVG_PLOT_FILE = os.path.join(BASE_DIR, "results", "cumulative_marks.svg")
+SVG_PLOT_INTERVAL = 60.0           # seconds between SVG rewrites; one more is written when the run ends
+KEEP_FINISHED_BATTLES = 0          # finished battles each player keeps after a run; None keeps them all
+# Every evaluation is logged here as it finishes; a restart resumes after the last completed run.
+# Delete the file (or point this elsewhere) to start a fresh series.
+RESULTS_STORE = os.path.join(BASE_DIR, "results", f"tournament_{BATTLE_FORMAT}_n{N_CHALLENGES}.jsonl")
 
 
 def rank_players_by_victories(results_dict, top_k=10):
@@ -47,95 +61,21 @@ def rank_players_by_victories(results_dict, top_k=10):
     return sorted_players[:top_k]
 
 
-def gather_players() -> List[Player]:
-    player_folders = os.path.join(BASE_DIR, "players")
-    players = []
-
-    replay_dir = os.path.join(BASE_DIR, "replays")
-    if not os.path.exists(replay_dir):
-        os.makedirs(replay_dir)
-
-    for module_name in os.listdir(player_folders):
-        if module_name.endswith(".py"):
-            module_path = os.path.join(player_folders, module_name)
-
-            spec = importlib.util.spec_from_file_location(module_name, module_path)
-            module = importlib.util.module_from_spec(spec)
-
-            sys.modules[module_name] = module
-            spec.loader.exec_module(module)
-
-            if hasattr(module, "CustomAgent"):
-                player_name = f"{module_name[:-3]}"
-                agent_class = getattr(module, "CustomAgent")
-
-                # per-agent replay dir (same as your original style)
-                agent_replay_dir = os.path.join(replay_dir, f"{player_name}")
-                if not os.path.exists(agent_replay_dir):
-                    os.makedirs(agent_replay_dir)
-
-                account_config = AccountConfiguration(player_name, None)
-                player = agent_class(
-                    account_configuration=account_config,
-                    battle_format=BATTLE_FORMAT,
-                )
-                # keep saving replays if your agents do that internally
-                player._save_replays = agent_replay_dir
-                players.append(player)
-    return players
-
-
-def gather_bots() -> List[Player]:
-    bot_folders = os.path.join(BASE_DIR, "bots")
-    bot_teams_folders = os.path.join(bot_folders, "teams")
-
-    generic_bots: List[Player] = []
-    bot_teams: Dict[str, str] = {}
-
-    for team_file in os.listdir(bot_teams_folders):
-        if team_file.endswith(".txt"):
-            with open(
-                os.path.join(bot_teams_folders, team_file), "r", encoding="utf-8"
-            ) as file:
-                bot_teams[team_file[:-4]] = file.read()
-
-    for module_name in os.listdir(bot_folders):
-        if module_name.endswith(".py"):
-            module_path = os.path.join(bot_folders, module_name)
-
-            spec = importlib.util.spec_from_file_location(module_name, module_path)
-            module = importlib.util.module_from_spec(spec)
-
-            sys.modules[module_name] = module
-            spec.loader.exec_module(module)
-
-            for team_name, team in bot_teams.items():
-                if hasattr(module, "CustomAgent"):
-                    agent_class = getattr(module, "CustomAgent")
-                    config_name = f"{module_name[:-3]}-{team_name}"
-                    account_config = AccountConfiguration(config_name, None)
-                    generic_bots.append(
-                        agent_class(
-                            team=team,
-                            account_configuration=account_config,
-                            battle_format=BATTLE_FORMAT,
-                        )
-                    )
-    return generic_bots
-
-
 async def cross_evaluate(agents: List[Player]):
-    return await pke.cross_evaluate(agents, n_challenges=3)
+    return await pke.cross_evaluate(agents, n_challenges=N_CHALLENGES)
 
 
-def evaluate_against_bots(agents: List[Player]) -> List[Tuple[str, float]]:
+def evaluate_against_bots(agents: List[Player]) -> Tuple[List[Tuple[str, float]], Dict[str, Dict[str, Optional[float]]]]:
     """
-    Cross-evaluates the given agents and returns a ranked list of (agent_name, winrate).
-    The first element is the best (highest winrate).
+    Cross-evaluates the given agents and returns a ranked list of (agent_name, winrate),
+    best first, along with the raw cross evaluation matrix.
     """
     print(f"{len(agents)} agents competing in this run")
     print("Running Cross Evaluations...")
-    cross_evaluation_results = asyncio.run(cross_evaluate(agents))
+    if N_SHARDS > 1:
+        cross_evaluation_results = cross_evaluate_sharded(agents, N_CHALLENGES, N_SHARDS, mock=MOCK_SERVER)
+    else:
+        cross_evaluation_results = RunnerService.shared().run(cross_evaluate(agents))
     print("Evaluations Complete")
 
     table = [["-"] + [p.username for p in agents]]
@@ -150,7 +90,7 @@ def evaluate_against_bots(agents: List[Player]) -> List[Tuple[str, float]]:
     top_players = rank_players_by_victories(
         cross_evaluation_results, top_k=len(cross_evaluation_results)
     )
-    return top_players
+    return top_players, cross_evaluation_results
 
 
 def assign_marks(rank: int) -> float:
@@ -161,33 +101,90 @@ def assign_marks(rank: int) -> float:
     return 0.0 if marks < 0 else marks
 
 
-# ---------------------- Tkinter live plot (no extra deps) ----------------------
-class LivePlot:
-    """A tiny line-plotter on a Tkinter Canvas that redraws cumulative averages."""
+# ---------------------- Plot events (worker -> plot) ----------------------
+# The worker never shares its state with a plot: it publishes small immutable events and each
+# consumer folds them into its own state, so an update costs O(1) whatever the history length.
+class RunStarted(NamedTuple):
+    run: int
 
-    def __init__(self, title="Cumulative Average Player Score Over Time"):
-        self.root = tk.Tk()
-        self.root.title(title)
 
-        # Canvas + controls
-        self.canvas_w, self.canvas_h = 1100, 700
-        self.canvas = tk.Canvas(self.root, width=self.canvas_w, height=self.canvas_h, bg="white")
-        self.canvas.pack(fill="both", expand=True)
+class MarkRecorded(NamedTuple):
+    run: int
+    player: str
+    mark: float
 
-        controls = tk.Frame(self.root)
-        controls.pack(fill="x")
-        self.status_var = tk.StringVar(value="Ready")
-        tk.Label(controls, textvariable=self.status_var).pack(side="left", padx=8)
 
-        self.stop_after_current = False
-        tk.Button(controls, text="Stop after current run", command=self._request_stop).pack(side="right", padx=8)
+class RunFinished(NamedTuple):
+    run: int
+
+
+class StatusMessage(NamedTuple):
+    text: str
+
+
+PlotEvent = Union[RunStarted, MarkRecorded, RunFinished, StatusMessage]
+
+
+def event_status(event: PlotEvent) -> str:
+    if isinstance(event, MarkRecorded):
+        return f"Run {event.run}: updated {event.player}"
+    if isinstance(event, RunStarted):
+        return f"Run {event.run} started."
+    if isinstance(event, RunFinished):
+        return f"Run {event.run} complete."
+    return event.text
+
+
+# ---------------------- Live plot backends (no extra deps) ----------------------
+class CumulativeSeries:
+    """
+    One player's cumulative average mark, kept as a running sum. Stored points are decimated
+    (every `stride`-th run) so there are never more than `max_points` of them however long
+    the series grows; the latest value is always available as `last`.
+    """
+    __slots__ = ("total", "n", "stride", "points")
+
+    def __init__(self):
+        self.total = 0.0
+        self.n = 0
+        self.stride = 1
+        self.points: List[Tuple[int, float]] = []  # (run, cumulative average) at runs 1, 1 + stride, ...
+
+    @property
+    def last(self) -> Tuple[int, float]:
+        return self.n, self.total / self.n
+
+    def add(self, mark: float, max_points: int) -> bool:
+        """Folds in the next mark; True if the stored points were thinned."""
+        self.total += mark
+        self.n += 1
+        if (self.n - 1) % self.stride == 0:
+            self.points.append((self.n, self.total / self.n))
+            if len(self.points) > max_points:
+                self.points = self.points[::2]
+                self.stride *= 2
+                return True
+        return False
+
+
+class CumulativePlot:
+    """
+    What every plot backend shares: the worker's event queue, one running series per player
+    and the chart geometry. The x axis spans runs 1..x_cap and doubles when a series outgrows it.
+    """
+
+    TITLE = "Cumulative Average Player Score Over Time"
+
+    def __init__(self, runs_hint: int = 10):
+        self.canvas_w, self.canvas_h = 1100, 700
 
         # Plot area (margins)
         self.lpad, self.rpad, self.tpad, self.bpad = 80, 260, 60, 60
         self.x_ticks_target = 8
 
         # communication queue for worker thread
-        self.q: "queue.Queue[dict]" = queue.Queue()
+        self.q: "queue.Queue[PlotEvent]" = queue.Queue()
+        self.stop_after_current = False
 
         # color palette (cycles)
         self.colors = [
@@ -198,8 +195,82 @@ class LivePlot:
         ]
 
         # latest data
-        self.cumavg: Dict[str, List[float]] = {}
-        self.x_max = 1
+        self.series: Dict[str, CumulativeSeries] = {}
+        self.x_cap = max(2, runs_hint)
+        self.max_points = self.canvas_w - self.lpad - self.rpad  # about one point per pixel
+
+    def publish(self, event: PlotEvent):
+        """Called from worker thread: enqueue an event to fold in."""
+        self.q.put(event)
+
+    def _apply(self, event: PlotEvent) -> bool:
+        """Folds one event into the running series; True if the chart needs a full redraw."""
+        if not isinstance(event, MarkRecorded):
+            return False
+        full = False
+        series = self.series.get(event.player)
+        if series is None:
+            series = self.series[event.player] = CumulativeSeries()
+            full = True  # legend and colour order change
+        if series.add(event.mark, self.max_points):
+            full = True
+        while series.n > self.x_cap:
+            self.x_cap *= 2
+            full = True
+        return full
+
+    def _drain(self) -> Tuple[bool, Optional[str]]:
+        """Applies every queued update; returns (needs full redraw, latest status or None if nothing came)."""
+        full, status = False, None
+        try:
+            while True:
+                event = self.q.get_nowait()
+                full = self._apply(event) or full
+                status = event_status(event)
+        except queue.Empty:
+            pass
+        return full, status
+
+    def x_to_px(self, x: float) -> float:
+        plot_w = self.canvas_w - self.lpad - self.rpad
+        return self.lpad + (x - 1) * (plot_w / max(1e-9, (self.x_cap - 1)))
+
+    def y_to_px(self, y: float) -> float:
+        plot_h = self.canvas_h - self.tpad - self.bpad
+        return self.tpad + (10.0 - y) * (plot_h / 10.0)
+
+    def x_ticks(self) -> List[float]:
+        steps = max(1, min(self.x_ticks_target, self.x_cap))
+        return [1 + i * (self.x_cap - 1) / steps for i in range(steps + 1)]
+
+    def color(self, idx: int) -> str:
+        return self.colors[idx % len(self.colors)]
+
+
+class LivePlot(CumulativePlot):
+    """
+    A tiny line-plotter on a Tkinter Canvas for cumulative averages. Updates only draw the
+    segments added since the last one; the full redraw happens when the x axis has to grow,
+    a series is thinned or a new player shows up.
+    """
+
+    def __init__(self, title=CumulativePlot.TITLE, runs_hint: int = 10):
+        super().__init__(runs_hint)
+        self.root = tk.Tk()
+        self.root.title(title)
+
+        # Canvas + controls
+        self.canvas = tk.Canvas(self.root, width=self.canvas_w, height=self.canvas_h, bg="white")
+        self.canvas.pack(fill="both", expand=True)
+
+        controls = tk.Frame(self.root)
+        controls.pack(fill="x")
+        self.status_var = tk.StringVar(value="Ready")
+        tk.Label(controls, textvariable=self.status_var).pack(side="left", padx=8)
+
+        tk.Button(controls, text="Stop after current run", command=self._request_stop).pack(side="right", padx=8)
+
+        self.drawn: Dict[str, int] = {}  # player -> stored points already on the canvas
 
         # poll for updates
         self.root.after(100, self._poll_queue)
@@ -208,80 +279,40 @@ class LivePlot:
         self.stop_after_current = True
         self.status_var.set("Will stop after the current run finishes...")
 
-    def push_update(self, run_idx: int, marks_history: Dict[str, List[float]], msg: str = ""):
-        """Called from worker thread: enqueue data to redraw."""
-        self.q.put({"run": run_idx, "marks": marks_history, "msg": msg})
-
     def _poll_queue(self):
         """Runs in GUI thread: apply updates and redraw."""
-        try:
-            while True:
-                item = self.q.get_nowait()
-                run_idx = item["run"]
-                marks_history = item["marks"]
-                msg = item.get("msg", "")
-
-                # compute cumulative averages
-                self.cumavg = {}
-                self.x_max = 1
-                for player, marks in marks_history.items():
-                    total = 0.0
-                    arr = []
-                    for i, m in enumerate(marks, 1):
-                        total += m
-                        arr.append(total / i)
-                    self.cumavg[player] = arr
-                    print(arr)
-                    self.x_max = max(self.x_max, len(arr))
-
-                if msg:
-                    self.status_var.set(msg)
-                else:
-                    self.status_var.set(f"Run {run_idx} complete.")
-
+        full, status = self._drain()
+        if status is not None:
+            self.status_var.set(status)
+            if full:
                 self._redraw()
-        except queue.Empty:
-            pass
-
+            else:
+                self._draw_new()
         self.root.after(100, self._poll_queue)
 
     def _redraw(self):
         c = self.canvas
         c.delete("all")
+        self.drawn = {}
         W, H = self.canvas_w, self.canvas_h
         LP, RP, TP, BP = self.lpad, self.rpad, self.tpad, self.bpad
-        plot_w = W - LP - RP
-        plot_h = H - TP - BP
-
-        # axes bounds
-        x_min, x_max = 1, max(1, self.x_max)
-        y_min, y_max = 0.0, 10.0
-
-        def x_to_px(x):
-            return LP + (x - x_min) * (plot_w / max(1e-9, (x_max - x_min)))
-
-        def y_to_px(y):
-            return TP + (y_max - y) * (plot_h / max(1e-9, (y_max - y_min)))
 
         # title
-        c.create_text(LP, TP - 25, text="Cumulative Average Player Score Over Time", anchor="w", font=("TkDefaultFont", 14, "bold"))
+        c.create_text(LP, TP - 25, text=self.TITLE, anchor="w", font=("TkDefaultFont", 14, "bold"))
 
         # axes
         c.create_line(LP, TP, LP, H - BP, fill="#333", width=2)              # Y
         c.create_line(LP, H - BP, W - RP, H - BP, fill="#333", width=2)      # X
 
         # x ticks/grid
-        steps = min(self.x_ticks_target, x_max - x_min + 1)
-        steps = max(1, steps)
-        for i in range(steps + 1):
-            xv = x_min + i * (x_max - x_min) / steps
-            xp = x_to_px(xv)
+        for xv in self.x_ticks():
+            xp = self.x_to_px(xv)
             c.create_line(xp, TP, xp, H - BP, fill="#eee")
             c.create_text(xp, H - BP + 16, text=str(int(round(xv))), anchor="n", font=("TkDefaultFont", 9))
 
         # y ticks every 2
-        for yv in range(int(y_min), int(y_max) + 1, 2):
-            yp = y_to_px(yv)
+        for yv in range(0, 11, 2):
+            yp = self.y_to_px(yv)
             c.create_line(LP, yp, W - RP, yp, fill="#f3f3f3")
             c.create_text(LP - 10, yp, text=str(yv), anchor="e", font=("TkDefaultFont", 9))
 
@@ -289,91 +320,279 @@ class LivePlot:
         c.create_text((LP + (W - RP)) / 2, H - 10, text="Tournament Run #", anchor="s", font=("TkDefaultFont", 10))
         c.create_text(20, (TP + (H - BP)) / 2, text="Cumulative Average Mark", anchor="w", angle=90, font=("TkDefaultFont", 10))
 
-        # series
+        # legend
         legend_x = W - RP + 20
         legend_y = TP + 10
         legend_step = 18
-
-        for idx, (player, series) in enumerate(sorted(self.cumavg.items())):
-            color = self.colors[idx % len(self.colors)]
-
-            # polyline
-            pts = []
-            for i, v in enumerate(series, 1):
-                pts.append((x_to_px(i), y_to_px(v)))
-
-            if len(pts) == 1:
-                x, y = pts[0]
-                c.create_oval(x - 2, y - 2, x + 2, y + 2, fill=color, outline=color)
-            else:
-                # draw connected lines
-                for (x1, y1), (x2, y2) in zip(pts[:-1], pts[1:]):
-                    c.create_line(x1, y1, x2, y2, fill=color, width=2)
-
-            # legend
+        for idx, player in enumerate(sorted(self.series)):
             ly = legend_y + idx * legend_step
-            c.create_line(legend_x, ly, legend_x + 20, ly, fill=color, width=3)
+            c.create_line(legend_x, ly, legend_x + 20, ly, fill=self.color(idx), width=3)
             c.create_text(legend_x + 26, ly, text=player, anchor="w", font=("TkDefaultFont", 9))
 
+        self._draw_new()
 
-# ---------------------- Worker thread (runs the tournaments) ----------------------
-def run_tournaments(gui: LivePlot, stop_event: threading.Event):
-    # Collect agents once
-    generic_bots = gather_bots()
-    players = gather_players()
-    player_names = [p.username for p in players]
-
-    print(f"Players detected: {player_names}")
-    print(f"Generic bots detected: {[b.username for b in generic_bots]}")
+    def _draw_new(self):
+        """Draws the stored points each series gained since the last call, plus its moving tail."""
+        c = self.canvas
+        for idx, player in enumerate(sorted(self.series)):
+            series = self.series[player]
+            if not series.n:
+                continue
+            color = self.color(idx)
+            tag = f"tail{idx}"
+            c.delete(tag)
+
+            points = series.points
+            start = self.drawn.get(player, 0)
+            if start < len(points):
+                c.delete(f"dot{idx}")
+            for (x1, y1), (x2, y2) in zip(points[max(0, start - 1):-1], points[max(1, start):]):
+                c.create_line(self.x_to_px(x1), self.y_to_px(y1), self.x_to_px(x2), self.y_to_px(y2), fill=color, width=2)
+            self.drawn[player] = len(points)
+
+            # latest value between two stored points: one segment, replaced on every update
+            x, y = series.last
+            if len(points) == 1 and x == 1:
+                xp, yp = self.x_to_px(x), self.y_to_px(y)
+                c.create_oval(xp - 2, yp - 2, xp + 2, yp + 2, fill=color, outline=color, tags=f"dot{idx}")
+            elif points[-1][0] != x:
+                x1, y1 = points[-1]
+                c.create_line(
+                    self.x_to_px(x1), self.y_to_px(y1), self.x_to_px(x), self.y_to_px(y), fill=color, width=2, tags=tag
+                )
 
-    # History of marks for plotting
-    marks_history: Dict[str, List[float]] = defaultdict(list)
 
-    for run_idx in range(1, N_TOURNAMENT_RUNS + 1):
-        if stop_event.is_set():
-            gui.push_update(run_idx - 1, marks_history, "Stopped before starting next run.")
-            break
+class SvgPlot(CumulativePlot):
+    """
+    Headless backend with the same event protocol: instead of a GUI thread polling the
+    queue, the worker's own publish() rewrites an SVG file at most every `interval` seconds
+    (flush() forces one, e.g. at the end of the run).
+    """
 
-        print("=" * 80)
-        print(f"Starting tournament run {run_idx}/{N_TOURNAMENT_RUNS}")
-        print("=" * 80)
+    def __init__(self, path: str, runs_hint: int = 10, interval: float = 60.0):
+        super().__init__(runs_hint)
+        self.path = path
+        self.interval = interval
+        self.status = "Ready"
+        self._last_write = float("-inf")
+
+    def publish(self, event: PlotEvent):
+        super().publish(event)
+        if time.monotonic() - self._last_write >= self.interval:
+            self.flush()
+
+    def flush(self, status: Optional[str] = None):
+        _, queued = self._drain()
+        if status is not None or queued is not None:
+            self.status = status or queued
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            file.write(self.render())
+        os.replace(tmp, self.path)  # a viewer never sees a half-written file
+        self._last_write = time.monotonic()
+
+    def render(self) -> str:
+        W, H = self.canvas_w, self.canvas_h
+        LP, RP, TP, BP = self.lpad, self.rpad, self.tpad, self.bpad
+        out = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{W}" height="{H}" viewBox="0 0 {W} {H}" '
+            f'font-family="sans-serif">',
+            f'<rect width="{W}" height="{H}" fill="white"/>',
+            f'<text x="{LP}" y="{TP - 25}" font-size="18" font-weight="bold" dominant-baseline="middle">'
+            f'{html.escape(self.TITLE)}</text>',
+        ]
 
-        # Evaluate each *player* vs all bots
-        for player in players:
-            agents: List[Player] = [player] + generic_bots
-            print(f"\nEvaluating player: {player.username} (run {run_idx})")
+        # grid + ticks
+        for xv in self.x_ticks():
+            xp = self.x_to_px(xv)
+            out.append(f'<line x1="{xp:.1f}" y1="{TP}" x2="{xp:.1f}" y2="{H - BP}" stroke="#eee"/>')
+            out.append(
+                f'<text x="{xp:.1f}" y="{H - BP + 16}" font-size="11" text-anchor="middle" dominant-baseline="hanging">'
+                f'{int(round(xv))}</text>'
+            )
+        for yv in range(0, 11, 2):
+            yp = self.y_to_px(yv)
+            out.append(f'<line x1="{LP}" y1="{yp:.1f}" x2="{W - RP}" y2="{yp:.1f}" stroke="#f3f3f3"/>')
+            out.append(
+                f'<text x="{LP - 10}" y="{yp:.1f}" font-size="11" text-anchor="end" dominant-baseline="middle">{yv}</text>'
+            )
+
+        # axes + labels
+        out.append(f'<line x1="{LP}" y1="{TP}" x2="{LP}" y2="{H - BP}" stroke="#333" stroke-width="2"/>')
+        out.append(f'<line x1="{LP}" y1="{H - BP}" x2="{W - RP}" y2="{H - BP}" stroke="#333" stroke-width="2"/>')
+        out.append(
+            f'<text x="{(LP + (W - RP)) / 2:.1f}" y="{H - 10}" font-size="12" text-anchor="middle">Tournament Run #</text>'
+        )
+        ly_mid = (TP + (H - BP)) / 2
+        out.append(
+            f'<text x="20" y="{ly_mid:.1f}" font-size="12" text-anchor="middle" transform="rotate(-90 20 {ly_mid:.1f})">'
+            'Cumulative Average Mark</text>'
+        )
+
+        # series + legend
+        legend_x, legend_y, legend_step = W - RP + 20, TP + 10, 18
+        for idx, player in enumerate(sorted(self.series)):
+            series, color = self.series[player], self.color(idx)
+            if series.n:
+                pts = series.points if series.points[-1][0] == series.n else series.points + [series.last]
+                if len(pts) == 1:
+                    cx, cy = self.x_to_px(pts[0][0]), self.y_to_px(pts[0][1])
+                    out.append(f'<circle cx="{cx:.1f}" cy="{cy:.1f}" r="2" fill="{color}"/>')
+                else:
+                    coords = " ".join(f"{self.x_to_px(x):.1f},{self.y_to_px(y):.1f}" for x, y in pts)
+                    out.append(f'<polyline points="{coords}" fill="none" stroke="{color}" stroke-width="2"/>')
+            ly = legend_y + idx * legend_step
+            out.append(
+                f'<line x1="{legend_x}" y1="{ly}" x2="{legend_x + 20}" y2="{ly}" stroke="{color}" stroke-width="3"/>'
+            )
+            out.append(
+                f'<text x="{legend_x + 26}" y="{ly}" font-size="11" dominant-baseline="middle">{html.escape(player)}</text>'
+            )
 
-            agent_rankings = evaluate_against_bots(agents)
+        out.append(f'<text x="{W - RP + 20}" y="{H - 10}" font-size="11" fill="#555">{html.escape(self.status)}</text>')
+        out.append("</svg>")
+        return "\n".join(out) + "\n"
 
-            # Rank. Player - Win Rate - Mark
-            print("Rank. Player - Win Rate - Mark")
-            player_rank = len(agents) + 1
-            player_mark = 0.0
 
-            for rank, (agent_name, winrate) in enumerate(agent_rankings, 1):
-                mark = assign_marks(rank)
-                print(f"{rank}. {agent_name} - {winrate:.2f} - {mark:.2f}")
-                if agent_name == player.username:
-                    player_rank = rank
-                    player_mark = mark
+# ---------------------- Worker thread (runs the tournaments) ----------------------
+def purge_finished_battles(players: List[Player], keep: int = 0) -> int:
+    """Drops all but the `keep` newest finished battles from each player; returns how many went."""
+    purged = 0
+    for player in players:
+        finished = [tag for tag, battle in player.battles.items() if battle.finished]
+        for tag in finished[:max(0, len(finished) - keep)]:
+            del player.battles[tag]
+            purged += 1
+    return purged
+
+
+def rss_mb() -> float:
+    """Current resident set size (peak where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def print_memory_stats(run_idx: int, players: List[Player], purged: int):
+    held = sum(len(p.battles) for p in players)
+    print(f"[memory] run {run_idx}: RSS {rss_mb():.1f} MB, {held} battles held, {purged} purged")
+    for player in players:
+        states = getattr(player, "battle_states", None)
+        if states is not None:
+            print(f"[memory]   {player.username} battle states: {states.stats()}")
+
+
+def run_tournaments(gui: CumulativePlot, stop_event: threading.Event):
+    # Redraw whatever earlier sessions finished before logging anyone in
+    store = ResultsStore(RESULTS_STORE)
+    first_run = store.last_completed_run() + 1
+    resumed = False
+    for run_idx, player_name, mark in store.marks():
+        gui.publish(MarkRecorded(run_idx, player_name, mark))
+        resumed = True
+    if resumed:
+        gui.publish(StatusMessage(f"Resuming after run {first_run - 1} from {RESULTS_STORE}"))
+
+    # Collect agents once (sharded runs log in from the worker processes instead)
+    generic_bots = gather_bots(start_listening=N_SHARDS == 1, battle_format=BATTLE_FORMAT)
+    players = gather_players(start_listening=N_SHARDS == 1, battle_format=BATTLE_FORMAT)
+    player_names = [p.username for p in players]
 
-            print(f"{player.username} ranked #{player_rank} with a mark of {player_mark:.2f}\n")
+    print(f"Players detected: {player_names}")
+    print(f"Generic bots detected: {[b.username for b in generic_bots]}")
+    try:
+        if N_SHARDS == 1:
+            # log everyone in once; every evaluation after that runs on the same loop and connections
+            print(RunnerService.shared().warm_up(players))
+
+        for run_idx in range(first_run, N_TOURNAMENT_RUNS + 1):
+            if stop_event.is_set():
+                gui.publish(StatusMessage("Stopped before starting next run."))
+                break
+
+            print("=" * 80)
+            print(f"Starting tournament run {run_idx}/{N_TOURNAMENT_RUNS}")
+            print("=" * 80)
+            gui.publish(RunStarted(run_idx))
+
+            # Evaluate each *player* vs all bots
+            for player in players:
+                if store.evaluation(run_idx, player.username) is not None:
+                    print(f"\nSkipping player: {player.username} (run {run_idx} already stored)")
+                    continue
+                agents: List[Player] = [player] + generic_bots
+                print(f"\nEvaluating player: {player.username} (run {run_idx})")
+
+                agent_rankings, matrix = evaluate_against_bots(agents)
+
+                # Rank. Player - Win Rate - Mark
+                print("Rank. Player - Win Rate - Mark")
+                player_rank = len(agents) + 1
+                player_mark = 0.0
+
+                for rank, (agent_name, winrate) in enumerate(agent_rankings, 1):
+                    mark = assign_marks(rank)
+                    print(f"{rank}. {agent_name} - {winrate:.2f} - {mark:.2f}")
+                    if agent_name == player.username:
+                        player_rank = rank
+                        player_mark = mark
+
+                print(f"{player.username} ranked #{player_rank} with a mark of {player_mark:.2f}\n")
+
+                # Store first so a crash past this point does not replay the evaluation
+                store.add_evaluation(run_idx, player.username, matrix, agent_rankings, player_rank, player_mark)
+
+                # Update the plot (the event is immutable, so handing it to the GUI thread is safe)
+                gui.publish(MarkRecorded(run_idx, player.username, player_mark))
+
+            store.complete_run(run_idx)
+            gui.publish(RunFinished(run_idx))
+
+            if KEEP_FINISHED_BATTLES is not None:
+                purged = purge_finished_battles(players + generic_bots, KEEP_FINISHED_BATTLES)
+                print_memory_stats(run_idx, players + generic_bots, purged)
+
+            # If user requested stop, break after finishing this run
+            if gui.stop_after_current:
+                gui.publish(StatusMessage("Stopped after current run."))
+                break
+    finally:
+        # let any queued job finish, then log every account out
+        RunnerService.shared().close(players + generic_bots)
 
-            # Update history + GUI (thread-safe via queue)
-            marks_history[player.username].append(player_mark)
-            gui.push_update(run_idx, marks_history, f"Run {run_idx}: updated {player.username}")
+    print("Worker finished.")
 
-        # If user requested stop, break after finishing this run
-        if gui.stop_after_current:
-            gui.push_update(run_idx, marks_history, "Stopped after current run.")
-            break
 
-    print("Worker finished.")
+def main_headless():
+    plot = SvgPlot(SVG_PLOT_FILE, runs_hint=N_TOURNAMENT_RUNS, interval=SVG_PLOT_INTERVAL)
+    print(f"Headless mode: plot written to {SVG_PLOT_FILE} every {SVG_PLOT_INTERVAL:g}s")
+    try:
+        run_tournaments(plot, threading.Event())
+    except KeyboardInterrupt:
+        print("Interrupted; completed runs are in the results store.")
+        plot.flush("Interrupted")
+        return
+    plot.flush()
 
 
 def main():
+    if PLOT_BACKEND == "svg" or tk is None:
+        main_headless()
+        return
+
     # Build GUI
-    gui = LivePlot()
+    try:
+        gui = LivePlot(runs_hint=N_TOURNAMENT_RUNS)
+    except tk.TclError as err:  # no display
+        print(f"Tk unavailable ({err}); falling back to the svg backend")
+        main_headless()
+        return
     stop_event = threading.Event()
 
     # Start worker in a separate thread so the GUI remains responsive
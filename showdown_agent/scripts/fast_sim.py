@@ -0,0 +1,528 @@
+# scripts/fast_sim.py
+# Simplified gen9 singles simulator that calls CustomAgent.choose_move directly - no server, no websocket.
+# Use it to screen agent changes quickly, then confirm the promising ones on the real server:
+#
+#   python fast_sim.py --player players/aros181_counter.py --bot max_damage --battles 2000
+#
+# Modelled: damage formula with random roll, crits, STAB / Tera STAB, burn, type chart and a few common
+# items and abilities; priority and speed order; accuracy; stat boosts; par/brn/psn/tox/slp/frz; Rest and
+# Sleep Talk; Protect; Stealth Rock, Spikes, Toxic Spikes, Sticky Web and their removal; phazing; pivoting
+# (U-turn and friends switch at the end of the turn); recovery, drain and recoil; PP and Struggle.
+# Ignored: weather, terrain, screens, Substitute, Taunt/Encore and other volatiles, choice lock.
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from poke_env import AccountConfiguration
+from poke_env.battle import Battle
+from poke_env.player.player import Player
+
+from build_set_index import ensure_index
+from mock_showdown import GEN_DATA, MockBattle, MockMon, MockSide, Resolver
+
+BASE_DIR = os.path.dirname(__file__)
+BATTLE_FORMAT = "gen9ubers"
+BOT_FILES = {"simple": "simple.py", "max_damage": "max_damage.py", "random": "random.py"}
+
+CRIT_CHANCE = 1 / 24
+SPIKES_DAMAGE = {1: 1 / 8, 2: 1 / 6, 3: 1 / 4}
+HAZARD_LAYERS = {"stealthrock": 1, "spikes": 3, "toxicspikes": 2, "stickyweb": 1}
+HAZARD_NAMES = {"stealthrock": "Stealth Rock", "spikes": "Spikes", "toxicspikes": "Toxic Spikes", "stickyweb": "Sticky Web"}
+CLEARS_OWN_HAZARDS = {"rapidspin", "mortalspin"}
+CLEARS_ALL_HAZARDS = {"defog", "tidyup"}
+FOE_TARGETS = {"normal", "any", "adjacentFoe", "allAdjacentFoes", "allAdjacent", "randomNormal"}
+STATUS_IMMUNE_TYPES = {
+    "brn": {"FIRE"}, "par": {"ELECTRIC"}, "psn": {"POISON", "STEEL"}, "tox": {"POISON", "STEEL"}, "frz": {"ICE"},
+}
+FAIL_IF_FOE_NOT_ATTACKING = {"suckerpunch", "thunderclap"}
+
+
+def boost_multiplier(stage: int, accuracy: bool = False) -> float:
+    base = 3 if accuracy else 2
+    return (base + stage) / base if stage >= 0 else base / (base - stage)
+
+
+class SimResolver(Resolver):
+    """Resolves turns with a simplified ruleset (see the header of this file)."""
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+
+    # ----- helpers -----
+    @staticmethod
+    def defending_types(mon: MockMon) -> List[str]:
+        return [mon.tera_type.upper()] if mon.terastallized and mon.tera_type else mon.types
+
+    @staticmethod
+    def grounded(mon: MockMon) -> bool:
+        return "FLYING" not in SimResolver.defending_types(mon) and mon.ability != "levitate" and mon.item != "airballoon"
+
+    def effectiveness(self, move_type: str, mon: MockMon) -> float:
+        move_type = move_type.upper()
+        if move_type == "GROUND" and not self.grounded(mon):
+            return 0.0
+        mult = 1.0
+        for t in self.defending_types(mon):
+            mult *= GEN_DATA.type_chart.get(t, {}).get(move_type, 1)
+        return mult
+
+    @staticmethod
+    def speed(mon: MockMon) -> float:
+        spe = mon.stats["spe"] * boost_multiplier(mon.boosts["spe"])
+        if mon.status == "par":
+            spe *= 0.5
+        if mon.item == "choicescarf":
+            spe *= 1.5
+        return spe
+
+    def damage(self, battle: MockBattle, side: MockSide, move_id: str, move: Dict, target: MockMon, lines: List[str]) -> int:
+        user = side.active_mon
+        physical = move["category"] == "Physical"
+        atk_stat, def_stat = ("atk", "def") if physical else ("spa", "spd")
+        crit = self.rng.random() < CRIT_CHANCE
+
+        atk_boost, def_boost = user.boosts[atk_stat], target.boosts[def_stat]
+        if crit:
+            atk_boost, def_boost = max(atk_boost, 0), min(def_boost, 0)
+        attack = user.stats[atk_stat] * boost_multiplier(atk_boost)
+        defense = target.stats[def_stat] * boost_multiplier(def_boost)
+        if (physical and user.item == "choiceband") or (not physical and user.item == "choicespecs"):
+            attack *= 1.5
+        if physical and user.ability in ("hugepower", "purepower"):
+            attack *= 2
+
+        base_power = move["basePower"]
+        if move_id == "knockoff" and target.item:
+            base_power *= 1.5
+
+        damage = (2 * 100 // 5 + 2) * base_power * attack / defense // 50 + 2
+        if crit:
+            damage *= 1.5
+            lines.append(f"|-crit|{battle.opponent(side).ident(target)}")
+        damage *= self.rng.randint(85, 100) / 100
+
+        move_type = move["type"].upper()
+        if move_type in user.types or (user.terastallized and move_type == (user.tera_type or "").upper()):
+            stab = 2.0 if user.ability == "adaptability" else 1.5
+            if user.terastallized and move_type == (user.tera_type or "").upper() and move_type in user.types:
+                stab = 2.0
+            damage *= stab
+        eff = self.effectiveness(move_type, target) if move_id != "struggle" else 1.0
+        damage *= eff
+        if physical and user.status == "brn" and user.ability != "guts":
+            damage *= 0.5
+        if user.item == "lifeorb":
+            damage *= 1.3
+        elif user.item == "expertbelt" and eff > 1:
+            damage *= 1.2
+        if eff > 1:
+            lines.append(f"|-supereffective|{battle.opponent(side).ident(target)}")
+        elif 0 < eff < 1:
+            lines.append(f"|-resisted|{battle.opponent(side).ident(target)}")
+        return max(1, int(damage))
+
+    # ----- effects -----
+    def apply_damage(self, side: MockSide, mon: MockMon, amount: int, source: str = "") -> List[str]:
+        mon.hp = max(0, mon.hp - amount)
+        lines = [f"|-damage|{side.ident(mon)}|{mon.condition}" + (f"|[from] {source}" if source else "")]
+        if mon.fainted:
+            lines.append(f"|faint|{side.ident(mon)}")
+        return lines
+
+    @staticmethod
+    def heal(side: MockSide, mon: MockMon, amount: int, source: str = "") -> List[str]:
+        if mon.fainted or mon.hp >= mon.max_hp:
+            return []
+        mon.hp = min(mon.max_hp, mon.hp + max(1, amount))
+        return [f"|-heal|{side.ident(mon)}|{mon.condition}" + (f"|[from] {source}" if source else "")]
+
+    @staticmethod
+    def boost(side: MockSide, mon: MockMon, boosts: Dict[str, int]) -> List[str]:
+        lines = []
+        for stat, amount in boosts.items():
+            new = max(-6, min(6, mon.boosts[stat] + amount))
+            if new != mon.boosts[stat]:
+                kind = "-boost" if new > mon.boosts[stat] else "-unboost"
+                lines.append(f"|{kind}|{side.ident(mon)}|{stat}|{abs(new - mon.boosts[stat])}")
+                mon.boosts[stat] = new
+        return lines
+
+    def set_status(self, side: MockSide, mon: MockMon, status: str, move: Optional[Dict] = None) -> List[str]:
+        if mon.fainted or mon.status or set(self.defending_types(mon)) & STATUS_IMMUNE_TYPES.get(status, set()):
+            return []
+        if move is not None and "powder" in move.get("flags", {}) and "GRASS" in self.defending_types(mon):
+            return []
+        mon.status = status
+        mon.status_turns = self.rng.randint(2, 4) if status == "slp" else 0
+        return [f"|-status|{side.ident(mon)}|{status}"]
+
+    def switch_in(self, battle: MockBattle, side: MockSide, action: str = "switch") -> List[str]:
+        mon = side.active_mon
+        lines = [battle.switch_line(side, action)]
+
+        if mon.item != "heavydutyboots":
+            hazards = side.side_conditions
+            if hazards.get("stealthrock"):
+                lines += self.apply_damage(side, mon, int(mon.max_hp * self.effectiveness("ROCK", mon) / 8), "Stealth Rock")
+            if self.grounded(mon):
+                if hazards.get("spikes"):
+                    lines += self.apply_damage(side, mon, int(mon.max_hp * SPIKES_DAMAGE[hazards["spikes"]]), "Spikes")
+                if hazards.get("toxicspikes"):
+                    if "POISON" in self.defending_types(mon):
+                        del hazards["toxicspikes"]
+                        lines.append(f"|-sideend|{side.side_ident}|move: Toxic Spikes|[of] {side.ident(mon)}")
+                    else:
+                        lines += self.set_status(side, mon, "tox" if hazards["toxicspikes"] > 1 else "psn")
+                if hazards.get("stickyweb") and not mon.fainted:
+                    lines += self.boost(side, mon, {"spe": -1})
+
+        foe_side = battle.opponent(side)
+        if mon.ability == "intimidate" and not mon.fainted and not battle.in_preview and not foe_side.active_mon.fainted:
+            lines += self.boost(foe_side, foe_side.active_mon, {"atk": -1})
+        return lines
+
+    def phaze(self, battle: MockBattle, side: MockSide) -> List[str]:
+        if not side.bench or side.active_mon.fainted:
+            return []
+        side.active_mon.switch_out()
+        side.active = self.rng.choice(side.bench)
+        return self.switch_in(battle, side, action="drag")
+
+    def clear_hazards(self, side: MockSide) -> List[str]:
+        lines = [f"|-sideend|{side.side_ident}|move: {HAZARD_NAMES[h]}" for h in side.side_conditions if h in HAZARD_NAMES]
+        side.side_conditions = {k: v for k, v in side.side_conditions.items() if k not in HAZARD_NAMES}
+        return lines
+
+    # ----- turn -----
+    def resolve_turn(self, battle: MockBattle, choices: Dict[str, str]) -> List[str]:
+        lines: List[str] = []
+        switches: List[Tuple[MockSide, int]] = []
+        movers: List[Tuple[MockSide, str]] = []
+
+        for role, choice in choices.items():
+            side = battle.sides[role]
+            action, _, arg = choice.partition(" ")
+            if action == "switch":
+                target = side.find(arg)
+                if target is not None:
+                    switches.append((side, target))
+                    continue
+            parts = arg.split(" ") if action == "move" else []
+            move_id = parts[0] if parts else ""
+            usable = [m for m in side.active_mon.moves if side.active_mon.pp[m] > 0]
+            if move_id not in usable:
+                move_id = usable[0] if usable else "struggle"
+            if "terastallize" in parts and not side.tera_used and side.active_mon.tera_type:
+                side.tera_used = side.active_mon.terastallized = True
+                lines.append(f"|-terastallize|{side.ident(side.active_mon)}|{side.active_mon.tera_type}")
+            movers.append((side, move_id))
+
+        switches.sort(key=lambda s: self.speed(s[0].active_mon), reverse=True)
+        for side, target in switches:
+            side.active_mon.switch_out()
+            side.active = target
+            lines += self.switch_in(battle, side)
+
+        movers.sort(
+            key=lambda m: (GEN_DATA.moves.get(m[1], {}).get("priority", 0), self.speed(m[0].active_mon), self.rng.random()),
+            reverse=True,
+        )
+        moved = set()
+        for side, move_id in movers:
+            if not side.active_mon.fainted:
+                lines += self.use_move(battle, side, move_id, choices, moved)
+            moved.add(side.role)
+
+        for side in battle.sides.values():
+            lines += self.residual(side)
+        return lines
+
+    def use_move(
+        self, battle: MockBattle, side: MockSide, move_id: str, choices: Dict[str, str], moved: set, called: bool = False
+    ) -> List[str]:
+        user = side.active_mon
+        foe_side = battle.opponent(side)
+        target = foe_side.active_mon
+        move = GEN_DATA.moves.get(move_id) or GEN_DATA.moves["struggle"]
+        lines: List[str] = []
+
+        if not called:
+            if user.status == "slp":
+                user.status_turns -= 1
+                if user.status_turns <= 0:
+                    user.status = ""
+                    lines.append(f"|-curestatus|{side.ident(user)}|slp|[msg]")
+                elif move_id == "sleeptalk":
+                    lines.append(f"|move|{side.ident(user)}|Sleep Talk|{side.ident(user)}")
+                    options = [m for m in user.moves if m not in ("sleeptalk", "rest") and m in GEN_DATA.moves]
+                    if not options:
+                        return lines + [f"|-fail|{side.ident(user)}"]
+                    return lines + self.use_move(battle, side, self.rng.choice(options), choices, moved, called=True)
+                else:
+                    return [f"|cant|{side.ident(user)}|slp"]
+            elif user.status == "frz":
+                if self.rng.random() < 0.2 or "defrost" in move.get("flags", {}):
+                    user.status = ""
+                    lines.append(f"|-curestatus|{side.ident(user)}|frz|[msg]")
+                else:
+                    return [f"|cant|{side.ident(user)}|frz"]
+            elif user.status == "par" and self.rng.random() < 0.25:
+                return [f"|cant|{side.ident(user)}|par"]
+            if move_id in user.pp:
+                user.pp[move_id] -= 1
+
+        hits_foe = move["target"] in FOE_TARGETS
+        target_ident = foe_side.ident(target) if hits_foe else side.ident(user)
+        lines.append(f"|move|{side.ident(user)}|{move['name']}|{target_ident}" + ("|[from]move: Sleep Talk" if called else ""))
+
+        if move.get("stallingMove"):
+            streak = user.volatiles.get("protect_streak", 0)
+            if self.rng.random() >= 1 / 3 ** streak:
+                user.volatiles["protect_streak"] = 0
+                return lines + [f"|-fail|{side.ident(user)}"]
+            user.volatiles["protect_streak"] = streak + 1
+            user.volatiles["protect"] = 1
+            return lines + [f"|-singleturn|{side.ident(user)}|Protect"]
+        user.volatiles["protect_streak"] = 0
+
+        if hits_foe and target.fainted:
+            return lines + [f"|-fail|{side.ident(user)}"]
+        if hits_foe and target.volatiles.get("protect") and "protect" in move.get("flags", {}):
+            return lines + [f"|-activate|{foe_side.ident(target)}|move: Protect"]
+        if move_id in FAIL_IF_FOE_NOT_ATTACKING:
+            foe_choice = choices.get(foe_side.role, "")
+            foe_move = GEN_DATA.moves.get(foe_choice.partition(" ")[2].split(" ")[0], {})
+            if foe_side.role in moved or not foe_choice.startswith("move") or foe_move.get("category", "Status") == "Status":
+                return lines + [f"|-fail|{side.ident(user)}"]
+
+        accuracy = move["accuracy"]
+        if hits_foe and accuracy is not True:
+            accuracy *= boost_multiplier(user.boosts["accuracy"] - target.boosts["evasion"], accuracy=True)
+            if self.rng.random() * 100 >= accuracy:
+                return lines + [f"|-miss|{side.ident(user)}|{foe_side.ident(target)}"]
+
+        if move["category"] != "Status":
+            lines += self.damaging_move(battle, side, move_id, move)
+        else:
+            lines += self.status_move(battle, side, move_id, move)
+
+        if move.get("selfSwitch") and not user.fainted and side.bench:
+            side.pending_switch = True
+        return lines
+
+    def damaging_move(self, battle: MockBattle, side: MockSide, move_id: str, move: Dict) -> List[str]:
+        user = side.active_mon
+        foe_side = battle.opponent(side)
+        target = foe_side.active_mon
+        lines: List[str] = []
+
+        if move_id != "struggle" and self.effectiveness(move["type"], target) == 0:
+            return [f"|-immune|{foe_side.ident(target)}"]
+        before = target.hp
+        amount = self.damage(battle, side, move_id, move, target, lines)
+        lines += self.apply_damage(foe_side, target, amount)
+        dealt = before - target.hp
+
+        if move_id == "knockoff" and target.item and not target.fainted:
+            lines.append(f"|-enditem|{foe_side.ident(target)}|{target.item}|[from] move: Knock Off")
+            target.item = ""
+        if move.get("drain"):
+            num, den = move["drain"]
+            lines += self.heal(side, user, dealt * num // den, "drain")
+        if move.get("recoil"):
+            num, den = move["recoil"]
+            lines += self.apply_damage(side, user, max(1, dealt * num // den), "Recoil")
+        elif move_id == "struggle":
+            lines += self.apply_damage(side, user, max(1, user.max_hp // 4), "Recoil")
+        if user.item == "lifeorb" and not user.fainted:
+            lines += self.apply_damage(side, user, user.max_hp // 10, "item: Life Orb")
+        if "contact" in move.get("flags", {}) and target.item == "rockyhelmet" and not user.fainted:
+            lines += self.apply_damage(side, user, user.max_hp // 6, "item: Rocky Helmet")
+
+        if not user.fainted:
+            if move.get("self", {}) and move["self"].get("boosts"):
+                lines += self.boost(side, user, move["self"]["boosts"])
+            if move_id in CLEARS_OWN_HAZARDS:
+                lines += self.clear_hazards(side)
+        for secondary in move.get("secondaries") or ([move["secondary"]] if move.get("secondary") else []):
+            if self.rng.random() * 100 >= secondary.get("chance", 100):
+                continue
+            if secondary.get("status") and not target.fainted:
+                lines += self.set_status(foe_side, target, secondary["status"])
+            if secondary.get("boosts") and not target.fainted:
+                lines += self.boost(foe_side, target, secondary["boosts"])
+            if secondary.get("self", {}).get("boosts") and not user.fainted:
+                lines += self.boost(side, user, secondary["self"]["boosts"])
+        if move.get("forceSwitch") and not target.fainted:
+            lines += self.phaze(battle, foe_side)
+        return lines
+
+    def status_move(self, battle: MockBattle, side: MockSide, move_id: str, move: Dict) -> List[str]:
+        user = side.active_mon
+        foe_side = battle.opponent(side)
+        target = foe_side.active_mon
+        lines: List[str] = []
+
+        if move_id == "rest":
+            if user.status == "slp" or user.hp >= user.max_hp:
+                return [f"|-fail|{side.ident(user)}"]
+            user.status, user.status_turns, user.hp = "slp", 3, user.max_hp
+            return [f"|-status|{side.ident(user)}|slp|[from] move: Rest", f"|-heal|{side.ident(user)}|{user.condition}|[silent]"]
+        if move.get("heal"):
+            num, den = move["heal"]
+            healed = self.heal(side, user, user.max_hp * num // den)
+            return healed or [f"|-fail|{side.ident(user)}"]
+        if move.get("status"):
+            applied = self.set_status(foe_side, target, move["status"], move)
+            return applied or [f"|-fail|{foe_side.ident(target)}"]
+        if move.get("boosts"):
+            if move["target"] in FOE_TARGETS:
+                lines += self.boost(foe_side, target, move["boosts"])
+            else:
+                lines += self.boost(side, user, move["boosts"])
+        if move.get("self", {}) and move["self"].get("boosts"):
+            lines += self.boost(side, user, move["self"]["boosts"])
+        hazard = move.get("sideCondition")
+        if hazard in HAZARD_LAYERS and move["target"] == "foeSide":
+            layers = foe_side.side_conditions.get(hazard, 0)
+            if layers >= HAZARD_LAYERS[hazard]:
+                return lines + [f"|-fail|{side.ident(user)}"]
+            foe_side.side_conditions[hazard] = layers + 1
+            lines.append(f"|-sidestart|{foe_side.side_ident}|move: {HAZARD_NAMES[hazard]}")
+        if move_id in CLEARS_ALL_HAZARDS:
+            lines += self.clear_hazards(side) + self.clear_hazards(foe_side)
+        if move.get("forceSwitch"):
+            lines += self.phaze(battle, foe_side)
+        return lines
+
+    def residual(self, side: MockSide) -> List[str]:
+        mon = side.active_mon
+        mon.volatiles.pop("protect", None)
+        if mon.fainted:
+            return []
+        lines: List[str] = []
+        if mon.item == "leftovers":
+            lines += self.heal(side, mon, mon.max_hp // 16, "item: Leftovers")
+        if mon.status == "brn":
+            lines += self.apply_damage(side, mon, max(1, mon.max_hp // 16), "brn")
+        elif mon.status == "psn":
+            lines += self.apply_damage(side, mon, max(1, mon.max_hp // 8), "psn")
+        elif mon.status == "tox":
+            mon.status_turns = min(mon.status_turns + 1, 15)
+            lines += self.apply_damage(side, mon, max(1, mon.max_hp * mon.status_turns // 16), "psn")
+        return lines
+
+
+# ---------------------- driver ----------------------
+def feed(view: Battle, lines: List[str]):
+    """Applies protocol lines to a poke_env Battle the way Player._handle_battle_message does."""
+    for line in lines:
+        split = line.split("|")
+        if len(split) < 2 or split[1] in Player.MESSAGES_TO_IGNORE:
+            continue
+        if split[1] == "request":
+            view.parse_request(json.loads(split[2]))
+        elif split[1] == "win":
+            view.won_by(split[2])
+        elif split[1] == "tie":
+            view.tied()
+        else:
+            view.parse_message(split)
+
+
+def play_battle(p1: Player, p2: Player, resolver: Resolver, tag: str) -> Optional[str]:
+    """Plays one battle between two Players (start_listening=False is fine) and returns the winner's username."""
+    agents = {"p1": p1, "p2": p2}
+    sides = {
+        role: MockSide(role, agent.username, agent._team.yield_team() if agent._team else None)
+        for role, agent in agents.items()
+    }
+    battle = MockBattle(tag, BATTLE_FORMAT, sides["p1"], sides["p2"], resolver)
+    views = {role: Battle(tag, agent.username, agent.logger, gen=9) for role, agent in agents.items()}
+
+    outbox = battle.start()
+    while True:
+        for recipient, lines in outbox:
+            for side in battle.sides.values() if recipient is None else [recipient]:
+                feed(views[side.role], lines)
+        if battle.finished:
+            break
+        outbox = []
+        for side in battle.awaiting():
+            view, agent = views[side.role], agents[side.role]
+            message = agent.teampreview(view) if view.teampreview else agent.choose_move(view).message
+            outbox.extend(battle.choose(side, message))
+
+    winner = views["p1"].won and p1.username or views["p2"].won and p2.username
+    return winner or None
+
+
+def evaluate(p1: Player, p2: Player, n_battles: int, seed: Optional[int] = None) -> Tuple[int, int, int]:
+    """Returns (p1 wins, p2 wins, ties) over n_battles simulated battles."""
+    resolver = SimResolver(seed)
+    wins = {p1.username: 0, p2.username: 0, None: 0}
+    for i in range(n_battles):
+        wins[play_battle(p1, p2, resolver, f"battle-{BATTLE_FORMAT}-sim{i}")] += 1
+    return wins[p1.username], wins[p2.username], wins[None]
+
+
+# ---------------------- CLI ----------------------
+def load_module(path: str):
+    path = os.path.abspath(path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Could not load module at {path}")
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Screen an agent against a bot with the simplified offline simulator.")
+    ap.add_argument("--player", required=True, help="Path under scripts/ (e.g., players/aros181_counter.py)")
+    ap.add_argument("--bot", default="max_damage", choices=list(BOT_FILES), help="Bot to face (default max_damage)")
+    ap.add_argument("--team", default="uber", help="Bot team under bots/teams (default uber)")
+    ap.add_argument("--battles", type=int, default=1000, help="Number of battles (default 1000)")
+    ap.add_argument("--seed", type=int, default=None, help="Seed for the simulator")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.disable(logging.INFO)
+
+    ensure_index()
+    player_mod = load_module(os.path.join(BASE_DIR, args.player))
+    bot_mod = load_module(os.path.join(BASE_DIR, "bots", BOT_FILES[args.bot]))
+    with open(os.path.join(BASE_DIR, "bots", "teams", f"{args.team}.txt"), "r", encoding="utf-8") as f:
+        bot_team = f.read()
+
+    player = player_mod.CustomAgent(
+        account_configuration=AccountConfiguration("simplayer", None), battle_format=BATTLE_FORMAT, start_listening=False
+    )
+    bot = bot_mod.CustomAgent(
+        team=bot_team,
+        account_configuration=AccountConfiguration("simbot", None),
+        battle_format=BATTLE_FORMAT,
+        start_listening=False,
+    )
+
+    start = time.perf_counter()
+    wins, losses, ties = evaluate(player, bot, args.battles, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.player} vs {args.bot} ({args.team}): {wins}-{losses}-{ties}  win rate {wins / max(1, args.battles):.3f}")
+    print(f"{args.battles} battles in {elapsed:.1f}s ({args.battles / elapsed * 60:.0f} battles/min)")
+
+
+if __name__ == "__main__":
+    main()
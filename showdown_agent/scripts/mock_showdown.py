@@ -0,0 +1,478 @@
+# In-process stand-in for `node pokemon-showdown start --no-security`.
+#
+#   python mock_showdown.py --port 8000    # then run any of the expert_*.py runners unchanged
+#
+# It speaks just enough of the Showdown protocol for poke_env Players to log in, challenge,
+# accept, receive |request| JSON and send /choose. What happens in a turn is decided by a
+# pluggable Resolver, so outcomes are NOT real Pokemon battles - use it to load-test agent
+# decision throughput and runner scheduling, not to measure win rates.
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from poke_env.data import GenData, to_id_str
+from poke_env.ps_client.server_configuration import ServerConfiguration
+from poke_env.stats import compute_raw_stats
+from poke_env.teambuilder import Teambuilder
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+GEN_DATA = GenData.from_gen(9)
+STATS = ("atk", "def", "spa", "spd", "spe")
+MAX_TURNS = 300  # battles still running after this many turns end in a tie
+Outbox = List[Tuple[Optional["MockSide"], List[str]]]  # (recipient, lines); recipient None = both players
+BOOSTS = ("atk", "def", "spa", "spd", "spe", "accuracy", "evasion")
+
+
+class MockMon:
+    def __init__(self, tb_mon):
+        self.name = (tb_mon.species or tb_mon.nickname).split(" (")[0].strip()
+        species_id = to_id_str(self.name)
+        nature = (tb_mon.nature or "serious").lower()
+        raw = compute_raw_stats(species_id, tb_mon.evs, tb_mon.ivs, tb_mon.level or 100, nature, GEN_DATA)
+        self.max_hp = raw[0]
+        self.hp = raw[0]
+        self.stats = dict(zip(STATS, raw[1:]))
+        self.status = ""
+        self.status_turns = 0  # sleep turns left, or toxic counter
+        self.moves = [to_id_str(m) for m in tb_mon.moves]
+        self.pp = {m: GEN_DATA.moves[m]["pp"] * 8 // 5 if m in GEN_DATA.moves else 16 for m in self.moves}
+        self.item = to_id_str(tb_mon.item or "")
+        self.ability = to_id_str(tb_mon.ability or "")
+        self.tera_type = tb_mon.tera_type
+        self.types = [t.upper() for t in GEN_DATA.pokedex[species_id]["types"]] if species_id in GEN_DATA.pokedex else ["NORMAL"]
+        self.boosts = dict.fromkeys(BOOSTS, 0)
+        self.terastallized = False
+        self.volatiles: Dict[str, int] = {}  # resolver scratch state, cleared on switch-out
+
+    @property
+    def fainted(self) -> bool:
+        return self.hp <= 0
+
+    @property
+    def condition(self) -> str:
+        if self.fainted:
+            return "0 fnt"
+        return f"{self.hp}/{self.max_hp}" + (f" {self.status}" if self.status else "")
+
+    def switch_out(self):
+        self.boosts = dict.fromkeys(BOOSTS, 0)
+        self.volatiles = {}
+        if self.status == "tox":
+            self.status_turns = 0
+
+
+class MockSide:
+    def __init__(self, role: str, username: str, packed_team: Optional[str]):
+        self.role = role
+        self.username = username
+        self.team = [MockMon(m) for m in Teambuilder.parse_packed_team(packed_team or "")]
+        self.active = 0
+        self.choice: Optional[str] = None
+        self.needs_switch = False
+        self.pending_switch = False  # set by resolvers for U-turn style moves
+        self.tera_used = False
+        self.side_conditions: Dict[str, int] = {}
+
+    @property
+    def active_mon(self) -> MockMon:
+        return self.team[self.active]
+
+    @property
+    def defeated(self) -> bool:
+        return all(mon.fainted for mon in self.team)
+
+    @property
+    def bench(self) -> List[int]:
+        return [i for i, mon in enumerate(self.team) if i != self.active and not mon.fainted]
+
+    @property
+    def side_ident(self) -> str:
+        return f"{self.role}: {self.username}"
+
+    def ident(self, mon: MockMon, active: bool = True) -> str:
+        return f"{self.role}{'a' if active else ''}: {mon.name}"
+
+    def find(self, species: str) -> Optional[int]:
+        species = to_id_str(species)
+        for idx in self.bench:
+            if to_id_str(self.team[idx].name) == species:
+                return idx
+        return None
+
+
+class MockBattle:
+    """Turn flow of one battle, independent of transport: every step returns the messages to deliver."""
+
+    def __init__(self, tag: str, battle_format: str, p1: MockSide, p2: MockSide, resolver: "Resolver"):
+        self.tag = tag
+        self.format = battle_format
+        self.sides = {"p1": p1, "p2": p2}
+        self.resolver = resolver
+        self.turn = 0
+        self.rqid = itertools.count(1)
+        self.in_preview = True
+        self.finished = False
+
+    def opponent(self, side: MockSide) -> MockSide:
+        return self.sides["p2" if side.role == "p1" else "p1"]
+
+    def side_of(self, username: str) -> Optional[MockSide]:
+        return next((side for side in self.sides.values() if to_id_str(side.username) == to_id_str(username)), None)
+
+    def switch_line(self, side: MockSide, action: str = "switch") -> str:
+        mon = side.active_mon
+        return f"|{action}|{side.ident(mon)}|{mon.name}, L100|{mon.condition}"
+
+    def awaiting(self) -> List[MockSide]:
+        """Sides whose choice is still needed before the battle can advance."""
+        if self.finished:
+            return []
+        sides = list(self.sides.values())
+        if any(side.needs_switch for side in sides):
+            sides = [side for side in sides if side.needs_switch]
+        return [side for side in sides if side.choice is None]
+
+    def request(self, side: MockSide, wait: bool = False) -> Dict:
+        pokemon = []
+        order = [side.active] + [i for i in range(len(side.team)) if i != side.active]
+        for idx in order:
+            mon = side.team[idx]
+            pokemon.append(
+                {
+                    "ident": side.ident(mon, active=False),
+                    "details": f"{mon.name}, L100",
+                    "condition": mon.condition,
+                    "active": idx == side.active and not self.in_preview,
+                    "stats": mon.stats,
+                    "moves": mon.moves,
+                    "baseAbility": mon.ability,
+                    "item": mon.item,
+                    "pokeball": "pokeball",
+                    "ability": mon.ability,
+                    "teraType": mon.tera_type,
+                }
+            )
+        request: Dict = {"side": {"name": side.username, "id": side.role, "pokemon": pokemon}, "rqid": next(self.rqid)}
+
+        if self.in_preview:
+            request["teamPreview"] = True
+            request["maxTeamSize"] = len(side.team)
+        elif wait:
+            request["wait"] = True
+        elif side.needs_switch:
+            request["forceSwitch"] = [True]
+        else:
+            moves = [
+                {
+                    "move": GEN_DATA.moves[m]["name"] if m in GEN_DATA.moves else m,
+                    "id": m,
+                    "pp": side.active_mon.pp[m],
+                    "maxpp": GEN_DATA.moves[m]["pp"] * 8 // 5 if m in GEN_DATA.moves else 16,
+                    "target": GEN_DATA.moves[m]["target"] if m in GEN_DATA.moves else "normal",
+                    "disabled": side.active_mon.pp[m] <= 0,
+                }
+                for m in side.active_mon.moves
+            ]
+            if all(m["disabled"] for m in moves):
+                moves = [{"move": "Struggle", "id": "struggle", "target": "randomNormal", "disabled": False}]
+            active: Dict = {"moves": moves}
+            if not side.tera_used and side.active_mon.tera_type:
+                active["canTerastallize"] = side.active_mon.tera_type
+            request["active"] = [active]
+        return request
+
+    def _request_line(self, side: MockSide, wait: bool = False) -> str:
+        return f"|request|{json.dumps(self.request(side, wait))}"
+
+    def start(self) -> Outbox:
+        p1, p2 = self.sides["p1"], self.sides["p2"]
+        lines = [
+            "|init|battle",
+            f"|title|{p1.username} vs. {p2.username}",
+            f"|player|p1|{p1.username}|1|",
+            f"|player|p2|{p2.username}|1|",
+            f"|teamsize|p1|{len(p1.team)}",
+            f"|teamsize|p2|{len(p2.team)}",
+            "|gen|9",
+            f"|tier|{self.format}",
+            "|clearpoke",
+        ]
+        for side in (p1, p2):
+            lines.extend(f"|poke|{side.role}|{mon.name}, L100|" for mon in side.team)
+        lines.append("|teampreview")
+        return [(None, lines)] + [(side, [self._request_line(side)]) for side in (p1, p2)]
+
+    def choose(self, side: MockSide, text: str) -> Outbox:
+        """Records a /team or /choose message; returns the next turn's messages once both sides are in."""
+        if side not in self.awaiting():
+            return []
+        command, _, arg = text.partition(" ")
+
+        if self.in_preview:
+            if command == "/team" and arg[:1].isdigit():
+                side.active = int(arg[0]) - 1
+            side.choice = "team"
+        elif command == "/choose":
+            side.choice = arg if arg != "default" else "move"
+        else:
+            return []
+
+        if self.awaiting():
+            return []
+        return self._advance()
+
+    def _advance(self) -> Outbox:
+        sides = list(self.sides.values())
+
+        if self.in_preview:
+            self.in_preview = False
+            lines = ["|start"]
+            for side in sides:
+                lines.extend(self.resolver.switch_in(self, side))
+        elif any(side.needs_switch for side in sides):
+            lines = []
+            for side in sides:
+                if side.needs_switch:
+                    target = side.find((side.choice or "").partition(" ")[2])
+                    if target is None:
+                        target = side.bench[0]
+                    side.active_mon.switch_out()
+                    side.active = target
+                    side.needs_switch = False
+                    lines.extend(self.resolver.switch_in(self, side))
+        else:
+            choices = {side.role: side.choice or "default" for side in sides}
+            lines = self.resolver.resolve_turn(self, choices)
+
+        for side in sides:
+            side.choice = None
+
+        loser = next((side for side in sides if side.defeated), None)
+        if loser is not None or self.turn >= MAX_TURNS:
+            self.finished = True
+            return [(None, lines + [f"|win|{self.opponent(loser).username}" if loser else "|tie"])]
+
+        for side in sides:
+            side.needs_switch = bool(side.bench) and (side.active_mon.fainted or side.pending_switch)
+            side.pending_switch = False
+
+        if any(side.needs_switch for side in sides):
+            requests = [(side, [self._request_line(side, wait=not side.needs_switch)]) for side in sides]
+            return [(None, lines + ["|upkeep"])] + requests
+
+        self.turn += 1
+        return [(None, lines + ["|upkeep", f"|turn|{self.turn}"])] + [(side, [self._request_line(side)]) for side in sides]
+
+
+# ---------------------- resolvers ----------------------
+class Resolver:
+    """Decides what a turn does. Subclass and override resolve_turn to plug in other outcomes."""
+
+    def resolve_turn(self, battle: MockBattle, choices: Dict[str, str]) -> List[str]:
+        """Applies the /choose messages of both sides (keyed by role) and returns the log lines."""
+        raise NotImplementedError
+
+    def switch_in(self, battle: MockBattle, side: MockSide) -> List[str]:
+        """Log lines for side.active_mon entering the field (hazards, abilities, ...)."""
+        return [battle.switch_line(side)]
+
+
+class RandomDamageResolver(Resolver):
+    """Switches go first, then every move hits the opposing active for a random share of its max HP."""
+
+    def __init__(self, min_damage: float = 0.1, max_damage: float = 0.6, seed: Optional[int] = None):
+        self.min_damage = min_damage
+        self.max_damage = max_damage
+        self.rng = random.Random(seed)
+
+    def resolve_turn(self, battle: MockBattle, choices: Dict[str, str]) -> List[str]:
+        lines: List[str] = []
+        movers: List[Tuple[MockSide, str]] = []
+
+        for role, choice in choices.items():
+            side = battle.sides[role]
+            action, _, arg = choice.partition(" ")
+            if action == "switch":
+                target = side.find(arg)
+                if target is not None:
+                    side.active_mon.switch_out()
+                    side.active = target
+                    lines.extend(self.switch_in(battle, side))
+                    continue
+            move_id = arg.split(" ")[0] if action == "move" else ""
+            if move_id not in side.active_mon.moves:
+                move_id = side.active_mon.moves[0] if side.active_mon.moves else "struggle"
+            movers.append((side, move_id))
+
+        self.rng.shuffle(movers)
+        for side, move_id in movers:
+            if side.active_mon.fainted:
+                continue
+            target_side = battle.opponent(side)
+            target = target_side.active_mon
+            move_name = GEN_DATA.moves[move_id]["name"] if move_id in GEN_DATA.moves else move_id
+            lines.append(f"|move|{side.ident(side.active_mon)}|{move_name}|{target_side.ident(target)}")
+            damage = int(target.max_hp * self.rng.uniform(self.min_damage, self.max_damage))
+            target.hp = max(0, target.hp - damage)
+            lines.append(f"|-damage|{target_side.ident(target)}|{target.condition}")
+            if target.fainted:
+                lines.append(f"|faint|{target_side.ident(target)}")
+        return lines
+
+
+# ---------------------- server ----------------------
+class MockShowdownServer:
+    def __init__(self, host: str = "localhost", port: int = 8000, resolver: Optional[Resolver] = None):
+        self.host = host
+        self.port = port
+        self.resolver = resolver or RandomDamageResolver()
+
+        self._connections: Dict[str, ServerConnection] = {}
+        self._names: Dict[str, str] = {}  # user id -> name as logged in
+        self._teams: Dict[str, Optional[str]] = {}
+        self._challenges: Dict[Tuple[str, str], Tuple[str, Optional[str]]] = {}
+        self._battles: Dict[str, MockBattle] = {}
+        self._battle_ids = itertools.count(1)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+
+    @property
+    def server_configuration(self) -> ServerConfiguration:
+        """Pass as server_configuration= to Players so they connect here instead of localhost:8000."""
+        return ServerConfiguration(f"ws://{self.host}:{self.port}/showdown/websocket", "")
+
+    # ----- lifecycle -----
+    async def serve(self):
+        self._stopped = asyncio.Event()
+        async with serve(self._handle_connection, self.host, self.port, max_size=None):
+            self._ready.set()
+            await self._stopped.wait()
+
+    def start(self) -> "MockShowdownServer":
+        """Runs the server on its own event loop in a daemon thread."""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self.serve(),), daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop and self._stopped:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "MockShowdownServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ----- transport -----
+    async def _send(self, username: str, message: str):
+        connection = self._connections.get(username)
+        if connection is None:
+            return
+        try:
+            await connection.send(message)
+        except ConnectionClosed:
+            pass
+
+    async def _deliver(self, battle: MockBattle, outbox: Outbox):
+        for recipient, lines in outbox:
+            for side in battle.sides.values() if recipient is None else [recipient]:
+                await self._send(to_id_str(side.username), "\n".join([f">{battle.tag}"] + lines))
+        if battle.finished:
+            self._battles.pop(battle.tag, None)
+
+    async def _handle_connection(self, connection: ServerConnection):
+        username: Optional[str] = None
+        await connection.send("|challstr|4|mockchallstr")
+        try:
+            async for message in connection:
+                room, _, text = str(message).partition("|")
+                username = await self._handle_command(connection, username, room, text) or username
+        except ConnectionClosed:
+            pass
+        finally:
+            if username and self._connections.get(username) is connection:
+                del self._connections[username]
+
+    async def _handle_command(
+        self, connection: ServerConnection, username: Optional[str], room: str, text: str
+    ) -> Optional[str]:
+        command, _, arg = text.partition(" ")
+
+        if command == "/trn":
+            username = arg.split(",")[0]
+            self._connections[to_id_str(username)] = connection
+            self._names[to_id_str(username)] = username
+            await connection.send(f"|updateuser| {username}|1|1|{{}}")
+            return to_id_str(username)
+        if username is None:
+            return None
+
+        if command == "/utm":
+            self._teams[username] = None if arg == "null" else arg
+        elif command == "/challenge":
+            opponent, _, battle_format = arg.partition(",")
+            opponent, battle_format = to_id_str(opponent), battle_format.strip()
+            self._challenges[(username, opponent)] = (battle_format, self._teams.get(username))
+            await self._send(
+                opponent,
+                f"|pm| {self._names[username]}| {self._names.get(opponent, opponent)}"
+                f"|/challenge {battle_format}|{battle_format}|||",
+            )
+        elif command == "/accept":
+            challenger = to_id_str(arg)
+            challenge = self._challenges.pop((challenger, username), None)
+            if challenge:
+                battle_format, challenger_team = challenge
+                tag = f"battle-{battle_format}-{next(self._battle_ids)}"
+                p1 = MockSide("p1", self._names.get(challenger, challenger), challenger_team)
+                p2 = MockSide("p2", self._names[username], self._teams.get(username))
+                battle = self._battles[tag] = MockBattle(tag, battle_format, p1, p2, self.resolver)
+                await self._deliver(battle, battle.start())
+        elif command in ("/choose", "/team") and room in self._battles:
+            battle = self._battles[room]
+            side = battle.side_of(username)
+            if side is not None:
+                await self._deliver(battle, battle.choose(side, text))
+        return None
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Lightweight in-process stand-in for a local Showdown server.")
+    ap.add_argument("--host", default="localhost", help="Interface to listen on (default localhost)")
+    ap.add_argument("--port", type=int, default=8000, help="Port to listen on (default 8000, same as Showdown)")
+    ap.add_argument(
+        "--resolver", default="random", choices=["random", "sim"], help="random damage, or the fast_sim ruleset (default random)"
+    )
+    ap.add_argument("--seed", type=int, default=None, help="Seed for the resolver")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.resolver == "sim":
+        from fast_sim import SimResolver
+
+        resolver: Resolver = SimResolver(seed=args.seed)
+    else:
+        resolver = RandomDamageResolver(seed=args.seed)
+    server = MockShowdownServer(args.host, args.port, resolver)
+    print(f"Mock Showdown server listening on ws://{args.host}:{args.port}/showdown/websocket")
+    asyncio.run(server.serve())
+
+
+if __name__ == "__main__":
+    main()
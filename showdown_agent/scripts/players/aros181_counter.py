@@ -1,7 +1,19 @@
+import time
+from bisect import bisect_left
+
+import numpy as np
 from poke_env.battle import AbstractBattle
-from poke_env.player import Player
+from poke_env.data import GenData
+from poke_env.data.normalize import to_id_str
+from poke_env.player import BattleOrder, Player
+from poke_env.teambuilder import Teambuilder
 from poke_env.battle.side_condition import SideCondition
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
+
+try:
+    from team_table import compile_team
+except ImportError:  # a copied agent file: our stats come from the battle requests
+    compile_team = None
 
 team = """
 Clodsire @ Black Sludge
@@ -65,6 +77,325 @@ Calm Nature
 - Dragon Tail
 """
 
+# ------------ threat micro rules ------------
+# A rule looks at (agent, battle) and returns an order or None; the first order returned wins.
+Rule = Callable[["CustomAgent", AbstractBattle], Optional[BattleOrder]]
+Cond = Callable[["CustomAgent", AbstractBattle], bool]
+
+
+def _use(move_id: str, when: Optional[Cond] = None) -> Rule:
+    def rule(agent, battle):
+        m = agent._move(battle, move_id)
+        if m and (when is None or when(agent, battle)):
+            return agent.create_order(m)
+        return None
+    return rule
+
+
+def _use_first(*move_ids: str) -> Rule:
+    def rule(agent, battle):
+        for move_id in move_ids:
+            m = agent._move(battle, move_id)
+            if m:
+                return agent.create_order(m)
+        return None
+    return rule
+
+
+def _commit(move_id: str, when: Cond) -> Rule:
+    """Orders move_id whenever `when` holds, even if it is unavailable (as the old chain did)."""
+    def rule(agent, battle):
+        if when(agent, battle):
+            return agent.create_order(agent._move(battle, move_id))
+        return None
+    return rule
+
+
+def _dt(when: Optional[Cond] = None) -> Rule:
+    def rule(agent, battle):
+        dt = agent._safe_dt(battle)
+        if dt and (when is None or when(agent, battle)):
+            return agent.create_order(dt)
+        return None
+    return rule
+
+
+def _switch(order: Tuple[str, ...], base_th: float, when: Optional[Cond] = None) -> Rule:
+    def rule(agent, battle):
+        if when is None or when(agent, battle):
+            return agent._try_switch(battle, order, base_th)
+        return None
+    return rule
+
+
+def _hp_le(x: float) -> Cond:
+    return lambda agent, battle: agent._hp(battle.active_pokemon) <= x
+
+
+def _atk_boost_gt(n: int) -> Cond:
+    return lambda agent, battle: (getattr(battle.active_pokemon, "boosts", {}) or {}).get("atk", 0) > n
+
+
+def _seen(move_id: str) -> Cond:
+    return lambda agent, battle: agent._opp_has_move(battle, move_id)
+
+
+def _not_seen(move_id: str) -> Cond:
+    return lambda agent, battle: not agent._opp_has_move(battle, move_id)
+
+
+def _awake(agent, battle) -> bool:
+    return getattr(battle.active_pokemon, "status", None) != "SLP"
+
+
+def _curse_ok(max_atk_boost: int) -> Cond:
+    def cond(agent, battle):
+        me = battle.active_pokemon
+        atk_boost = (getattr(me, "boosts", {}) or {}).get("atk", 0)
+        return agent._hp(me) > 0.50 and _awake(agent, battle) and atk_boost < max_atk_boost
+    return cond
+
+
+def _rest_at(x: float) -> Cond:
+    return lambda agent, battle: _awake(agent, battle) and agent._hp(battle.active_pokemon) <= x
+
+
+def _boosted(agent, battle) -> bool:
+    return agent._opp_boosted(battle)
+
+
+def _opp_unstatused(agent, battle) -> bool:
+    return getattr(battle.opponent_active_pokemon, "status", None) is None
+
+
+def _compile_threat_rules(micro, team_species) -> Dict[Tuple[str, str], Tuple[Rule, ...]]:
+    """
+    Flattens THREAT_MICRO into {(opp species, my species): rules}. Block keys are matched the way the
+    old chain tested `key in me_name`: "*" is every mon, "!name" every mon except that one.
+    """
+    table: Dict[Tuple[str, str], Tuple[Rule, ...]] = {}
+    for tag, blocks in micro.items():
+        for me_name in team_species:
+            rules: List[Rule] = []
+            for key, block in blocks:
+                if key.startswith("!"):
+                    matches = key[1:] not in me_name
+                else:
+                    matches = key == "*" or key in me_name
+                if matches:
+                    rules.extend(block)
+            if rules:
+                table[(tag, me_name)] = tuple(rules)
+    return table
+
+
+_UNSET = object()
+
+
+class TurnContext:
+    """
+    Everything choose_move looks up more than once, gathered once per decision: moves by id,
+    bench lookups by name and memoized matchup / switch-gain / best-attack values.
+    """
+    __slots__ = ("battle", "me", "opp", "moves", "opp_moves", "switches", "bench", "matchups", "gains", "best_attack", "rule")
+
+    def __init__(self, battle: AbstractBattle):
+        self.battle = battle
+        self.me = battle.active_pokemon
+        self.opp = battle.opponent_active_pokemon
+        self.moves: Dict[str, object] = {}
+        for m in (battle.available_moves or []):
+            self.moves.setdefault(m.id, m)
+        self.opp_moves = frozenset(self._revealed(self.opp))  # ids the opponent has shown
+        self.switches = list(battle.available_switches or [])
+        self.bench: Dict[str, object] = {}      # lowered name -> first matching switch (or None)
+        self.matchups: Dict[int, float] = {}    # id(mon) -> _matchup_score(mon, opp)
+        self.gains: Dict[int, float] = {}       # id(candidate) -> _switch_gain
+        self.best_attack = _UNSET
+        self.rule = ""  # policy branch being tried; whatever it is at return produced the order
+
+    @staticmethod
+    def _revealed(opp):
+        try:
+            moves = getattr(opp, "moves", {}) or {}
+            return set(moves) | {getattr(m, "id", "") for m in moves.values()}
+        except Exception:
+            return set()
+
+
+class DecisionStats:
+    """Wall time per decision (bucketed) and how often each policy branch produced the order."""
+
+    BUCKETS_MS: Tuple[float, ...] = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 100.0)
+    FALLBACK_RULE = "random"
+
+    def __init__(self):
+        self.decisions = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.latency = [0] * (len(self.BUCKETS_MS) + 1)  # last bucket: slower than BUCKETS_MS[-1]
+        self.rules: Dict[str, int] = {}
+
+    def record(self, rule: str, seconds: float):
+        self.decisions += 1
+        self.total_s += seconds
+        if seconds > self.max_s:
+            self.max_s = seconds
+        self.latency[bisect_left(self.BUCKETS_MS, seconds * 1000.0)] += 1
+        self.rules[rule] = self.rules.get(rule, 0) + 1
+
+    @property
+    def fallback_rate(self) -> float:
+        return self.rules.get(self.FALLBACK_RULE, 0) / self.decisions if self.decisions else 0.0
+
+    def percentile_ms(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile (max time for the open bucket)."""
+        seen, need = 0, q * self.decisions
+        for i, count in enumerate(self.latency):
+            seen += count
+            if count and seen >= need:
+                return self.BUCKETS_MS[i] if i < len(self.BUCKETS_MS) else self.max_s * 1000.0
+        return 0.0
+
+    def summary(self, name: str = "") -> str:
+        if not self.decisions:
+            return f"{name}: no decisions recorded"
+        lines = [
+            f"{name}: {self.decisions} decisions, mean {self.total_s / self.decisions * 1000.0:.3f} ms, "
+            f"p50 <= {self.percentile_ms(0.5):g} ms, p99 <= {self.percentile_ms(0.99):g} ms, "
+            f"max {self.max_s * 1000.0:.3f} ms, fallback {self.fallback_rate:.1%}"
+        ]
+        bounds = [f"<={b:g}ms" for b in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]:g}ms"]
+        lines.append("  latency: " + "  ".join(f"{b} {c}" for b, c in zip(bounds, self.latency) if c))
+        width = max(18, *map(len, self.rules))
+        for rule, count in sorted(self.rules.items(), key=lambda kv: -kv[1]):
+            lines.append(f"  {rule:<{width}} {count:>7}  {count / self.decisions:6.1%}")
+        return "\n".join(lines)
+
+
+class BattleState:
+    """What the agent carries from one decision to the next within a battle."""
+    __slots__ = ("last_switch_turn", "matchups")
+
+    def __init__(self):
+        self.last_switch_turn: Optional[int] = None
+        self.matchups: Optional["MatchupMatrix"] = None  # filled in at team preview
+
+
+class BattleStates:
+    """
+    battle_tag -> BattleState. A state is allocated when the battle first needs one and
+    released when it ends; past `cap` live battles the oldest is dropped, which covers
+    battles that never report an end (forfeits, dropped connections, offline sims).
+    """
+
+    def __init__(self, cap: int = 64):
+        self.cap = cap
+        self._states: Dict[str, BattleState] = {}
+        self.allocated = 0
+        self.released = 0
+        self.evicted = 0
+        self.peak = 0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def get(self, battle_tag: str) -> BattleState:
+        state = self._states.get(battle_tag)
+        if state is None:
+            if len(self._states) >= self.cap:
+                del self._states[next(iter(self._states))]
+                self.evicted += 1
+            state = self._states[battle_tag] = BattleState()
+            self.allocated += 1
+            self.peak = max(self.peak, len(self._states))
+        return state
+
+    def release(self, battle_tag: str):
+        if self._states.pop(battle_tag, None) is not None:
+            self.released += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "live": len(self._states),
+            "peak": self.peak,
+            "allocated": self.allocated,
+            "released": self.released,
+            "evicted": self.evicted,
+        }
+
+
+# ------------ team preview ------------
+_TYPE_CHART = GenData.from_gen(9).type_chart
+_TYPE_NAMES = tuple(sorted(_TYPE_CHART))
+_TYPE_ID = {name: i for i, name in enumerate(_TYPE_NAMES)}
+_NO_TYPE = len(_TYPE_NAMES)  # neutral column for single-typed defenders
+# _TYPE_EFF[attacking type, defending type]
+_TYPE_EFF = np.ones((len(_TYPE_NAMES), len(_TYPE_NAMES) + 1))
+for _d, _row in _TYPE_CHART.items():
+    for _a, _mult in _row.items():
+        _TYPE_EFF[_TYPE_ID[_a], _TYPE_ID[_d]] = _mult
+
+
+def _type_ids(mon) -> Optional[Tuple[int, int]]:
+    """(type 1, type 2 or _NO_TYPE) as chart indices, None for types the chart does not know."""
+    try:
+        ids = [_TYPE_ID[t.name] for t in (mon.types or []) if t is not None]
+    except (KeyError, AttributeError):
+        return None
+    if not ids or len(ids) > 2:
+        return None
+    return ids[0], (ids[1] if len(ids) > 1 else _NO_TYPE)
+
+
+class MatchupMatrix:
+    """
+    The static part of _matchup_score (type edge both ways + speed tier) for every pair of
+    my team x their team, filled in one pass at team preview and read back by species.
+    """
+    __slots__ = ("mine", "theirs", "scores", "_row", "_col")
+
+    def __init__(self, mine: List, theirs: List):
+        mine = [(m, _type_ids(m)) for m in mine]
+        theirs = [(o, _type_ids(o)) for o in theirs]
+        mine = [(m, t) for m, t in mine if t is not None]
+        theirs = [(o, t) for o, t in theirs if t is not None]
+        self.mine = [m.species for m, _ in mine]
+        self.theirs = [o.species for o, _ in theirs]
+        self._row = {name: i for i, name in enumerate(self.mine)}
+        self._col = {name: j for j, name in enumerate(self.theirs)}
+
+        my_t = np.array([t for _, t in mine], dtype=np.intp).reshape(-1, 2)
+        their_t = np.array([t for _, t in theirs], dtype=np.intp).reshape(-1, 2)
+        # a single type attacks "twice" with the same type so the max is unaffected
+        my_atk = np.where(my_t == _NO_TYPE, my_t[:, :1], my_t)
+        their_atk = np.where(their_t == _NO_TYPE, their_t[:, :1], their_t)
+
+        # eff[i, j, k]: my mon i's k-th type into their mon j, and the reverse
+        ours = (
+            _TYPE_EFF[my_atk[:, None, :], their_t[None, :, None, 0]]
+            * _TYPE_EFF[my_atk[:, None, :], their_t[None, :, None, 1]]
+        )
+        theirs_eff = (
+            _TYPE_EFF[their_atk[None, :, :], my_t[:, None, None, 0]]
+            * _TYPE_EFF[their_atk[None, :, :], my_t[:, None, None, 1]]
+        )
+
+        my_spe = np.array([m.base_stats.get("spe", 0) for m, _ in mine], dtype=float).reshape(-1, 1)
+        their_spe = np.array([o.base_stats.get("spe", 0) for o, _ in theirs], dtype=float).reshape(1, -1)
+        self.scores = (ours.max(axis=2) - theirs_eff.max(axis=2)) + 0.1 * np.sign(my_spe - their_spe)
+
+    def get(self, me, opp) -> Optional[float]:
+        """Static score for (me, opp), or None if either is not in the matrix or has changed type."""
+        i, j = self._row.get(me.species), self._col.get(opp.species)
+        if i is None or j is None or me.types != me.original_types or opp.types != opp.original_types:
+            return None
+        return float(self.scores[i, j])
+
+    def lead_scores(self) -> np.ndarray:
+        """How well each of my mons does against their whole team on average."""
+        return self.scores.mean(axis=1)
+
 
 class CustomAgent(Player):
     """V7 – Ubers-expanded threat routing with focused micro"""
@@ -165,30 +496,223 @@ class CustomAgent(Player):
         "zekrom": ("arceusfairy", "giratinaorigin", "clodsire"),
     }
 
+    # Per-threat micro: (my mon key, rules) blocks in priority order, compiled into THREAT_RULES below.
+    THREAT_MICRO: Dict[str, Tuple[Tuple[str, Tuple[Rule, ...]], ...]] = {
+        # ===== original 12 =====
+        "deoxysspeed": (
+            ("giratinaorigin", (
+                _commit("dragontail", lambda a, b: a._hp(b.opponent_active_pokemon) < 0.20), _use("poltergeist"), _dt(),
+            )),
+            ("eternatus", (_dt(),)),
+            ("dondozo", (_use("liquidation", _atk_boost_gt(2)),)),
+            ("*", (_switch(("giratinaorigin",), 0.10),)),
+        ),
+        "kingambit": (
+            ("giratinaorigin", (_dt(),)),
+            ("dondozo", (_use("curse", _curse_ok(4)), _use("rest", _rest_at(0.60)), _use("liquidation"))),
+            ("arceusfairy", (_use("earthpower"),)),
+        ),
+        "zaciancrowned": (
+            ("hooh", (_use_first("sacredfire", "bravebird"), _switch(("dondozo", "arceusfairy"), 0.08, _seen("wildcharge")))),
+            ("dondozo", (_use("curse", _curse_ok(3)), _use("rest", _rest_at(0.50)), _use("liquidation"))),
+            ("giratinaorigin", (_dt(),)),
+        ),
+        "koraidon": (
+            ("arceusfairy", (
+                _use("recover", lambda a, b: a._hp(b.active_pokemon) <= 0.64 and not a._is_pressure_turn(b)), _use("judgment"),
+            )),
+            ("hooh", (_use("sacredfire"),)),
+            ("dondozo", (_use("liquidation", _atk_boost_gt(2)), _use("rest", _rest_at(0.60)))),
+            ("!arceusfairy", (
+                _switch(("arceusfairy",), 0.08, _seen("flamecharge")),
+                _switch(("arceusfairy",), 0.12, _not_seen("flamecharge")),
+            )),
+        ),
+        "arceusfairy": (
+            ("clodsire", (
+                _use("haze", lambda a, b: _boosted(a, b) and not a._opp_has_move(b, "taunt")),
+                _use("earthquake"),
+                _use("recover", _hp_le(0.55)),
+            )),
+            ("giratinaorigin", (_switch(("hooh", "clodsire"), 0.10),)),
+            ("hooh", (_use("recover", _hp_le(0.52)), _use("bravebird"), _use("sacredfire"))),
+        ),
+        "eternatus": (
+            ("clodsire", (_use("haze", _boosted), _use("recover", _hp_le(0.70)), _use("earthquake"))),
+            ("giratinaorigin", (_dt(),)),
+            ("eternatus", (_dt(),)),
+            ("dondozo", (_use("liquidation", _atk_boost_gt(2)),)),
+        ),
+        # Clodsire: Unaware + Recover/Haze; Earth Power, Dragon Tail chip and Ho-Oh's STABs get through.
+        "clodsire": (
+            ("arceusfairy", (_use("earthpower"), _use("recover", _hp_le(0.58)))),
+            ("giratinaorigin", (_dt(), _use("poltergeist", lambda a, b: a._hp(b.opponent_active_pokemon) <= 0.35))),
+            ("hooh", (_use("bravebird"), _use("sacredfire"), _use("recover", _hp_le(0.60)))),
+            ("*", (_switch(("arceusfairy", "giratinaorigin", "hooh"), 0.10),)),
+        ),
+        # Dondozo: Unaware RestTalk wall; special pressure, burns and phazing are best.
+        "dondozo": (
+            ("arceusfairy", (_use("judgment"), _use("recover", _hp_le(0.62)))),
+            ("eternatus", (_dt(), _use("recover", _hp_le(0.62)), _use("flamethrower"))),
+            ("giratinaorigin", (_use("willowisp", _opp_unstatused), _dt())),
+            ("*", (_switch(("arceusfairy", "eternatus", "giratinaorigin"), 0.10),)),
+        ),
+        "giratinaorigin": (
+            ("arceusfairy", (_use("judgment"), _use("recover", _hp_le(0.62)))),
+            ("eternatus", (_dt(),)),
+        ),
+        "hooh": (
+            ("eternatus", (_dt(lambda a, b: a._has_hazards_opp(b)), _use("flamethrower"))),
+            ("dondozo", (_use("liquidation"), _use("rest", _hp_le(0.68)))),
+        ),
+        "ogerponwellspring": (
+            ("hooh", (_use_first("sacredfire", "bravebird"), _use("recover", _hp_le(0.55)))),
+            ("eternatus", (_use("flamethrower"),)),
+            ("*", (_switch(("hooh", "eternatus"), 0.10),)),
+        ),
+        "garganacl": (
+            ("clodsire", (_use("earthquake"), _use("recover", _hp_le(0.55)))),
+            ("arceusfairy", (_use("judgment"),)),
+            ("*", (_switch(("clodsire", "arceusfairy"), 0.10),)),
+        ),
+        "greattusk": (
+            ("giratina", (_use("willowisp", _opp_unstatused), _dt())),
+            ("hooh", (_use("sacredfire"),)),
+            ("*", (_switch(("giratina", "hooh"), 0.12),)),
+        ),
+        "dragonite": (
+            ("dondozo", (_use("rest", _rest_at(0.65)), _use("liquidation"))),
+            ("giratina", (_dt(),)),
+            ("*", (_switch(("dondozo", "giratina"), 0.08),)),
+        ),
+        "moltres": (
+            ("eternatus", (_dt(), _use("flamethrower"))),
+            ("dondozo", (_use("rest", _rest_at(0.65)),)),
+            ("*", (_switch(("eternatus", "dondozo"), 0.10),)),
+        ),
+        "darkrai": (
+            ("arceusfairy", (_use("judgment"), _use("recover", _hp_le(0.60)))),
+            ("hooh", (_use("bravebird"),)),
+            ("*", (_switch(("arceusfairy", "hooh"), 0.12),)),
+        ),
+        # ===== top-14 =====
+        "kyogre": (  # Calm Mind / Water Spout / Thunder / Ice Beam variants
+            ("eternatus", (_dt(_boosted), _use("recover", _hp_le(0.60)), _use("flamethrower"))),
+            ("arceusfairy", (_use("recover", _hp_le(0.55)), _use("judgment"))),
+        ),
+        "groudon": (
+            ("hooh", (_use("sacredfire"), _use("whirlwind", _boosted))),
+            ("dondozo", (_use("rest", _hp_le(0.72)), _use("liquidation"))),
+            ("giratinaorigin", (_dt(),)),
+        ),
+        "rayquaza": (
+            ("dondozo", (_use("rest", _hp_le(0.70)), _use("liquidation"))),
+            ("giratinaorigin", (_use("willowisp"), _dt())),
+            ("hooh", (_use("sacredfire"),)),
+        ),
+        "dialgaorigin": (
+            ("clodsire", (_use("earthquake"), _use("recover", _hp_le(0.60)))),
+            ("eternatus", (_dt(),)),
+        ),
+        "palkiaorigin": (
+            ("eternatus", (_dt(_boosted), _use("recover", _hp_le(0.58)), _use("flamethrower"))),
+            ("arceusfairy", (_use("judgment"),)),
+        ),
+        "necrozmaduskmane": (
+            ("hooh", (_use("sacredfire"), _use("whirlwind", _boosted))),
+            ("giratinaorigin", (_use("willowisp"), _dt())),
+        ),
+        "lunala": (
+            ("eternatus", (_dt(), _use("flamethrower"))),
+            ("hooh", (_use("sacredfire"),)),
+        ),
+        "zacian": (
+            ("hooh", (_use_first("sacredfire", "bravebird"),)),
+            ("dondozo", (_use("rest", _hp_le(0.70)), _use("liquidation"))),
+        ),
+        "calyrexice": (
+            ("dondozo", (_use("rest", _hp_le(0.72)), _use("liquidation"))),
+            ("hooh", (_use("sacredfire"),)),
+            ("giratinaorigin", (_use("willowisp"), _dt())),
+        ),
+        "fluttermane": (
+            ("clodsire", (_use("haze", _boosted), _use("earthquake"), _use("recover", _hp_le(0.58)))),
+            ("eternatus", (_use("flamethrower"),)),
+        ),
+        "roaringmoon": (
+            ("dondozo", (_use("rest", _hp_le(0.70)), _use("liquidation"))),
+            ("hooh", (_use("sacredfire"),)),
+        ),
+        "magearna": (
+            ("hooh", (_use("sacredfire"), _use("whirlwind", _boosted))),
+            ("clodsire", (_use("earthquake"),)),
+        ),
+    }
+
     HIGH_PRESSURE: Tuple[str, ...] = (
         "zaciancrowned", "zacian", "koraidon", "kingambit", "eternatus",
     )
 
     SWITCH_COOLDOWN_TURNS = 1
     LEAD_PRIORITY = ["eternatus", "clodsire", "giratinaorigin", "dondozo", "arceusfairy", "hooh"]
+    TEAM_SPECIES: Tuple[str, ...] = tuple(
+        to_id_str(tb.species or tb.nickname or "") for tb in Teambuilder.parse_showdown_team(team)
+    )
+
+    # One dict lookup per decision instead of walking the per-threat if/elif chain
+    THREAT_RULES = _compile_threat_rules(THREAT_MICRO, TEAM_SPECIES)
 
     GENERIC_RECOVER_THRESHOLD = 0.45
     ETERNATUS_CP_MINHP = 0.62
     SECURE_KO_HP = 0.28
 
+    MAX_BATTLE_STATES = 64  # live per-battle states kept before the oldest is dropped
+
+    DEFAULT_TEAM_ORDER = "512346"
+    PREVIEW_LEAD_MARGIN = 0.5  # a computed lead must beat the default lead's row mean by this much
+
     def teampreview(self, battle):
-        return "/team 512346"
+        order = self.DEFAULT_TEAM_ORDER
+        try:
+            matrix = self._build_matchups(battle)
+            order = self._team_order(battle, matrix)
+        except Exception:
+            pass
+        return "/team " + order
 
     def __init__(self, *args, **kwargs):
         super().__init__(team=team, *args, **kwargs)
-        self._last_switch_turn: Dict[str, int] = {}
+        self._team_table = compile_team(team) if compile_team else None
+        self.battle_states = BattleStates(self.MAX_BATTLE_STATES)
+        self.decision_stats: Optional[DecisionStats] = None  # off unless a runner asks for it
+        self._ctx: Optional[TurnContext] = None
+
+    def enable_decision_stats(self) -> DecisionStats:
+        if self.decision_stats is None:
+            self.decision_stats = DecisionStats()
+        return self.decision_stats
+
+    def _battle_finished_callback(self, battle: AbstractBattle):
+        self.battle_states.release(battle.battle_tag)
 
     # ------------ helpers ------------
+    def _state(self, battle: AbstractBattle) -> BattleState:
+        return self.battle_states.get(battle.battle_tag)
+
+    def _context(self, battle: AbstractBattle) -> TurnContext:
+        # choose_move installs one per decision; anything called outside it gets a throwaway
+        ctx = self._ctx
+        if ctx is None or ctx.battle is not battle:
+            ctx = TurnContext(battle)
+        return ctx
+
     def _move(self, battle: AbstractBattle, move_id: str):
-        for m in (battle.available_moves or []):
-            if m.id == move_id:
-                return m
-        return None
+        return self._context(battle).moves.get(move_id)
+
+    def _own_stats(self, mon) -> Dict[str, int]:
+        """Our final stats from the compiled team (falls back to what the request reported)."""
+        member = self._team_table.get(mon) if self._team_table is not None else None
+        return member.stats if member is not None else (mon.stats or {})
 
     def _hp(self, mon) -> float:
         return float(getattr(mon, "current_hp_fraction", 0.0) or 0.0)
@@ -197,10 +721,10 @@ class CustomAgent(Player):
         return int(getattr(battle, "turn", 0) or 0)
 
     def _opp(self, battle):
-        return battle.opponent_active_pokemon
+        return self._context(battle).opp
 
     def _me(self, battle):
-        return battle.active_pokemon
+        return self._context(battle).me
 
     def _opp_name(self, battle) -> str:
         o = self._opp(battle)
@@ -223,6 +747,13 @@ class CustomAgent(Player):
                 return True
         return False
 
+    def _opp_has_move(self, battle: AbstractBattle, mid: str) -> bool:
+        return mid in self._context(battle).opp_moves
+
+    def _opp_boosted(self, battle: AbstractBattle) -> bool:
+        opp_boosts = getattr(self._opp(battle), "boosts", {}) or {}
+        return any(v > 0 for v in opp_boosts.values())
+
     def _is_pressure_turn(self, battle: AbstractBattle) -> bool:
         o = self._opp(battle)
         if o and getattr(o, "boosts", None) and any(v > 0 for v in o.boosts.values()):
@@ -230,10 +761,11 @@ class CustomAgent(Player):
         return False
 
     def _bench_has(self, battle: AbstractBattle, name: str):
-        for p in (battle.available_switches or []):
-            if name.lower() in (p.species or "").lower():
-                return p
-        return None
+        ctx = self._context(battle)
+        key = name.lower()
+        if key not in ctx.bench:
+            ctx.bench[key] = next((p for p in ctx.switches if key in (p.species or "").lower()), None)
+        return ctx.bench[key]
 
     def _preferred_lead(self, battle: AbstractBattle):
         if self.STATIC_LEAD_NAME:
@@ -252,6 +784,12 @@ class CustomAgent(Player):
         return None
 
     def _best_attack(self, battle: AbstractBattle):
+        ctx = self._context(battle)
+        if ctx.best_attack is _UNSET:
+            ctx.best_attack = self._compute_best_attack(battle)
+        return ctx.best_attack
+
+    def _compute_best_attack(self, battle: AbstractBattle):
         me = self._me(battle)
         opp = self._opp(battle)
         moves = battle.available_moves or []
@@ -261,8 +799,9 @@ class CustomAgent(Player):
             moves = [m for m in moves if m.id != "poltergeist"] or moves
         if "giratinaorigin" in (me.species or "") and "deoxysspeed" in (opp.species or ""):
             return None
-        atk_bias = 1.1 if me.stats.get("atk", 0) >= me.stats.get("spa", 0) else 1.0
-        spa_bias = 1.1 if me.stats.get("spa", 0) > me.stats.get("atk", 0) else 1.0
+        stats = self._own_stats(me)
+        atk_bias = 1.1 if stats.get("atk", 0) >= stats.get("spa", 0) else 1.0
+        spa_bias = 1.1 if stats.get("spa", 0) > stats.get("atk", 0) else 1.0
 
         def score(m):
             bp = m.base_power or 0
@@ -294,6 +833,46 @@ class CustomAgent(Player):
         hp_term = (self._hp(me) - self._hp(opp)) * 0.3
         return (our_eff - their_eff) + spd + hp_term
 
+    def _matchup_vs_opp(self, battle: AbstractBattle, mon) -> float:
+        """_matchup_score(mon, opponent active), memoized for the current decision."""
+        ctx = self._context(battle)
+        key = id(mon)
+        if key not in ctx.matchups:
+            ctx.matchups[key] = self._matchup_from_preview(battle, mon, ctx.opp)
+        return ctx.matchups[key]
+
+    def _matchup_from_preview(self, battle: AbstractBattle, me, opp) -> float:
+        # static part from the preview matrix, hp term live; anything it misses is scored in full
+        matrix = self._state(battle).matchups
+        if matrix is not None and me and opp:
+            static = matrix.get(me, opp)
+            if static is not None:
+                return static + (self._hp(me) - self._hp(opp)) * 0.3
+        return self._matchup_score(me, opp)
+
+    def _build_matchups(self, battle: AbstractBattle) -> MatchupMatrix:
+        mine = list((battle.team or {}).values())
+        theirs = list(getattr(battle, "teampreview_opponent_team", None) or [])
+        matrix = MatchupMatrix(mine, theirs)
+        self._state(battle).matchups = matrix
+        return matrix
+
+    def _team_order(self, battle: AbstractBattle, matrix: MatchupMatrix) -> str:
+        """Default order, with the lead swapped for the best preview row if it is clearly better."""
+        order = self.DEFAULT_TEAM_ORDER
+        team_list = list((battle.team or {}).values())
+        if not matrix.theirs or len(team_list) < len(order):
+            return order
+        rows = matrix.lead_scores()
+        row_of = {slot: matrix._row.get(mon.species) for slot, mon in enumerate(team_list, start=1)}
+        default_row = row_of.get(int(order[0]))
+        if default_row is None:
+            return order
+        best_slot = max((s for s, r in row_of.items() if r is not None), key=lambda s: rows[row_of[s]])
+        if rows[row_of[best_slot]] - rows[default_row] < self.PREVIEW_LEAD_MARGIN:
+            return order
+        return str(best_slot) + order.replace(str(best_slot), "")
+
     def _has_hazards_self(self, battle: AbstractBattle) -> bool:
         sc = battle.side_conditions or {}
         return any(k in sc for k in (SideCondition.STEALTH_ROCK, SideCondition.SPIKES, SideCondition.TOXIC_SPIKES, SideCondition.STICKY_WEB))
@@ -317,77 +896,101 @@ class CustomAgent(Player):
         return chip
 
     def _switch_gain(self, battle: AbstractBattle, candidate) -> float:
-        me, opp = self._me(battle), self._opp(battle)
-        if not me or not opp or not candidate:
+        ctx = self._context(battle)
+        if not ctx.me or not ctx.opp or not candidate:
             return -999.0
-        gain = (self._matchup_score(candidate, opp) - self._matchup_score(me, opp))
-        gain -= self._hazard_chip_estimate(battle, candidate)
-        return gain
+        key = id(candidate)
+        if key not in ctx.gains:
+            gain = (self._matchup_vs_opp(battle, candidate) - self._matchup_vs_opp(battle, ctx.me))
+            gain -= self._hazard_chip_estimate(battle, candidate)
+            ctx.gains[key] = gain
+        return ctx.gains[key]
 
     def _note_switch(self, battle: AbstractBattle):
-        self._last_switch_turn[battle.battle_tag] = self._turn(battle)
+        self._state(battle).last_switch_turn = self._turn(battle)
+
+    def _safe_dt(self, battle: AbstractBattle):
+        """Dragontail that auto-disables into Fairy immunities."""
+        m = self._move(battle, "dragontail")
+        if m and self._opp_has_type(battle, "Fairy"):
+            return None
+        return m
+
+    def _try_switch(self, battle: AbstractBattle, order, base_th=0.16):
+        # Boosted foe -> lower switching threshold to respond faster
+        th = base_th - 0.08 if self._opp_boosted(battle) else base_th
+        for name in order:
+            sw = self._bench_has(battle, name)
+            if sw and self._hp(sw) >= 0.40 and self._switch_gain(battle, sw) > th:
+                self._note_switch(battle)
+                return self.create_order(sw)
+        return None
 
     def _pick_replacement(self, battle: AbstractBattle):
         pref = self._preferred_switch(battle)
         if pref:
             return pref
-        opp = self._opp(battle)
-        cands = battle.available_switches or []
+        cands = self._context(battle).switches
         if not cands:
             return None
 
         def ms(p):
-            return self._matchup_score(p, opp) + self._hp(p) * 0.25
+            return self._matchup_vs_opp(battle, p) + self._hp(p) * 0.25
 
         return max(cands, key=ms)
 
     # ------------ policy ------------
     def choose_move(self, battle: AbstractBattle):
-        me, opp = self._me(battle), self._opp(battle)
-
-        # --- small helpers (local, no deps) ---
-        def opp_has_move(mid: str) -> bool:
+        stats = self.decision_stats
+        if stats is None:
+            self._ctx = TurnContext(battle)
             try:
-                moves = getattr(opp, "moves", {}) or {}
-                return (mid in moves) or any(getattr(m, "id", "") == mid for m in moves.values())
-            except Exception:
-                return False
+                return self._choose_move(battle)
+            finally:
+                self._ctx = None
+
+        start = time.perf_counter()
+        self._ctx = ctx = TurnContext(battle)
+        try:
+            order = self._choose_move(battle)
+        finally:
+            self._ctx = None
+        stats.record(ctx.rule, time.perf_counter() - start)
+        return order
+
+    def _choose_move(self, battle: AbstractBattle):
+        ctx = self._context(battle)
+        me, opp = ctx.me, ctx.opp
 
+        # --- small helpers (local, no deps) ---
         def can_use(m_id: str):
             return self._move(battle, m_id)
 
         def safe_dt():
-            """Dragontail that auto-disables into Fairy immunities."""
-            m = can_use("dragontail")
-            if m and self._opp_has_type(battle, "Fairy"):
-                return None
-            return m
+            return self._safe_dt(battle)
 
         def try_switch(order, base_th=0.16):
-            # Boosted foe -> lower switching threshold to respond faster
-            th = base_th - 0.08 if opp_boosted else base_th
-            for name in order:
-                sw = self._bench_has(battle, name)
-                if sw and self._hp(sw) >= 0.40 and self._switch_gain(battle, sw) > th:
-                    self._note_switch(battle)
-                    return self.create_order(sw)
-            return None
+            return self._try_switch(battle, order, base_th)
 
         # Forced switch: lead / post-KO
         fs = getattr(battle, "force_switch", False)
         if bool(fs if isinstance(fs, bool) else any(fs)):
             if (not opp or not (opp.species or "")):
+                ctx.rule = "lead"
                 lead = self._preferred_lead(battle)
                 if lead:
                     self._note_switch(battle)
                     return self.create_order(lead)
+            ctx.rule = "replacement"
             pick = self._pick_replacement(battle)
             if pick:
                 self._note_switch(battle)
                 return self.create_order(pick)
+            ctx.rule = DecisionStats.FALLBACK_RULE
             return self.choose_random_move(battle)
 
         if not me or not opp:
+            ctx.rule = DecisionStats.FALLBACK_RULE
             return self.choose_random_move(battle)
 
         oname = self._opp_name(battle)      # already lower + no hyphen per your setup
@@ -400,12 +1003,14 @@ class CustomAgent(Player):
 
         # --- SLP policy
         if getattr(me, "status", None) == "SLP":
+            ctx.rule = "sleep_talk"
             st = can_use("sleeptalk")
             if st:
                 return self.create_order(st)
 
         # --- anti-boost utilities before KO tunnel
         if opp_boosted:
+            ctx.rule = "anti_boost"
             if ("giratinaorigin" in me_name or "eternatus" in me_name):
                 dt = safe_dt()
                 if dt:
@@ -417,11 +1022,13 @@ class CustomAgent(Player):
 
         # --- Eternatus shouldn't stare down Zacian/Koraidon
         if "eternatus" in me_name and tag in {"zaciancrowned", "koraidon"}:
+            ctx.rule = "eternatus_escape"
             mv = try_switch(self.THREAT_SWITCH.get(tag, ()), base_th=-0.05)
             if mv:
                 return mv
 
         # Secure-KO bias
+        ctx.rule = "secure_ko"
         atk = self._best_attack(battle)
         if atk and self._hp(opp) <= self.SECURE_KO_HP:
             return self.create_order(atk)
@@ -433,454 +1040,22 @@ class CustomAgent(Player):
             base = -0.02 if tag in {"kyogre", "groudon", "rayquaza", "zacian", "zaciancrowned",
                                     "necrozmaduskmane", "roaringmoon"} else 0.12
             if all(top not in me_name for top in order[:2]):
+                ctx.rule = "threat_switch"
                 mv = try_switch(order, base_th=base)
                 if mv:
                     return mv
 
-            # ===== micro (original 12 kept) =====
-            if tag == "deoxysspeed":
-                if "giratinaorigin" in me_name:
-                    if self._hp(opp) < 0.20:
-                        dt = can_use("dragontail")
-                        return self.create_order(dt)
-                    df = can_use("poltergeist")
-                    if df: 
-                        return self.create_order(df)
-                    dt = safe_dt()
-                    if dt: return self.create_order(dt)
-                if "eternatus" in me_name:
-                    dt = safe_dt()
-                    if dt: return self.create_order(dt)
-                if "dondozo" in me_name:
-                    boosts = getattr(me, "boosts", {}) or {}
-                    atk_boost = boosts.get("atk", 0)
-                    if atk_boost > 2:
-                        liq = can_use("liquidation")
-                        if liq: return self.create_order(liq)
-                mv = try_switch(("giratinaorigin",), base_th=0.10)
-                if mv: return mv
-
-            elif tag == "kingambit":
-                if "giratinaorigin" in me_name:
-                    w = can_use("willowisp")
-                    # if w and opp and opp.status is None and (not opp.types or "Fire" not in opp.types):
-                    #     return self.create_order(w)
-                    dt = safe_dt()
-                    if dt:
-                        return self.create_order(dt)
-                if "dondozo" in me_name:
-                    cr = can_use("curse")
-                    boosts = getattr(me, "boosts", {}) or {}
-                    atk_boost = boosts.get("atk", 0)
-                    if cr and self._hp(me) > 0.50 and getattr(me, "status", None) != "SLP" and atk_boost < 4:
-                        return self.create_order(cr)
-                    r = can_use("rest")
-                    if r and getattr(me, "status", None) != "SLP" and self._hp(me) <= 0.60:
-                        return self.create_order(r)
-                    liq = can_use("liquidation")
-                    if liq: return self.create_order(liq)
-                if "arceusfairy" in me_name:
-                    ep = can_use("earthpower")
-                    if ep: return self.create_order(ep)
-
-            elif tag == "zaciancrowned":
-                wc_seen = opp_has_move("wildcharge")
-                if "hooh" in me_name:
-                    sf_or_bb = can_use("sacredfire") or can_use("bravebird")
-                    if sf_or_bb: return self.create_order(sf_or_bb)
-                    if wc_seen:
-                        mv = try_switch(("dondozo", "arceusfairy"), base_th=0.08)
-                        if mv: return mv
-                if "dondozo" in me_name:
-                    cr = can_use("curse")
-                    boosts = getattr(me, "boosts", {}) or {}
-                    atk_boost = boosts.get("atk", 0)
-                    if cr and self._hp(me) > 0.50 and getattr(me, "status", None) != "SLP" and atk_boost < 3:
-                        return self.create_order(cr)
-                    r = can_use("rest")
-                    if r and getattr(me, "status", None) != "SLP" and self._hp(me) <= 0.50:
-                        return self.create_order(r)
-                    liq = can_use("liquidation")
-                    if liq: return self.create_order(liq)
-                if "giratinaorigin" in me_name:
-                    dt = safe_dt()
-                    if dt: return self.create_order(dt)
-            
-            elif tag == "koraidon":
-                fc_seen = opp_has_move("flamecharge")
-                if "arceusfairy" in me_name:
-                    rec = can_use("recover")
-                    if rec and self._hp(me) <= 0.64 and not self._is_pressure_turn(battle):
-                        return self.create_order(rec)
-                    jd = can_use("judgment")
-                    if jd: return self.create_order(jd)
-                if "hooh" in me_name:
-                    sf = can_use("sacredfire")
-                    if sf: return self.create_order(sf)
-                if "dondozo" in me_name:
-                    boosts = getattr(me, "boosts", {}) or {}
-                    atk_boost = boosts.get("atk", 0)
-                    if atk_boost > 2:
-                        liq = can_use("liquidation")
-                        if liq: return self.create_order(liq)
-                    r = can_use("rest")
-                    if r and getattr(me, "status", None) != "SLP" and self._hp(me) <= 0.60:
-                        return self.create_order(r)
-                if "arceusfairy" not in me_name:
-                    mv = try_switch(("arceusfairy",), base_th=0.08 if fc_seen else 0.12)
-                    if mv: return mv
-
-            elif tag == "arceusfairy":
-                taunt_seen = opp_has_move("taunt")
-                if "clodsire" in me_name:
-                    if not taunt_seen:
-                        hz = can_use("haze")
-                        if hz and opp_boosted: return self.create_order(hz)
-                    eq = can_use("earthquake")
-                    if eq: return self.create_order(eq)
-                    rec = can_use("recover")
-                    if rec and self._hp(me) <= 0.55: return self.create_order(rec)
-                if "giratinaorigin" in me_name:
-                    mv = try_switch(("hooh", "clodsire"), base_th=0.10)
-                    if mv: return mv
-                if "hooh" in me_name:
-                    rec = can_use("recover")
-                    if rec and self._hp(me) <= 0.52: return self.create_order(rec)
-                    bb = can_use("bravebird")
-                    if bb: return self.create_order(bb)
-                    sf = can_use("sacredfire")
-                    if sf: return self.create_order(sf)
-
-            elif tag == "eternatus":
-                if "clodsire" in me_name:
-                    if opp_boosted:
-                        hz = can_use("haze")
-                        if hz: return self.create_order(hz)
-                    rec = can_use("recover")
-                    if rec and self._hp(me) <= 0.70: 
-                        return self.create_order(rec)
-                    eq = can_use("earthquake")
-                    if eq: return self.create_order(eq)
-                if "giratinaorigin" in me_name or "eternatus" in me_name:
-                    dt = safe_dt()
-                    if dt: return self.create_order(dt)
-                if "dondozo" in me_name:
-                    boosts = getattr(me, "boosts", {}) or {}
-                    atk_boost = boosts.get("atk", 0)
-                    if atk_boost > 2:
-                        liq = can_use("liquidation")
-                        if liq: return self.create_order(liq)
-            
-            elif tag == "clodsire":
-                # Clodsire is Poison/Ground with Unaware + Recover/Haze in your set.
-                # Best answers: Arceus-Fairy (EARTH POWER), Giratina-O (Dragon Tail), Ho-Oh (Brave Bird/SF).
-                if "arceusfairy" in me_name:
-                    # Unaware ignores Calm Mind → just attack / sustain.
-                    ep = can_use("earthpower")
-                    if ep: return self.create_order(ep)
-                    rec = can_use("recover")
-                    if rec and self._hp(me) <= 0.58: return self.create_order(rec)
-
-                if "giratinaorigin" in me_name:
-                    # Phaze to rack chip/hazards; avoid wasting Poltergeist on a regen wall that can Recover.
-                    dt = safe_dt()
-                    if dt: return self.create_order(dt)
-                    pg = can_use("poltergeist")
-                    if pg and self._hp(opp) <= 0.35: return self.create_order(pg)  # late KO window
-
-                if "hooh" in me_name:
-                    # Ho-Oh can brute force with BB, or SF to fish for burns on a switch.
-                    bb = can_use("bravebird")
-                    if bb: return self.create_order(bb)
-                    sf = can_use("sacredfire")
-                    if sf: return self.create_order(sf)
-                    rec = can_use("recover")
-                    if rec and self._hp(me) <= 0.60: return self.create_order(rec)
-
-                # If we're not on a top answer, pivot quickly; Clodsire stalls non-SE threats.
-                mv = try_switch(("arceusfairy", "giratinaorigin", "hooh"), base_th=0.10)
-                if mv: return mv
-            
-            elif tag == "dondozo":
-                # Dondozo is Unaware/resttalk phys wall; special pressure and phazing are best.
-                if "arceusfairy" in me_name:
-                    # CM is ignored by Unaware → just Judgment + sustain.
-                    jd = can_use("judgment")
-                    if jd: return self.create_order(jd)
-                    rec = can_use("recover")
-                    if rec and self._hp(me) <= 0.62: return self.create_order(rec)
-
-                if "eternatus" in me_name:
-                    # Phaze to punish Rest cycles / bring in worse matchups; keep healthy.
-                    dt = safe_dt()
-                    if dt: return self.create_order(dt)
-                    rec = can_use("recover")
-                    if rec and self._hp(me) <= 0.62: return self.create_order(rec)
-                    ft = can_use("flamethrower")
-                    if ft: return self.create_order(ft)
-
-                if "giratinaorigin" in me_name:
-                    # Burn neuters Liquidation damage; DT to deny setup Rest loops.
-                    w = can_use("willowisp")
-                    if w and (getattr(opp, "status", None) is None): return self.create_order(w)
-                    dt = safe_dt()
-                    if dt: return self.create_order(dt)
-
-                # If we're on the wrong mon (e.g., Clodsire/Ho-Oh), pivot to the special attackers/phazers.
-                mv = try_switch(("arceusfairy", "eternatus", "giratinaorigin"), base_th=0.10)
-                if mv: return mv
-
-            elif tag == "giratinaorigin":
-                if "arceusfairy" in me_name:
-                    jd = can_use("judgment")
-                    if jd: return self.create_order(jd)
-                    rec = can_use("recover")
-                    if rec and self._hp(me) <= 0.62: return self.create_order(rec)
-                if "eternatus" in me_name:
-                    dt = safe_dt()
-                    if dt: return self.create_order(dt)
-
-            elif tag == "hooh":
-                if "eternatus" in me_name:
-                    dt = safe_dt()
-                    if dt and self._has_hazards_opp(battle): return self.create_order(dt)
-                    ft = can_use("flamethrower")
-                    if ft: return self.create_order(ft)
-                if "dondozo" in me_name:
-                    liq = can_use("liquidation")
-                    if liq: return self.create_order(liq)
-                    r = can_use("rest")
-                    if r and self._hp(me) <= 0.68: return self.create_order(r)
-            
-            elif tag == "ogerponwellspring":
-                if "hooh" in me_name:
-                    sf_or_bb = can_use("sacredfire") or can_use("bravebird")
-                    if sf_or_bb: return self.create_order(sf_or_bb)
-                    rec = can_use("recover")
-                    if rec and self._hp(me) <= 0.55:
-                        return self.create_order(rec)
-                if "eternatus" in me_name:
-                    ft = can_use("flamethrower")
-                    if ft: return self.create_order(ft)
-                mv = try_switch(("hooh", "eternatus"), base_th=0.10)
-                if mv: return mv
-
-            elif tag == "garganacl":
-                if "clodsire" in me_name:
-                    eq = can_use("earthquake")
-                    if eq: return self.create_order(eq)
-                    rec = can_use("recover")
-                    if rec and self._hp(me) <= 0.55: return self.create_order(rec)
-                if "arceusfairy" in me_name:
-                    jd = can_use("judgment")
-                    if jd: return self.create_order(jd)
-                mv = try_switch(("clodsire", "arceusfairy"), base_th=0.10)
-                if mv: return mv
-
-            elif tag == "greattusk":
-                if "giratina" in me_name:
-                    w = can_use("willowisp")
-                    if w and opp and opp.status is None: return self.create_order(w)
-                    dt = safe_dt()
-                    if dt: return self.create_order(dt)
-                if "hooh" in me_name:
-                    sf = can_use("sacredfire")
-                    if sf: return self.create_order(sf)
-                mv = try_switch(("giratina", "hooh"), base_th=0.12)
-                if mv: return mv
-
-            elif tag == "dragonite":
-                if "dondozo" in me_name:
-                    r = can_use("rest")
-                    if r and getattr(me, "status", None) != "SLP" and self._hp(me) <= 0.65:
-                        return self.create_order(r)
-                    liq = can_use("liquidation")
-                    if liq: return self.create_order(liq)
-                if "giratina" in me_name:
-                    dt = safe_dt()
-                    if dt: return self.create_order(dt)
-                mv = try_switch(("dondozo", "giratina"), base_th=0.08)
-                if mv: return mv
-
-            elif tag == "moltres":
-                if "eternatus" in me_name:
-                    dt = safe_dt()
-                    if dt: return self.create_order(dt)
-                    ft = can_use("flamethrower")
-                    if ft: return self.create_order(ft)
-                if "dondozo" in me_name:
-                    r = can_use("rest")
-                    if r and getattr(me, "status", None) != "SLP" and self._hp(me) <= 0.65:
-                        return self.create_order(r)
-                mv = try_switch(("eternatus", "dondozo"), base_th=0.10)
-                if mv: return mv
-
-            elif tag == "darkrai":
-                if "arceusfairy" in me_name:
-                    jd = can_use("judgment")
-                    if jd: return self.create_order(jd)
-                    rec = can_use("recover")
-                    if rec and self._hp(me) <= 0.60:
-                        return self.create_order(rec)
-                if "hooh" in me_name:
-                    bb = can_use("bravebird")
-                    if bb: return self.create_order(bb)
-                mv = try_switch(("arceusfairy", "hooh"), base_th=0.12)
-                if mv: return mv
-
-            # ======= new top-14 micro =======
-            elif tag == "kyogre":
-                # Calm Mind / Water Spout / Thunder / Ice Beam variants
-                if "eternatus" in me_name:
-                    if opp_boosted:
-                        dt = safe_dt()
-                        if dt: return self.create_order(dt)
-                    rec = can_use("recover")
-                    if rec and self._hp(me) <= 0.60: return self.create_order(rec)
-                    ft = can_use("flamethrower")
-                    if ft: return self.create_order(ft)
-                if "arceusfairy" in me_name:
-                    rec = can_use("recover")
-                    if rec and self._hp(me) <= 0.55: return self.create_order(rec)
-                    jd = can_use("judgment")
-                    if jd: return self.create_order(jd)
-
-            elif tag == "groudon":
-                if "hooh" in me_name:
-                    sf = can_use("sacredfire")
-                    if sf: return self.create_order(sf)
-                    ww = can_use("whirlwind")
-                    if ww and opp_boosted: return self.create_order(ww)
-                if "dondozo" in me_name:
-                    r = can_use("rest")
-                    if r and self._hp(me) <= 0.72: return self.create_order(r)
-                    liq = can_use("liquidation")
-                    if liq: return self.create_order(liq)
-                if "giratinaorigin" in me_name:
-                    dt = safe_dt()
-                    if dt: return self.create_order(dt)
-
-            elif tag == "rayquaza":
-                if "dondozo" in me_name:
-                    r = can_use("rest")
-                    if r and self._hp(me) <= 0.70: return self.create_order(r)
-                    liq = can_use("liquidation")
-                    if liq: return self.create_order(liq)
-                if "giratinaorigin" in me_name:
-                    w = can_use("willowisp")
-                    if w: return self.create_order(w)
-                    dt = safe_dt()
-                    if dt: return self.create_order(dt)
-                if "hooh" in me_name:
-                    sf = can_use("sacredfire")
-                    if sf: return self.create_order(sf)
-
-            elif tag == "dialgaorigin":
-                if "clodsire" in me_name:
-                    eq = can_use("earthquake")
-                    if eq: return self.create_order(eq)
-                    rec = can_use("recover")
-                    if rec and self._hp(me) <= 0.60: return self.create_order(rec)
-                if "eternatus" in me_name:
-                    dt = safe_dt()
-                    if dt: return self.create_order(dt)
-
-            elif tag == "palkiaorigin":
-                if "eternatus" in me_name:
-                    if opp_boosted:
-                        dt = safe_dt()
-                        if dt: return self.create_order(dt)
-                    rec = can_use("recover")
-                    if rec and self._hp(me) <= 0.58: return self.create_order(rec)
-                    ft = can_use("flamethrower")
-                    if ft: return self.create_order(ft)
-                if "arceusfairy" in me_name:
-                    jd = can_use("judgment")
-                    if jd: return self.create_order(jd)
-
-            elif tag == "necrozmaduskmane":
-                if "hooh" in me_name:
-                    sf = can_use("sacredfire")
-                    if sf: return self.create_order(sf)
-                    ww = can_use("whirlwind")
-                    if ww and opp_boosted: return self.create_order(ww)
-                if "giratinaorigin" in me_name:
-                    w = can_use("willowisp")
-                    if w: return self.create_order(w)
-                    dt = safe_dt()
-                    if dt: return self.create_order(dt)
-
-            elif tag == "lunala":
-                if "eternatus" in me_name:
-                    dt = safe_dt()
-                    if dt: return self.create_order(dt)
-                    ft = can_use("flamethrower")
-                    if ft: return self.create_order(ft)
-                if "hooh" in me_name:
-                    sf = can_use("sacredfire")
-                    if sf: return self.create_order(sf)
-
-            elif tag == "zacian":
-                if "hooh" in me_name:
-                    sf_or_bb = can_use("sacredfire") or can_use("bravebird")
-                    if sf_or_bb: return self.create_order(sf_or_bb)
-                if "dondozo" in me_name:
-                    r = can_use("rest")
-                    if r and self._hp(me) <= 0.70: return self.create_order(r)
-                    liq = can_use("liquidation")
-                    if liq: return self.create_order(liq)
-
-            elif tag == "calyrexice":
-                if "dondozo" in me_name:
-                    r = can_use("rest")
-                    if r and self._hp(me) <= 0.72: return self.create_order(r)
-                    liq = can_use("liquidation")
-                    if liq: return self.create_order(liq)
-                if "hooh" in me_name:
-                    sf = can_use("sacredfire")
-                    if sf: return self.create_order(sf)
-                if "giratinaorigin" in me_name:
-                    w = can_use("willowisp")
-                    if w: return self.create_order(w)
-                    dt = safe_dt()
-                    if dt: return self.create_order(dt)
-
-            elif tag == "fluttermane":
-                if "clodsire" in me_name:
-                    if opp_boosted:
-                        hz = can_use("haze")
-                        if hz: return self.create_order(hz)
-                    eq = can_use("earthquake")
-                    if eq: return self.create_order(eq)
-                    rec = can_use("recover")
-                    if rec and self._hp(me) <= 0.58: return self.create_order(rec)
-                if "eternatus" in me_name:
-                    ft = can_use("flamethrower")
-                    if ft: return self.create_order(ft)
-
-            elif tag == "roaringmoon":
-                if "dondozo" in me_name:
-                    r = can_use("rest")
-                    if r and self._hp(me) <= 0.70: return self.create_order(r)
-                    liq = can_use("liquidation")
-                    if liq: return self.create_order(liq)
-                if "hooh" in me_name:
-                    sf = can_use("sacredfire")
-                    if sf: return self.create_order(sf)
-
-            elif tag == "magearna":
-                if "hooh" in me_name:
-                    sf = can_use("sacredfire")
-                    if sf: return self.create_order(sf)
-                    ww = can_use("whirlwind")
-                    if ww and opp_boosted: return self.create_order(ww)
-                if "clodsire" in me_name:
-                    eq = can_use("earthquake")
-                    if eq: return self.create_order(eq)
+            # ===== micro: see THREAT_MICRO =====
+            ctx.rule = f"threat_micro:{tag}"
+            for rule in self.THREAT_RULES.get((tag, me_name), ()):
+                mv = rule(self, battle)
+                if mv:
+                    return mv
 
         # ---------------- generic rails (kept light) ----------------
         # Eternatus generic
         if "eternatus" in me_name:
+            ctx.rule = "eternatus_rail"
             if opp_boosted:
                 dt = safe_dt()
                 if dt: return self.create_order(dt)
@@ -893,12 +1068,14 @@ class CustomAgent(Player):
 
         # Hazard control when on Giratina
         if "giratinaorigin" in me_name and self._has_hazards_self(battle):
+            ctx.rule = "defog"
             df = can_use("defog")
             if df and self._hp(me) >= 0.30:
                 return self.create_order(df)
 
         # Phaze for chip if they have hazards up and no Fairy immunity to DT
         if self._has_hazards_opp(battle) and not self._opp_has_type(battle, "Fairy"):
+            ctx.rule = "phaze"
             if "giratinaorigin" in me_name or "eternatus" in me_name:
                 dt = safe_dt()
                 if dt: return self.create_order(dt)
@@ -907,6 +1084,7 @@ class CustomAgent(Player):
                 if ww: return self.create_order(ww)
 
         # Greedy but safe heals
+        ctx.rule = "heal"
         if not self._is_pressure_turn(battle):
             rec = can_use("recover")
             if rec and self._hp(me) <= self.GENERIC_RECOVER_THRESHOLD:
@@ -915,15 +1093,18 @@ class CustomAgent(Player):
             return self.create_order(can_use("rest"))
 
         # Default: best attack; last-resort pivot if losing badly
+        ctx.rule = "best_attack"
         atk = self._best_attack(battle)
         if atk:
             return self.create_order(atk)
 
-        cur = self._matchup_score(me, opp)
+        cur = self._matchup_vs_opp(battle, me)
         if battle.available_switches and (self._hp(me) < 0.30 or cur <= -1.0):
+            ctx.rule = "last_pivot"
             pick = self._pick_replacement(battle)
             if pick:
                 self._note_switch(battle)
                 return self.create_order(pick)
 
+        ctx.rule = DecisionStats.FALLBACK_RULE
         return self.choose_random_move(battle)
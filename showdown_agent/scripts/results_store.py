@@ -0,0 +1,108 @@
+# scripts/results_store.py
+# Append-only JSON-lines log of expert_plot tournament runs, so a long session survives a crash
+# or a closed window and the plot can be rebuilt without replaying battles. One line per event:
+#
+#   {"type": "eval", "run": 3, "player": "aros181_counter", "matrix": {...}, "ranks": [...], "rank": 1, "mark": 10.0}
+#   {"type": "done", "run": 3}
+#
+# Every `compact_every` completed runs the file is rewritten with each finished run folded into a
+# single {"type": "run", "run": 3, "evals": {player: eval}} line. A line torn by a crash is dropped.
+
+import json
+import os
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+Matrix = Dict[str, Dict[str, Optional[float]]]
+
+
+class ResultsStore:
+    def __init__(self, path: str, compact_every: int = 10):
+        self.path = path
+        self.compact_every = compact_every
+        self.evals: Dict[int, Dict[str, Dict]] = defaultdict(dict)  # run -> player -> eval record
+        self.completed: set = set()
+        self._since_compact = 0
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        torn = False
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    torn = True
+                    continue
+                kind = record.get("type")
+                if kind == "eval":
+                    self.evals[record["run"]][record["player"]] = record
+                elif kind == "done":
+                    self.completed.add(record["run"])
+                elif kind == "run":
+                    self.evals[record["run"]].update(record["evals"])
+                    self.completed.add(record["run"])
+        if torn:
+            self.compact()
+
+    def _append(self, record: Dict):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record, separators=(",", ":")) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def evaluation(self, run_idx: int, player: str) -> Optional[Dict]:
+        return self.evals.get(run_idx, {}).get(player)
+
+    def last_completed_run(self) -> int:
+        """Highest run n such that runs 1..n are all complete (0 if none)."""
+        run = 0
+        while run + 1 in self.completed:
+            run += 1
+        return run
+
+    def add_evaluation(self, run_idx: int, player: str, matrix: Matrix, ranks: List[Tuple[str, float]], rank: int, mark: float):
+        record = {
+            "type": "eval",
+            "run": run_idx,
+            "player": player,
+            "matrix": matrix,
+            "ranks": [[name, rate] for name, rate in ranks],
+            "rank": rank,
+            "mark": mark,
+        }
+        self.evals[run_idx][player] = record
+        self._append(record)
+
+    def complete_run(self, run_idx: int):
+        self.completed.add(run_idx)
+        self._append({"type": "done", "run": run_idx})
+        self._since_compact += 1
+        if self.compact_every and self._since_compact >= self.compact_every:
+            self.compact()
+
+    def marks(self) -> Iterator[Tuple[int, str, float]]:
+        """(run, player, mark) for every stored evaluation, in run order."""
+        for run_idx in sorted(self.evals):
+            for player, record in self.evals[run_idx].items():
+                yield run_idx, player, record["mark"]
+
+    def compact(self):
+        """Rewrites the log with one line per completed run; written to a temp file and swapped in."""
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            for run_idx in sorted(set(self.evals) | self.completed):
+                evals = self.evals.get(run_idx, {})
+                if run_idx in self.completed:
+                    lines = [{"type": "run", "run": run_idx, "evals": evals}]
+                else:
+                    lines = list(evals.values())
+                for record in lines:
+                    file.write(json.dumps(record, separators=(",", ":")) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp, self.path)
+        self._since_compact = 0
@@ -0,0 +1,140 @@
+# scripts/runner_service.py
+# One event loop for a whole evaluation session. poke_env already keeps every websocket on its own
+# background loop (POKE_LOOP); the runners used to wrap each evaluation in asyncio.run, building and
+# tearing down a second loop per match that only bounced the work over to POKE_LOOP. RunnerService
+# runs jobs on POKE_LOOP directly, one after another from a queue, with the players logged in once:
+#
+#   runner = RunnerService.shared()
+#   print(runner.warm_up(players + bots))         # connects / logs in every account, reports latencies
+#   results = runner.run(cross_evaluate(agents))  # blocks the calling thread until the job is done
+#   runner.close(players + bots)                  # at the end: drains the queue, logs everyone out
+
+import asyncio
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from poke_env.concurrency import POKE_LOOP
+from poke_env.player.player import Player
+
+LOGIN_TIMEOUT = 30.0  # seconds to wait for one account to log in
+WARMUP_CONCURRENCY = 8  # websocket handshakes / logins in flight at once
+
+Job = Tuple[Awaitable[Any], Future]
+
+
+def _listening(player: Player) -> bool:
+    # players built with start_listening=False have not connected (yet; warm_up starts them)
+    return getattr(player.ps_client, "_listening_coroutine", None) is not None
+
+
+class LoginReport(NamedTuple):
+    latencies: Dict[str, Optional[float]]  # username -> seconds to log in, None if it timed out
+    wall: float
+
+    def __str__(self) -> str:
+        done = [t for t in self.latencies.values() if t is not None]
+        lines = [
+            f"{len(done)}/{len(self.latencies)} accounts logged in, {self.wall:.2f}s wall"
+            + (f" (slowest {max(done):.2f}s, sum {sum(done):.2f}s)" if done else "")
+        ]
+        for name, t in sorted(self.latencies.items(), key=lambda kv: -(kv[1] if kv[1] is not None else float("inf"))):
+            lines.append(f"  {name:<32} {'timed out' if t is None else f'{t * 1000.0:8.0f} ms'}")
+        return "\n".join(lines)
+
+
+class RunnerService:
+    _shared: Optional["RunnerService"] = None
+
+    def __init__(self, loop: asyncio.AbstractEventLoop = POKE_LOOP):
+        self.loop = loop
+        self._jobs: Optional["asyncio.Queue[Optional[Job]]"] = None
+        self._worker: Optional[Future] = None
+
+    @classmethod
+    def shared(cls) -> "RunnerService":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _call(self, coro: Awaitable[Any]) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def _start(self):
+        if self._worker is None:
+            self._jobs = self._call(self._make_queue())
+            self._worker = asyncio.run_coroutine_threadsafe(self._drain(), self.loop)
+
+    @staticmethod
+    async def _make_queue() -> "asyncio.Queue[Optional[Job]]":
+        return asyncio.Queue()  # created on the loop that consumes it
+
+    async def _drain(self):
+        while True:
+            job = await self._jobs.get()
+            if job is None:
+                return
+            coro, future = job
+            try:
+                future.set_result(await coro)
+            except BaseException as err:  # handed to whoever waits on the future
+                future.set_exception(err)
+
+    def run(self, coro: Awaitable[Any]) -> Any:
+        """
+        Drop-in for asyncio.run(coro) from a plain thread: queued behind any job another thread
+        submitted first, then run on the session loop.
+        """
+        self._start()
+        future: Future = Future()
+        self.loop.call_soon_threadsafe(self._jobs.put_nowait, (coro, future))
+        return future.result()
+
+    def warm_up(
+        self,
+        players: Iterable[Player],
+        max_concurrent: int = WARMUP_CONCURRENCY,
+        timeout: float = LOGIN_TIMEOUT,
+    ) -> LoginReport:
+        """
+        Connects and logs in every player before the first job, so start-up costs the slowest
+        login rather than the sum. Players built with start_listening=False are started here,
+        at most max_concurrent at a time; ones already listening are just waited on.
+        """
+        return self._call(self._warm_up(list(players), max_concurrent, timeout))
+
+    async def _warm_up(self, players: List[Player], max_concurrent: int, timeout: float) -> LoginReport:
+        semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        start = time.perf_counter()
+
+        async def log_in(player: Player) -> Tuple[str, Optional[float]]:
+            client = player.ps_client
+            started_here = not _listening(player)
+            began = start  # already connecting: counted from the start of the warm-up
+            if started_here:
+                await semaphore.acquire()
+                began = time.perf_counter()
+                client._listening_coroutine = asyncio.ensure_future(client.listen())
+            try:
+                await asyncio.wait_for(client.logged_in.wait(), timeout)
+                return player.username, time.perf_counter() - began
+            except asyncio.TimeoutError:
+                return player.username, None
+            finally:
+                if started_here:
+                    semaphore.release()
+
+        latencies = dict(await asyncio.gather(*(log_in(p) for p in players)))
+        return LoginReport(latencies, time.perf_counter() - start)
+
+    def close(self, players: Iterable[Player] = ()):
+        """Finishes the queued jobs, then logs the given players out."""
+        if self._worker is not None:
+            self.loop.call_soon_threadsafe(self._jobs.put_nowait, None)
+            self._worker.result()
+            self._worker, self._jobs = None, None
+
+        async def stop_all():
+            await asyncio.gather(*(p.ps_client.stop_listening() for p in players if _listening(p)))
+
+        self._call(stop_all())
@@ -0,0 +1,167 @@
+# scripts/sharded_eval.py
+# Process-pool replacement for pke.cross_evaluate. The battles of every pairing are split into
+# chunks and spread over N worker processes; worker k talks to its own server on base_port + k:
+#
+#   for port in 8000 8001 8002 8003; do node pokemon-showdown start $port --no-security & done
+#
+# or pass mock=True and every worker starts a mock_showdown server (fast_sim rules) on its port.
+# Players handed to cross_evaluate_sharded are only used as descriptions (module file, username,
+# team, replay dir); create them with start_listening=False so they do not hold the usernames
+# on the first server.
+
+import asyncio
+import importlib.util
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from poke_env import AccountConfiguration
+from poke_env.player.player import Player
+from poke_env.ps_client.server_configuration import LocalhostServerConfiguration, ServerConfiguration
+
+SHARD_BASE_PORT = 8000
+
+PlayerSpec = Dict[str, Optional[str]]
+Unit = Tuple[int, int, int]  # (p1 index, p2 index, battles)
+Tally = Dict[Tuple[str, str], List[int]]  # (p1, p2) -> [p1 wins, p2 wins, finished]
+
+
+def player_spec(player: Player) -> PlayerSpec:
+    """What a worker needs to rebuild `player` in another process."""
+    module = sys.modules[type(player).__module__]
+    # agents carry their team as a module-level `team` and pass it themselves; bots get it injected
+    team = None if hasattr(module, "team") or player._team is None else player._team.yield_team()
+    return {
+        "path": os.path.abspath(module.__file__),
+        "username": player.username,
+        "battle_format": player.format,
+        "team": team,
+        "save_replays": player._save_replays or None,
+    }
+
+
+def split_units(
+    n_players: int, n_challenges: int, shards: int, pairs: Optional[Sequence[Tuple[int, int]]] = None
+) -> List[List[Unit]]:
+    """Cuts every pairing into up to `shards` chunks and deals them out so each shard gets about the same battles."""
+    if pairs is None:
+        pairs = [(i, j) for i in range(n_players) for j in range(i + 1, n_players)]
+
+    units: List[Unit] = []
+    for i, j in pairs:
+        chunks = min(shards, n_challenges)
+        for c in range(chunks):
+            battles = n_challenges // chunks + (1 if c < n_challenges % chunks else 0)
+            units.append((i, j, battles))
+
+    buckets: List[List[Unit]] = [[] for _ in range(shards)]
+    load = [0] * shards
+    for unit in sorted(units, key=lambda u: -u[2]):
+        k = load.index(min(load))
+        buckets[k].append(unit)
+        load[k] += unit[2]
+    return [b for b in buckets if b]
+
+
+def _load_module(path: str, cache: Dict[str, object]):
+    if path not in cache:
+        name = os.path.basename(path)
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+        cache[path] = module
+    return cache[path]
+
+
+def _build_player(spec: PlayerSpec, server_configuration: ServerConfiguration, modules: Dict[str, object]) -> Player:
+    agent_class = getattr(_load_module(spec["path"], modules), "CustomAgent")
+    kwargs = dict(
+        account_configuration=AccountConfiguration(spec["username"], None),
+        battle_format=spec["battle_format"],
+        server_configuration=server_configuration,
+    )
+    if spec["team"] is not None:
+        kwargs["team"] = spec["team"]
+    player = agent_class(**kwargs)
+    if spec["save_replays"]:
+        player._save_replays = spec["save_replays"]
+    return player
+
+
+def _run_shard(specs: List[PlayerSpec], units: List[Unit], port: int, mock: bool) -> Tally:
+    """Worker entry point: plays `units` against the server on `port` and returns raw win counts."""
+    server = None
+    if mock:
+        from fast_sim import SimResolver
+        from mock_showdown import MockShowdownServer
+
+        server = MockShowdownServer(port=port, resolver=SimResolver()).start()
+    server_configuration = ServerConfiguration(
+        f"ws://localhost:{port}/showdown/websocket", LocalhostServerConfiguration.authentication_url
+    )
+
+    modules: Dict[str, object] = {}
+    needed = sorted({i for i, _, _ in units} | {j for _, j, _ in units})
+    players = {i: _build_player(specs[i], server_configuration, modules) for i in needed}
+    tally: Tally = {}
+
+    async def play():
+        for i, j, battles in units:
+            p1, p2 = players[i], players[j]
+            await p1.battle_against(p2, n_battles=battles)
+            counts = tally.setdefault((p1.username, p2.username), [0, 0, 0])
+            counts[0] += p1.n_won_battles
+            counts[1] += p2.n_won_battles
+            counts[2] += p1.n_finished_battles
+            p1.reset_battles()
+            p2.reset_battles()
+        for player in players.values():
+            await player.ps_client.stop_listening()
+
+    try:
+        asyncio.run(play())
+    finally:
+        if server is not None:
+            server.stop()
+    return tally
+
+
+def cross_evaluate_sharded(
+    players: List[Player],
+    n_challenges: int,
+    shards: int,
+    base_port: int = SHARD_BASE_PORT,
+    mock: bool = False,
+    pairs: Optional[Sequence[Tuple[int, int]]] = None,
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Same result shape as pke.cross_evaluate: results[p1][p2] is p1's win rate against p2.
+    `pairs` restricts the pairings (indices into players, p1 < p2); the others stay None.
+    """
+    specs = [player_spec(p) for p in players]
+    buckets = split_units(len(players), n_challenges, shards, pairs)
+
+    results: Dict[str, Dict[str, Optional[float]]] = {
+        p1.username: {p2.username: None for p2 in players} for p1 in players
+    }
+    if not buckets:
+        return results
+
+    tally: Tally = {}
+    # spawn, not fork: the parent may already run poke_env's background loop thread
+    with ProcessPoolExecutor(max_workers=len(buckets), mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(_run_shard, specs, units, base_port + k, mock) for k, units in enumerate(buckets)]
+        for future in futures:
+            for key, (w1, w2, finished) in future.result().items():
+                counts = tally.setdefault(key, [0, 0, 0])
+                counts[0] += w1
+                counts[1] += w2
+                counts[2] += finished
+
+    for (u1, u2), (w1, w2, finished) in tally.items():
+        results[u1][u2] = w1 / finished if finished else 0.0
+        results[u2][u1] = w2 / finished if finished else 0.0
+    return results
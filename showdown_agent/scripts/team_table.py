@@ -0,0 +1,86 @@
+# Compiles an agent's Showdown team export once into a table of final stats and ids.
+#
+# The agents look their own mons up here instead of re-deriving stats from the battle each turn:
+#
+#   try:
+#       from team_table import compile_team
+#   except ImportError:  # a copied agent file: our stats come from the battle requests
+#       compile_team = None
+#
+# Tables are cached per team string, so every copy of an agent in a tournament shares one.
+
+from typing import Dict, List, Optional, Tuple
+
+from poke_env.data import GenData
+from poke_env.data.normalize import to_id_str
+from poke_env.teambuilder import Teambuilder
+
+STAT_KEYS = ("hp", "atk", "def", "spa", "spd", "spe")
+
+
+class TeamMember:
+    """One compiled team slot: final stats (EVs, IVs, nature) and the ids the helpers look up."""
+    __slots__ = ("species", "stats", "moves", "item", "ability", "tera_type")
+
+    def __init__(self, species: str, stats: Dict[str, int],
+                 moves: Tuple[str, ...], item: str, ability: str, tera_type: str):
+        self.species = species
+        self.stats = stats
+        self.moves = moves
+        self.item = item
+        self.ability = ability
+        self.tera_type = tera_type
+
+
+class TeamTable:
+    """A team string compiled once; members in slot order and by species id."""
+    __slots__ = ("members", "by_species")
+
+    def __init__(self, members: List[TeamMember]):
+        self.members = tuple(members)
+        self.by_species = {m.species: m for m in members}
+
+    def get(self, mon) -> Optional[TeamMember]:
+        return self.by_species.get(mon.species) if mon is not None else None
+
+
+_TEAM_TABLES: Dict[Tuple[str, int], TeamTable] = {}
+
+
+def final_stat(key: str, base: int, iv: int, ev: int, level: int, nature_mult: float) -> int:
+    core = (2 * base + iv + ev // 4) * level // 100
+    if key == "hp":
+        return core + level + 10
+    stat = core + 5
+    if nature_mult > 1:
+        return stat * 110 // 100
+    if nature_mult < 1:
+        return stat * 90 // 100
+    return stat
+
+
+def compile_team(team_str: str, gen: int = 9) -> TeamTable:
+    """Parses a Showdown export into a TeamTable, cached per team string."""
+    key = (team_str, gen)
+    if key not in _TEAM_TABLES:
+        data = GenData.from_gen(gen)
+        members = []
+        for tb in Teambuilder.parse_showdown_team(team_str):
+            species = to_id_str(tb.species or tb.nickname or "")
+            base = data.pokedex[species]["baseStats"]
+            nature = data.natures.get(to_id_str(tb.nature or "serious"), {})
+            level = int(tb.level or 100)
+            stats = {
+                k: final_stat(k, base[k], tb.ivs[i], tb.evs[i], level, nature.get(k, 1))
+                for i, k in enumerate(STAT_KEYS)
+            }
+            members.append(TeamMember(
+                species=species,
+                stats=stats,
+                moves=tuple(to_id_str(m) for m in tb.moves),
+                item=to_id_str(tb.item or ""),
+                ability=to_id_str(tb.ability or ""),
+                tera_type=to_id_str(tb.tera_type or ""),
+            ))
+        _TEAM_TABLES[key] = TeamTable(members)
+    return _TEAM_TABLES[key]